@@ -1,9 +1,12 @@
 from django.contrib import admin
+from django.db import connection
+from django.db.models import Count
 from django.contrib.contenttypes.admin import GenericInlineModelAdmin, GenericTabularInline
 from django.template.response import TemplateResponse
 from import_export import resources
 from import_export.admin import ImportExportModelAdmin
 from .models import *
+from . import profiling
 from django.conf.urls import url
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
@@ -34,12 +37,36 @@ class NymphAdminSite(admin.AdminSite):
     index_title = 'Database Management'
     empty_value_display = 'unknown'
 
+    def get_urls(self):
+        urls = super().get_urls()
+        return [url(r'^sql_profile/$', self.admin_view(self.sql_profile), name='sql_profile')] + urls
+
+    def sql_profile(self, request):
+        """
+        SQL of the sampled requests of this process by URL pattern, see nymph.profiling
+        """
+        if request.method == 'POST':
+            profiling.profiles.clear()
+        context = dict(self.each_context(request), title="SQL profile", patterns=profiling.profiles.by_pattern(),
+                       sample_rate=profiling.sample_rate(), size=profiling.profiles.profiles.maxlen,
+                       queries_limit=connection.queries_limit)
+        return TemplateResponse(request, "admin/nymph/sql_profile.html", context)
+
 
 admin_site = NymphAdminSite(name='NYMPH', )
 ########################################################################################################################
 # nuclide, element, material, material transection
 ########################################################################################################################
-admin_site.register([Material,SymbolicMaterial,Fuel])
+admin_site.register([SymbolicMaterial,Fuel])
+
+
+class MaterialAdmin(admin.ModelAdmin):
+    def get_queryset(self, request):
+        # the name of a material is the name of its content object
+        return super().get_queryset(request).prefetch_related('content_object')
+
+
+admin_site.register(Material, MaterialAdmin)
 
 
 class ElementAdmin(admin.ModelAdmin):
@@ -76,9 +103,17 @@ class WmisElementCompositionInline(admin.TabularInline):
 
 class WmisElementAdmin(ImportExportModelAdmin):
     inlines = [WmisElementCompositionInline, ]
-    list_display = ('__str__', 'get_nuclide_num',)
+    list_display = ('__str__', 'nuclide_num',)
     search_fields = ('name',)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(nuclide_num=Count('wmis_nuclides'))
+
+    def nuclide_num(self, obj):
+        return obj.nuclide_num
+    nuclide_num.admin_order_field = 'nuclide_num'
+    nuclide_num.short_description = 'nuclide num'
+
 
 admin_site.register(WmisElement, WmisElementAdmin)
 
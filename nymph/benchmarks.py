@@ -0,0 +1,237 @@
+"""
+benchmarks of the hot paths of nymph, run by the run_benchmarks command on a synthetic test database
+
+a benchmark is a function of the SyntheticData registered with @benchmark(budget), budget being the most
+SQL queries one run may execute: a number, or a function of the data adding up the queries every object read
+is expected to cost, so a query per row more than intended goes over it whatever the data.
+every run starts with an empty reference cache so the queries counted are those of a process which has
+read nothing yet.
+
+the deck writer runs on the compute servers and is not part of this repository; material_resolution and
+deck_reference_data read through the builders what it reads, they stand in for deck generation.
+"""
+import copy
+import statistics
+import time
+import tracemalloc
+from collections import OrderedDict, namedtuple
+from contextlib import ExitStack
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+from django.db import connections, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from . import builders, cache, invalidation, scheduler
+from .models import (FuelAssemblyLoadingPattern, EgretFollowTask, Material, BasicMaterial, BasicMaterialNumCompo,
+                     BasicMaterialWgtCompo, Mixture, MixtureCompo, WmisElement, FuelAssemblyModel,
+                     AssemblyIntersectSurfaceCompo, RodIntersectSurface, RodIntersectSurfaceMaterial, RobinTask)
+from .routers import write_database, reference_read_database
+
+# objects of every kind read by one run, budgets are set for this sample
+SAMPLE = 20
+# options of the synthetic data generated by default
+DATA_OPTIONS = {'seed': 0, 'plants': 2, 'cycles': 10, 'core': 157, 'materials': 200}
+# a builder reads its object and the rows of it with a query each
+BUILDER_QUERIES = 2
+# an admin page reads the session, the user, the filtered and total counts, the rows and their related objects,
+# the same number of queries whatever the rows shown
+ADMIN_PAGE_QUERIES = 6
+# reading the runtime statistics, total and by node
+RUNTIME_MODEL_QUERIES = 2
+# a follow task dispatched: its earlier runs and cases, the signatures of its cases and control rods, the run
+# created, its workload, its update, status change and dispatch span, inserted in a savepoint
+DISPATCH_QUERIES = 12
+
+Benchmark = namedtuple('Benchmark', 'name function budget setup')
+Measurement = namedtuple('Measurement', 'seconds peak_bytes queries')
+
+BENCHMARKS = OrderedDict()
+
+
+def benchmark(budget, setup=None):
+    """
+    register a benchmark, budget is a number of queries or a function of the data returning it;
+    setup is a function of the data run once before the runs, not measured
+    """
+
+    def register(function):
+        BENCHMARKS[function.__name__] = Benchmark(function.__name__, function, budget, setup)
+        return function
+
+    return register
+
+
+def _run(function, data):
+    cache.get_cache().clear()
+    # a poll of the change log falling into some runs only would make the counts vary
+    invalidation.feed.polled = time.time()
+    aliases = {write_database(), reference_read_database()}
+    with ExitStack() as stack:
+        captures = [stack.enter_context(CaptureQueriesContext(connections[alias])) for alias in aliases]
+        start = time.perf_counter()
+        function(data)
+        seconds = time.perf_counter() - start
+    return seconds, sum(len(capture) for capture in captures)
+
+
+def budget(item, data):
+    return item.budget(data) if callable(item.budget) else item.budget
+
+
+def measure(item, data, repeat=5):
+    """
+    median wall time of repeat runs, queries of the first run and peak memory of one more run traced apart
+    """
+    if item.setup is not None:
+        item.setup(data)
+    runs = [_run(item.function, data) for _ in range(max(repeat, 1))]
+    tracemalloc.start()
+    try:
+        _run(item.function, data)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Measurement(statistics.median(seconds for seconds, queries in runs), peak, runs[0][1])
+
+
+def resolve_material(material_id):
+    """
+    material with the compositions of its basic materials down to nuclides, as read for a deck
+    """
+    item = builders.material(material_id)
+    if item['type'] == 'mixture':
+        components = builders.mixture(item['id'])['components']
+        basic_ids = [basic_material_id for basic_material_id, percent in components]
+    elif item['type'] == 'basicmaterial':
+        basic_ids = [item['id']]
+    else:
+        basic_ids = []
+    item['basic_materials'] = [builders.basic_material(pk) for pk in basic_ids]
+    for basic_material in item['basic_materials']:
+        for element_id, name, value in basic_material['elements']:
+            builders.element_nuclides(element_id)
+    return item
+
+
+def material_queries(material_ids):
+    """
+    queries of resolve_material() of material_ids into an empty cache: BUILDER_QUERIES for every distinct
+    material, mixture and basic material, one for the nuclides of every element
+    """
+    materials = list(Material.objects.filter(pk__in=set(material_ids)).select_related('content_type'))
+    mixture_ids = {item.object_id for item in materials if item.content_type.model == 'mixture'}
+    basic_ids = {item.object_id for item in materials if item.content_type.model == 'basicmaterial'}
+    basic_ids.update(MixtureCompo.objects.filter(mixture_id__in=mixture_ids).values_list('basic_material_id',
+                                                                                            flat=True))
+    element_ids = set()
+    for model in (BasicMaterialNumCompo, BasicMaterialWgtCompo):
+        element_ids.update(model.objects.filter(basic_material_id__in=basic_ids).values_list('element_id', flat=True))
+    return BUILDER_QUERIES * (len(materials) + len(mixture_ids) + len(basic_ids)) + len(element_ids)
+
+
+def _sampled_materials(data):
+    return [item.pk for item in data.material_rows[:SAMPLE] + data.material_rows[-SAMPLE:]]
+
+
+@benchmark(budget=lambda data: material_queries(_sampled_materials(data)))
+def material_resolution(data):
+    for material_id in _sampled_materials(data):
+        resolve_material(material_id)
+
+
+@benchmark(budget=lambda data: 2 + BUILDER_QUERIES * len(data.assembly_types))
+def pin_map(data):
+    builders.assembly_intersect_surface_map(data.pin_map.pk)
+    builders.assembly_intersect_surface_map(data.fuel_map.pk)
+    for assembly_type in data.assembly_types:
+        builders.fuel_assembly_type(assembly_type.pk)
+
+
+# the loading pattern, its positions and their coordinates
+@benchmark(budget=3)
+def core_layout(data):
+    """
+    assembly type and enrichment at every coordinate of the core in the middle cycle
+    """
+    cycle = data.plant_cycles[len(data.plant_cycles) // 2]
+    layout = {}
+    loading = FuelAssemblyLoadingPattern.objects.filter(cycle=cycle).select_related(
+        'fuel_assembly__fuel_assembly_type').prefetch_related('position__coordinates')
+    for item in loading:
+        for coordinate in item.position.coordinates.all():
+            assembly_type = item.fuel_assembly.fuel_assembly_type
+            layout[(coordinate.row, coordinate.column)] = (assembly_type.pk, assembly_type.assembly_enrichment)
+    return layout
+
+
+ADMIN_MODELS = (Material, BasicMaterial, Mixture, WmisElement, EgretFollowTask)
+
+
+def admin_login(data):
+    data.admin_client = Client()
+    data.admin_client.force_login(User.objects.create_superuser("benchmark_{}".format(data.user.pk), "", "benchmark"))
+
+
+@benchmark(budget=ADMIN_PAGE_QUERIES * len(ADMIN_MODELS), setup=admin_login)
+def admin_changelist(data):
+    for model in ADMIN_MODELS:
+        url = reverse('NYMPH:{}_{}_changelist'.format(model._meta.app_label, model._meta.model_name))
+        response = data.admin_client.get(url)
+        assert response.status_code == 200, (url, response.status_code)
+
+
+def deck_queries(data):
+    """
+    queries of deck_reference_data(): BUILDER_QUERIES for every assembly type, assembly model, rod and rod
+    surface, one for the surface map and those of the materials of the rings
+    """
+    model_ids = {assembly_type.model_id for assembly_type in data.assembly_types}
+    rod_ids = set()
+    for model in FuelAssemblyModel.objects.filter(pk__in=model_ids):
+        rod_ids.update({model.guide_tube_id, model.instrument_tube_id})
+    surface_ids = set(AssemblyIntersectSurfaceCompo.objects.filter(
+        assembly_intersect_surface=data.fuel_map).values_list('rod_intersect_surface_id', flat=True))
+    surface_ids = set(RodIntersectSurface.objects.filter(pk__in=surface_ids).values_list('pk', flat=True))
+    material_ids = RodIntersectSurfaceMaterial.objects.filter(intersect_surface_id__in=surface_ids).values_list(
+        'material_id', flat=True)
+    return (BUILDER_QUERIES * (len(data.assembly_types) + len(model_ids) + len(rod_ids - {None}) + len(surface_ids))
+            + 1 + material_queries(material_ids))
+
+
+@benchmark(budget=deck_queries)
+def deck_reference_data(data):
+    """
+    reference data of the deck of every assembly type
+    """
+    for assembly_type in data.assembly_types:
+        assembly = builders.fuel_assembly_type(assembly_type.pk)
+        model = builders.fuel_assembly_model(assembly['model_id'])
+        for rod_id in (model['guide_tube_id'], model['instrument_tube_id']):
+            builders.rod_geometry(rod_id)
+        surfaces = builders.assembly_intersect_surface_map(data.fuel_map.pk)
+        for surface_id in set(surfaces.values()):
+            for diameter, material_id in builders.rod_intersect_surface(surface_id)['rings']:
+                resolve_material(material_id)
+
+
+def dispatch_queries(data):
+    """
+    queries of task_dispatch(): the runtime model, the active tasks of every task model and the task groups of
+    the active robin tasks by content type, DISPATCH_QUERIES for every task dispatched
+    """
+    groups = RobinTask.objects.filter(status__in=scheduler.ACTIVE_STATUS, compute_node__in=data.nodes).values(
+        'content_type').distinct().count()
+    return (RUNTIME_MODEL_QUERIES + len(scheduler.task_models()) + groups
+            + DISPATCH_QUERIES * len(data.follow_tasks[:SAMPLE]))
+
+
+@benchmark(budget=dispatch_queries)
+def task_dispatch(data):
+    """
+    scheduler.dispatch() of follow tasks without publishing, rolled back so every run dispatches the same tasks
+    """
+    tasks = [copy.copy(task) for task in data.follow_tasks[:SAMPLE]]
+    using = write_database()
+    with override_settings(NYMPH_TASK_PUBLISHER=None), transaction.atomic(using=using):
+        scheduler.dispatch(tasks, data.nodes)
+        transaction.set_rollback(True, using=using)
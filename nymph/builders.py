@@ -0,0 +1,140 @@
+"""
+geometry and material data of deck generation
+
+each builder reads one reference object with a few queries and returns plain tuples and dicts,
+results are kept in the versioned reference cache so decks generated again skip the ORM.
+a build from the database inside a span of the task (see spans) is timed as a nested span of the builder name.
+"""
+from collections import OrderedDict
+from .cache import reference
+from .spans import traced
+from .models import (WmisElementComposition, BasicMaterial, Mixture, MixtureCompo, Material, RodIntersectSurface,
+                     RodIntersectSurfaceMaterial, Rod, RodCut, AssemblyIntersectSurfaceCompo, FuelAssemblyModel,
+                     GridLoadingPattern, FuelAssemblyType, FuelElementLoadingPattern)
+
+
+########################################################################################################################
+# material
+########################################################################################################################
+@reference('WmisElementComposition', 'WimsNuclide')
+@traced('element_nuclides')
+def element_nuclides(element_id):
+    """
+    ((nuclide self defined id, weight percent), ...) of an element
+    """
+    return tuple(WmisElementComposition.objects.filter(wmis_element_id=element_id).order_by('pk').values_list(
+        'wmis_nuclide__id_self_defined', 'weight_percent'))
+
+
+@reference('BasicMaterial', 'BasicMaterialNumCompo', 'BasicMaterialWgtCompo', 'WmisElement')
+@traced('basic_material')
+def basic_material(basic_material_id):
+    item = BasicMaterial.objects.get(pk=basic_material_id)
+    compo = item.num_compo if item.input_type == 1 else item.wgt_compo
+    value = 'element_number' if item.input_type == 1 else 'weight_percent'
+    return {
+        'name': item.name,
+        'density': item.density,
+        'input_type': item.input_type,
+        'elements': tuple(compo.order_by('_order').values_list('element_id', 'element__name', value)),
+    }
+
+
+@reference('Mixture', 'MixtureCompo')
+@traced('mixture')
+def mixture(mixture_id):
+    item = Mixture.objects.get(pk=mixture_id)
+    return {
+        'name': item.name,
+        'input_type': item.input_type,
+        'components': tuple(MixtureCompo.objects.filter(mixture_id=mixture_id).order_by('pk').values_list(
+            'basic_material_id', 'percent')),
+    }
+
+
+@reference('Material', 'BasicMaterial', 'Mixture', 'SymbolicMaterial')
+@traced('material')
+def material(material_id):
+    """
+    {'type': model name of the material, 'id': its pk, 'name': name}, see basic_material() and mixture()
+    """
+    item = Material.objects.select_related('content_type').get(pk=material_id)
+    return {
+        'type': item.content_type.model,
+        'id': item.object_id,
+        'name': str(item.content_object),
+    }
+
+
+########################################################################################################################
+# geometry
+########################################################################################################################
+@reference('RodIntersectSurface', 'RodIntersectSurfaceMaterial')
+@traced('rod_intersect_surface')
+def rod_intersect_surface(intersect_surface_id):
+    """
+    diameters and material rings from inside to outside: ((outer diameter, material id), ...)
+    """
+    item = RodIntersectSurface.objects.get(pk=intersect_surface_id)
+    rings = RodIntersectSurfaceMaterial.objects.filter(intersect_surface_id=intersect_surface_id).order_by(
+        '_order').values_list('outer_diameter', 'material_id')
+    return {
+        'outer_diameter': item.outer_diameter,
+        'inner_diameter': item.inner_diameter,
+        'rings': tuple(rings),
+    }
+
+
+@reference('Rod', 'RodCut')
+@traced('rod_geometry')
+def rod_geometry(rod_id):
+    """
+    axial cuts from bottom: ((length, intersect surface id), ...)
+    """
+    usage = Rod.objects.values_list('usage', flat=True).get(pk=rod_id)
+    cuts = RodCut.objects.filter(rod_id=rod_id).order_by('_order').values_list('length', 'intersect_surface_id')
+    return {'usage': usage, 'cuts': tuple(cuts)}
+
+
+@reference('AssemblyIntersectSurfaceCompo')
+@traced('assembly_intersect_surface_map')
+def assembly_intersect_surface_map(assembly_intersect_surface_id):
+    """
+    {assembly position id: rod intersect surface id}
+    """
+    return OrderedDict(AssemblyIntersectSurfaceCompo.objects.filter(
+        assembly_intersect_surface_id=assembly_intersect_surface_id).order_by('position_id').values_list(
+        'position_id', 'rod_intersect_surface_id'))
+
+
+@reference('FuelAssemblyModel', 'GridLoadingPattern', 'Grid')
+@traced('fuel_assembly_model')
+def fuel_assembly_model(model_id):
+    item = FuelAssemblyModel.objects.get(pk=model_id)
+    grids = GridLoadingPattern.objects.filter(fuel_assembly_model_id=model_id).order_by('_order').values_list(
+        'height', 'grid__height', 'grid__volume', 'grid__material_id')
+    return {
+        'name': item.name,
+        'active_length': item.active_length,
+        'side_length': item.side_length,
+        'pin_pitch': item.pin_pitch,
+        'guide_tube_id': item.guide_tube_id,
+        'instrument_tube_id': item.instrument_tube_id,
+        'grids': tuple(grids),
+    }
+
+
+@reference('FuelAssemblyType', 'FuelElementLoadingPattern')
+@traced('fuel_assembly_type')
+def fuel_assembly_type(type_id):
+    """
+    fuel element type of every fuel position
+    """
+    item = FuelAssemblyType.objects.get(pk=type_id)
+    positions = FuelElementLoadingPattern.objects.filter(fuel_assembly_type_id=type_id).order_by(
+        'position_id').values_list('position_id', 'fuel_element_type_id')
+    return {
+        'model_id': item.model_id,
+        'assembly_enrichment': item.assembly_enrichment,
+        'positions': OrderedDict(positions),
+    }
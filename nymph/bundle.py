@@ -0,0 +1,221 @@
+"""
+archive of a task directory generated while it is sent
+
+the tar layout (header and padded data of every entry) is computed from one directory walk,
+so the archive size is known in advance and any byte range is produced by seeking into the files;
+an interrupted download of a multi-GB result tree is resumed with a Range request.
+zip entries are written by zipfile to a sink drained after every chunk, only streamed from the start.
+"""
+import bisect
+import hashlib
+import os
+import stat
+import tarfile
+import zipfile
+
+CHUNK_SIZE = 1024 * 1024
+BLOCK_SIZE = tarfile.BLOCKSIZE
+# files being written by a running task or storage
+SKIPPED_SUFFIXES = ('.tmp', '.link')
+
+
+def walk(root, name):
+    """
+    (path, name in archive, stat) of root and everything under it in a stable order
+    """
+    stack = [(root, name)]
+    while stack:
+        path, arcname = stack.pop()
+        st = os.stat(path)
+        yield path, arcname, st
+        if stat.S_ISDIR(st.st_mode):
+            with os.scandir(path) as entries:
+                names = sorted(entry.name for entry in entries
+                               if not entry.is_symlink() and not entry.name.endswith(SKIPPED_SUFFIXES))
+            stack.extend((os.path.join(path, item), arcname + "/" + item) for item in reversed(names))
+
+
+def _padded(size):
+    return (size + BLOCK_SIZE - 1) // BLOCK_SIZE * BLOCK_SIZE
+
+
+def _file_chunks(path, size, begin, end, chunk_size):
+    """
+    bytes begin:end of a file recorded with size, padded with zeros;
+    a file changed since the walk keeps its recorded size so the layout stays valid
+    """
+    if begin < size:
+        with open(path, 'rb') as f:
+            f.seek(begin)
+            remaining = min(end, size) - begin
+            while remaining > 0:
+                data = f.read(min(chunk_size, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                yield data
+            if remaining > 0:
+                yield b'\0' * remaining
+    zeros = end - max(begin, size)
+    if zeros > 0:
+        yield b'\0' * zeros
+
+
+def _coalesce(pieces, chunk_size):
+    """
+    join small pieces like tar headers so every write to the client is about chunk_size
+    """
+    buffer = []
+    length = 0
+    for piece in pieces:
+        if len(piece) >= chunk_size and not buffer:
+            yield piece
+            continue
+        buffer.append(piece)
+        length += len(piece)
+        if length >= chunk_size:
+            yield b''.join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+class TarBundle:
+    content_type = 'application/x-tar'
+    extension = 'tar'
+    ranges = True
+
+    def __init__(self, root, name):
+        # (offset, length, header bytes or None, file path, file size)
+        self.segments = []
+        etag = hashlib.sha1()
+        offset = 0
+        for path, arcname, st in walk(root, name):
+            info = tarfile.TarInfo(arcname)
+            info.mtime = int(st.st_mtime)
+            info.mode = stat.S_IMODE(st.st_mode)
+            if stat.S_ISDIR(st.st_mode):
+                info.type = tarfile.DIRTYPE
+            else:
+                info.size = st.st_size
+            header = info.tobuf(tarfile.PAX_FORMAT, 'utf-8', 'surrogateescape')
+            self.segments.append((offset, len(header), header, None, 0))
+            offset += len(header)
+            if info.size:
+                self.segments.append((offset, _padded(info.size), None, path, info.size))
+                offset += _padded(info.size)
+            etag.update("{}\0{}\0{}\0".format(arcname, info.size, st.st_mtime_ns).encode('utf-8', 'surrogateescape'))
+        end = b'\0' * (2 * BLOCK_SIZE)
+        self.segments.append((offset, len(end), end, None, 0))
+        self.size = offset + len(end)
+        self.offsets = [segment[0] for segment in self.segments]
+        self.etag = '"{}"'.format(etag.hexdigest())
+
+    def _pieces(self, start, stop, chunk_size):
+        index = bisect.bisect_right(self.offsets, start) - 1
+        while start < stop:
+            offset, length, data, path, size = self.segments[index]
+            begin = start - offset
+            end = min(length, stop - offset)
+            if data is not None:
+                yield data[begin:end]
+            else:
+                yield from _file_chunks(path, size, begin, end, chunk_size)
+            start = offset + end
+            index += 1
+
+    def chunks(self, start=0, stop=None, chunk_size=CHUNK_SIZE):
+        """
+        bytes start:stop of the archive
+        """
+        stop = self.size if stop is None else min(stop, self.size)
+        return _coalesce(self._pieces(start, stop, chunk_size), chunk_size)
+
+
+class _Sink:
+    """
+    unseekable file receiving zipfile output until drained
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+class ZipBundle:
+    content_type = 'application/zip'
+    extension = 'zip'
+    ranges = False
+
+    def __init__(self, root, name, compression=zipfile.ZIP_STORED):
+        self.root = root
+        self.name = name
+        self.compression = compression
+        self.size = None
+        self.etag = None
+
+    def _pieces(self, chunk_size):
+        sink = _Sink()
+        with zipfile.ZipFile(sink, 'w', self.compression, allowZip64=True) as archive:
+            for path, arcname, st in walk(self.root, self.name):
+                if stat.S_ISDIR(st.st_mode):
+                    archive.writestr(zipfile.ZipInfo.from_file(path, arcname), b'')
+                    continue
+                info = zipfile.ZipInfo.from_file(path, arcname)
+                info.compress_type = self.compression
+                with open(path, 'rb') as f, archive.open(info, 'w', force_zip64=True) as entry:
+                    for data in iter(lambda: f.read(chunk_size), b''):
+                        entry.write(data)
+                        yield sink.drain()
+                yield sink.drain()
+        yield sink.drain()
+
+    def chunks(self, start=0, stop=None, chunk_size=CHUNK_SIZE):
+        if start or stop is not None:
+            raise ValueError("zip bundle can only be streamed from the start")
+        return _coalesce((data for data in self._pieces(chunk_size) if data), chunk_size)
+
+
+BUNDLES = {
+    'tar': TarBundle,
+    'zip': ZipBundle,
+}
+
+
+def parse_range(header, size):
+    """
+    (start, stop) of a single "bytes=" range header, None if absent or not satisfiable by one range;
+    raise ValueError if the range is outside the archive
+    """
+    if not header or not header.startswith('bytes=') or ',' in header:
+        return None
+    first, _, last = header[len('bytes='):].strip().partition('-')
+    try:
+        if first:
+            start = int(first)
+            stop = int(last) + 1 if last else size
+        else:
+            start = max(size - int(last), 0)
+            stop = size
+    except ValueError:
+        return None
+    if start >= size or stop <= start:
+        raise ValueError("range {} not satisfiable for size {}".format(header, size))
+    return start, min(stop, size)
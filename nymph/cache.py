@@ -0,0 +1,170 @@
+"""
+versioned read-through cache of reference data
+
+every reference model has a version counter kept in the cache backend and bumped when one of its rows
+is saved or deleted (see signals). a cached value is stored under a key made of its arguments and the
+versions of the models it was built from, so a change makes the old entries unreachable instead of
+searching and deleting them; they expire by the backend's own eviction. single rows of get_object()
+are deleted by key. other processes learn about changes from the change log (see invalidation).
+a model changed less than the replica lag ago is read from the write database when a value is built,
+the replica may not have the change yet (see routers).
+the backend is the cache alias settings.NYMPH_CACHE (local memory or file based, see settings.CACHES).
+QuerySet.update() and bulk_create() send no signal, call bump() after them.
+"""
+import hashlib
+import time
+from contextlib import contextmanager
+from functools import wraps
+from django.conf import settings
+from django.core.cache import caches
+
+# models read by the deck builders and rarely changed
+REFERENCE_MODELS = (
+    'Element', 'WimsNuclide', 'WmisElement', 'WmisElementComposition',
+    'BasicMaterial', 'BasicMaterialNumCompo', 'BasicMaterialWgtCompo', 'Mixture', 'MixtureCompo',
+    'SymbolicMaterial', 'Material', 'Fuel',
+    'RodIntersectSurface', 'RodIntersectSurfaceMaterial', 'Rod', 'RodCut',
+    'AssemblyIntersectSurface', 'AssemblyIntersectSurfaceCompo', 'AssemblyCut',
+    'PositionPattern', 'AssemblyPosition', 'ReactorPosition',
+    'FuelPelletModel', 'FuelPelletType', 'FuelElementType', 'PelletLoadingPattern',
+    'Grid', 'FuelAssemblyModel', 'GridLoadingPattern', 'FuelAssemblyType', 'FuelElementLoadingPattern',
+    'ComponentAssembly', 'ComponentRodLoadingPattern', 'ControlRodCluster', 'ReactorModel',
+)
+PREFIX = "nymph:"
+
+
+def get_cache():
+    return caches[getattr(settings, 'NYMPH_CACHE', 'default')]
+
+
+def label(model):
+    return model if isinstance(model, str) else model._meta.label_lower
+
+
+def _version_key(model):
+    return PREFIX + "version:" + label(model)
+
+
+def versions(models):
+    """
+    current version of every model in one backend round trip
+    """
+    cache = get_cache()
+    keys = [_version_key(model) for model in models]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # a counter lost by eviction restarts from the clock, never from a value used before
+            cache.add(key, int(time.time() * 1000), None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def _changed_key(model):
+    return PREFIX + "changed:" + label(model)
+
+
+def bump(model):
+    from .routers import replica_lag
+    cache = get_cache()
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, int(time.time() * 1000), None)
+    cache.set(_changed_key(model), True, replica_lag())
+
+
+def recently_changed(models):
+    """
+    if one of models was changed within the replica lag
+    """
+    return bool(get_cache().get_many([_changed_key(model) for model in models]))
+
+
+@contextmanager
+def fresh(models):
+    """
+    block reading models from the write database if one of them was changed within the replica lag
+    """
+    from .routers import primary
+    if recently_changed(models):
+        with primary():
+            yield
+    else:
+        yield
+
+
+def _build(models, build, *args, **kwargs):
+    with fresh(models):
+        return build(*args, **kwargs)
+
+
+def make_key(name, args, models):
+    version = ".".join(str(value) for value in versions(models))
+    digest = hashlib.md5(version.encode('ascii')).hexdigest()[:16]
+    return "{}{}:{}:{}".format(PREFIX, name, ":".join(str(arg) for arg in args), digest)
+
+
+def _refresh():
+    from .invalidation import feed
+    feed.poll()
+
+
+def get_or_build(name, args, models, build, timeout=None):
+    _refresh()
+    cache = get_cache()
+    key = make_key(name, args, models)
+    value = cache.get(key)
+    if value is None:
+        value = _build(models, build, *args)
+        cache.set(key, value, timeout)
+    return value
+
+
+def reference(*models, timeout=None):
+    """
+    cache the result of a function of hashable arguments built from models, e.g.
+    @reference('Rod', 'RodCut')
+    def rod_geometry(rod_id): ...
+    the result must be picklable and not None
+    """
+    labels = tuple("nymph." + model.lower() if isinstance(model, str) else label(model) for model in models)
+
+    def decorator(function):
+        name = function.__module__ + "." + function.__name__
+
+        @wraps(function)
+        def wrapper(*args):
+            return get_or_build(name, args, labels, function, timeout)
+
+        wrapper.uncached = function
+        return wrapper
+
+    return decorator
+
+
+def _object_key(model, pk):
+    return "{}object:{}:{}".format(PREFIX, label(model), pk)
+
+
+def get_object(model, pk, timeout=None):
+    """
+    model instance by primary key through the cache, dropped by invalidate() of the row
+    """
+    _refresh()
+    cache = get_cache()
+    key = _object_key(model, pk)
+    instance = cache.get(key)
+    if instance is None:
+        instance = _build((model,), model.objects.get, pk=pk)
+        cache.set(key, instance, timeout)
+    return instance
+
+
+def invalidate(model, pk):
+    """
+    drop what depends on one row: the row itself and values built from its model
+    """
+    get_cache().delete(_object_key(model, pk))
+    bump(model)
@@ -0,0 +1,95 @@
+"""
+task group: a task whose calculation is split into independent robin tasks
+
+the group task defines child_labels() (BaffleCalculation model types, BPOutTask burn up points),
+one RobinTask is generated per label and all of them are dispatched at once.
+the status of the group is derived from its children and group_completed is sent
+exactly once when the last child completes.
+"""
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Max, Min
+from django.dispatch import Signal
+from .models import RobinTask, TaskStatusChange
+from . import scheduler, spans
+
+group_completed = Signal(providing_args=["group"])
+
+# status of an unfinished group is the status of its most urgent unfinished child
+STATUS_PRIORITY = (7, 2, 1, 3, 5, 4, 0)
+
+
+def is_group(task):
+    return hasattr(task, 'child_labels')
+
+
+def derive_status(statuses):
+    statuses = set(statuses)
+    if not statuses:
+        return 0
+    if statuses == {6}:
+        return 6
+    for status in STATUS_PRIORITY:
+        if status in statuses:
+            return status
+
+
+def children(group):
+    content_type = ContentType.objects.get_for_model(group)
+    return RobinTask.objects.filter(content_type=content_type, object_id=group.pk)
+
+
+def create_children(group):
+    """
+    bulk create the missing robin task of every label of the group
+    """
+    content_type = ContentType.objects.get_for_model(group)
+    existing = set(children(group).values_list('label', flat=True))
+    tasks = [RobinTask(content_type=content_type, object_id=group.pk, label=str(label), user_id=group.user_id,
+                       name="{} {}".format(group.name, label)[:32])
+             for label in group.child_labels() if str(label) not in existing]
+    RobinTask.objects.bulk_create(tasks)
+    return children(group)
+
+
+def fan_out(group, nodes=None):
+    """
+    create the robin tasks of the group and dispatch the prepared ones concurrently over compute nodes
+    """
+    with transaction.atomic():
+        tasks = list(create_children(group).filter(status=0))
+    if tasks:
+        scheduler.dispatch(tasks, nodes)
+    refresh_group(group)
+    return tasks
+
+
+def refresh_group(group):
+    """
+    update group status from its children; the completion barrier fires only once
+    since the group row is locked and only the transition to completed sends the signal
+    """
+    model = type(group)
+    with transaction.atomic():
+        locked = model.objects.select_for_update().get(pk=group.pk)
+        queryset = children(locked)
+        status = derive_status(queryset.values_list('status', flat=True))
+        if status == locked.status:
+            return status
+        fields = {'status': status}
+        if status == 6:
+            times = queryset.aggregate(start_time=Min('start_time'), end_time=Max('end_time'))
+            fields.update(times)
+        model.objects.filter(pk=group.pk).update(**fields)
+        # receivers of group_completed get the group as saved
+        for name, value in fields.items():
+            setattr(locked, name, value)
+        # update() sends no post_save, the transition is recorded as the signals record a saved task
+        spans.record_transition(locked)
+        TaskStatusChange.objects.create(content_object=locked, status=status)
+        if status == 6:
+            transaction.on_commit(lambda: group_completed.send(sender=model, group=locked))
+    for name, value in fields.items():
+        setattr(group, name, value)
+    group._loaded_status = status
+    return status
@@ -0,0 +1,93 @@
+"""
+shared change feed
+
+a log table is tailed by increasing id; every process keeps the latest rows in memory and
+refreshes them at most once per interval whatever the number of readers,
+so database load does not grow with the number of subscribed clients.
+ids of transactions committed out of order leave gaps which are read again like in nymph.invalidation;
+rows after the first gap are held back until the gap is filled or gap_timeout passes,
+so readers tailing by id never skip a row committed late.
+"""
+import threading
+import time
+from collections import deque
+from django.db.models import Q
+
+MAX_GAPS = 1000
+
+
+class ChangeFeed:
+    def __init__(self, model, interval=1.0, size=1000, gap_timeout=10, annotate=None):
+        """
+        annotate: called with every list of rows read, e.g. to set attributes used to filter them
+        """
+        self.model = model
+        self.interval = interval
+        self.gap_timeout = gap_timeout
+        self.annotate = annotate
+        self.rows = deque(maxlen=size)
+        # rows up to this id are in memory, dropped or given up
+        self.last_id = None
+        # rows up to this id are not in memory
+        self.dropped_id = None
+        # greatest id read, rows read after last_id are held back
+        self.read_id = None
+        self.held = {}
+        # id missing below read_id: time it was found missing
+        self.gaps = {}
+        self.refreshed = 0
+        self.lock = threading.Lock()
+
+    def latest_id(self):
+        self.refresh()
+        return self.last_id
+
+    def refresh(self, force=False):
+        with self.lock:
+            now = time.time()
+            if not force and now - self.refreshed < self.interval:
+                return
+            self.refreshed = now
+            if self.last_id is None:
+                latest = self.model.objects.order_by('-id').values_list('id', flat=True).first()
+                self.last_id = self.dropped_id = self.read_id = latest or 0
+                return
+            self.gaps = {pk: found for pk, found in self.gaps.items() if now - found < self.gap_timeout}
+            condition = Q(id__gt=self.read_id)
+            if self.gaps:
+                condition |= Q(id__in=list(self.gaps))
+            rows = list(self.model.objects.filter(condition).order_by('id')[:self.rows.maxlen])
+            if rows and self.annotate is not None:
+                self.annotate(rows)
+            for row in rows:
+                self.gaps.pop(row.id, None)
+                if row.id > self.read_id:
+                    self.gaps.update((missing, now) for missing in range(max(self.read_id + 1, row.id - MAX_GAPS),
+                                                                         row.id))
+                    self.read_id = row.id
+                self.held[row.id] = row
+            self._release(min(self.gaps) - 1 if self.gaps else self.read_id)
+
+    def _release(self, last_id):
+        """
+        move the held rows up to last_id to memory
+        """
+        rows = [self.held.pop(pk) for pk in sorted(pk for pk in self.held if pk <= last_id)]
+        if rows:
+            overflow = len(self.rows) + len(rows) - self.rows.maxlen
+            if overflow > 0:
+                dropped = (list(self.rows) + rows)[overflow - 1]
+                self.dropped_id = dropped.id
+            self.rows.extend(rows)
+        self.last_id = max(self.last_id, last_id)
+
+    def since(self, last_id):
+        """
+        rows with id greater than last_id;
+        return (rows, complete), complete is False if rows after last_id already dropped from memory
+        """
+        self.refresh()
+        with self.lock:
+            rows = [row for row in self.rows if row.id > last_id]
+            complete = last_id >= self.dropped_id
+        return rows, complete
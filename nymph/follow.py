@@ -0,0 +1,110 @@
+"""
+incremental rerun of egret follow task
+
+the ordered cases of a follow task are compared with the cases of the latest completed run of the same
+follow (same loading pattern and pre_egret_task), which may be an earlier run of the task itself;
+calculation restarts from the saved state of the last unchanged case so only the tail of the follow
+is recalculated. the cases of every run are recorded by start_run() when the task is dispatched
+and the run is marked completed by complete_run() when the task completes.
+"""
+import json
+import os
+from collections import defaultdict
+from django.utils import timezone
+from .models import ControlRodClusterStep, EgretFollowCase, EgretFollowRun
+
+CASE_FIELDS = ('burn_up', 'delta_time', 'relative_power', 'control_rod_cluster_map', 'split', 'export')
+
+
+def case_signatures(task):
+    """
+    ordered list of the comparable content of every case, control rod cluster map is compared by its steps;
+    lists of JSON values, as stored by EgretFollowRun
+    """
+    cases = list(EgretFollowCase.objects.filter(follow_task=task).order_by('_order').values_list(*CASE_FIELDS))
+    map_ids = set(case[3] for case in cases)
+    steps = defaultdict(list)
+    for map_id, cluster_id, step in ControlRodClusterStep.objects.filter(map__in=map_ids).values_list(
+            'map', 'control_rod_cluster', 'step'):
+        steps[map_id].append((cluster_id, step))
+    signatures = [case[:3] + (sorted(steps[case[3]]),) + case[4:] for case in cases]
+    return json.loads(json.dumps(signatures, default=str))
+
+
+def unchanged_case_num(signatures, base_signatures):
+    num = 0
+    for case, base_case in zip(signatures, base_signatures):
+        if case != base_case:
+            break
+        num += 1
+    return num
+
+
+def find_base_run(task):
+    """
+    latest completed run of the same follow
+    """
+    return EgretFollowRun.objects.filter(follow_task__loading_pattern=task.loading_pattern_id,
+                                         follow_task__pre_egret_task=task.pre_egret_task_id,
+                                         end_time__isnull=False).select_related('follow_task').order_by(
+        '-end_time', '-pk').first()
+
+
+def plan_restart(task, base_run=None, save=True, signatures=None):
+    """
+    set restart_task and restart_case of task;
+    the state of the last unchanged case must have been saved by the base run, otherwise an earlier saved state
+    is used
+    return the number of reused cases
+    """
+    if base_run is None:
+        base_run = find_base_run(task)
+    restart_case = 0
+    if base_run is not None:
+        if signatures is None:
+            signatures = case_signatures(task)
+        base_task = base_run.follow_task
+        num = unchanged_case_num(signatures, json.loads(base_run.cases))
+        # the state after case num-1 is the start of case num
+        while num > 0 and not os.path.exists(base_task.restart_file(num - 1)):
+            num -= 1
+        restart_case = num
+    task.restart_task = base_run.follow_task if restart_case else None
+    task.restart_case = restart_case
+    if save:
+        task.save(update_fields=['restart_task', 'restart_case', 'last_modified'])
+    return restart_case
+
+
+def start_run(task, save=True):
+    """
+    plan the restart of task about to be dispatched and record the cases of its run
+    """
+    signatures = case_signatures(task)
+    restart_case = plan_restart(task, save=save, signatures=signatures)
+    # the run overwrites the states saved by earlier runs of task after its restart case
+    for run in EgretFollowRun.objects.filter(follow_task=task, end_time__isnull=False):
+        cases = json.loads(run.cases)
+        if len(cases) > restart_case:
+            run.cases = json.dumps(cases[:restart_case])
+            run.save(update_fields=['cases'])
+    return EgretFollowRun.objects.create(follow_task=task, cases=json.dumps(signatures))
+
+
+def complete_run(task):
+    """
+    mark the latest run of task completed, its cases become the base of later runs
+    """
+    run = EgretFollowRun.objects.filter(follow_task=task, end_time__isnull=True).order_by('-pk').first()
+    if run is not None:
+        run.end_time = task.end_time or timezone.now()
+        run.save(update_fields=['end_time'])
+    return run
+
+
+def restart_state(task):
+    """
+    saved state file the calculation of task starts from, None to start from cycle start
+    """
+    if task.restart_task_id and task.restart_case:
+        return task.restart_task.restart_file(task.restart_case - 1)
@@ -0,0 +1,109 @@
+"""
+multilinear interpolation of branch tables for many states at once
+
+states are arrays over all assemblies and axial nodes of the core; bracketing indices and weights
+are found by numpy.searchsorted for every axis and cached, since most axes do not change between
+calls of one depletion step. the 2**4 corners are gathered by fancy indexing of the memory-mapped table.
+"""
+import numpy as np
+from .xs_table import AXES
+
+
+class AxisBracket:
+    """
+    lower index and weight of the upper point of values on one axis
+    """
+
+    def __init__(self, axis, values, extrapolate=False):
+        values = np.asarray(values, dtype=np.float64)
+        if len(axis) == 1:
+            self.index = np.zeros(values.shape, dtype=np.intp)
+            self.weight = np.zeros(values.shape)
+            self.single = True
+            return
+        self.single = False
+        index = np.searchsorted(axis, values, side='right') - 1
+        np.clip(index, 0, len(axis) - 2, out=index)
+        lower = axis[index]
+        weight = (values - lower) / (axis[index + 1] - lower)
+        if not extrapolate:
+            np.clip(weight, 0, 1, out=weight)
+        self.index = index
+        self.weight = weight
+
+
+class Interpolator:
+    def __init__(self, table, extrapolate=False):
+        self.table = table
+        self.extrapolate = extrapolate
+        # axis name: (values of last call, bracket)
+        self._cache = {}
+
+    def _bracket(self, axis, values):
+        values = np.asarray(values, dtype=np.float64)
+        cached = self._cache.get(axis)
+        if cached is not None and cached[0].shape == values.shape and np.array_equal(cached[0], values):
+            return cached[1]
+        bracket = AxisBracket(self.table.axes[axis], values, self.extrapolate)
+        self._cache[axis] = (values.copy(), bracket)
+        return bracket
+
+    def bracket(self, **states):
+        """
+        states: array of every axis of AXES, scalars are broadcast
+        """
+        missing = set(AXES) - set(states)
+        if missing:
+            raise KeyError("missing state: {}".format(", ".join(sorted(missing))))
+        arrays = np.broadcast_arrays(*[np.asarray(states[axis], dtype=np.float64) for axis in AXES])
+        return [self._bracket(axis, values.ravel()) for axis, values in zip(AXES, arrays)]
+
+    def __call__(self, xs=None, **states):
+        """
+        return array of shape (state, cross section, group), or (state, group) if xs is given
+        """
+        brackets = self.bracket(**states)
+        return self.evaluate(brackets, xs)
+
+    def evaluate(self, brackets, xs=None):
+        data = self.table.data
+        if xs is not None:
+            data = data[..., self.table.xs_names.index(xs), :]
+        result = None
+        corners = [(0,) if bracket.single else (0, 1) for bracket in brackets]
+        for corner in np.ndindex(*[len(item) for item in corners]):
+            weight = 1.0
+            index = []
+            for bracket, upper in zip(brackets, corner):
+                if upper:
+                    weight = weight * bracket.weight
+                    index.append(bracket.index + 1)
+                else:
+                    weight = weight * (1 - bracket.weight)
+                    index.append(bracket.index)
+            values = data[tuple(index)] * np.reshape(weight, (-1,) + (1,) * (data.ndim - len(AXES)))
+            result = values if result is None else result + values
+        return result
+
+
+def interpolate_core(interpolators, table_index, xs=None, **states):
+    """
+    interpolators: list of Interpolator, table_index: which interpolator is used by every state,
+    an index of fewer dimensions than the states applies along their leading axes, e.g. one index
+    per assembly for states of shape (assembly, axial node); states of the same table are evaluated together
+    return array of shape (broadcast shape, cross section, group), or (broadcast shape, group) if xs is given
+    """
+    states = np.broadcast_arrays(*[np.asarray(states[axis], dtype=np.float64) for axis in AXES])
+    table_index = np.asarray(table_index)
+    table_index = table_index.reshape(table_index.shape + (1,) * (states[0].ndim - table_index.ndim))
+    arrays = np.broadcast_arrays(table_index, *states)
+    shape = arrays[0].shape
+    arrays = [array.ravel() for array in arrays]
+    result = None
+    for number in np.unique(arrays[0]):
+        selected = arrays[0] == number
+        part = interpolators[number](xs, **{axis: values[selected] for axis, values in zip(AXES, arrays[1:])})
+        if result is None:
+            result = np.empty((arrays[0].size,) + part.shape[1:])
+        result[selected] = part
+    return result.reshape(shape + result.shape[1:])
@@ -0,0 +1,96 @@
+"""
+cache invalidation across processes
+
+the writing process logs every saved or deleted reference row in ReferenceChange (see signals), and the
+rows directories depend on (see paths.MODELS); every process tails the log by increasing id at most once
+per interval, at request start (ReferenceCacheMiddleware) and before reading the reference cache,
+and invalidates only the changed rows in the reference cache and the path cache.
+ids of transactions committed out of order leave gaps which are read again until GAP_TIMEOUT.
+"""
+import threading
+import time
+from datetime import timedelta
+from django.db.models import Q
+from django.utils import timezone
+from . import cache, paths
+from .models import ReferenceChange
+
+GAP_TIMEOUT = 60
+MAX_GAPS = 1000
+# rows older than this are deleted, long after every process has read them
+RETENTION = timedelta(days=1)
+PRUNE_INTERVAL = 3600
+
+
+class ReferenceChangeFeed:
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self.last_id = None
+        # id missing below last_id: time it was found missing
+        self.gaps = {}
+        self.polled = 0
+        self.pruned = time.time()
+        self.lock = threading.Lock()
+
+    def poll(self, force=False):
+        """
+        invalidate the rows changed since last poll, return the number of changes
+        """
+        with self.lock:
+            now = time.time()
+            if not force and now - self.polled < self.interval:
+                return 0
+            self.polled = now
+            if self.last_id is None:
+                # nothing is cached yet by this process
+                latest = ReferenceChange.objects.order_by('-id').values_list('id', flat=True).first()
+                self.last_id = latest or 0
+                return 0
+            self.gaps = {pk: found for pk, found in self.gaps.items() if now - found < GAP_TIMEOUT}
+            condition = Q(id__gt=self.last_id)
+            if self.gaps:
+                condition |= Q(id__in=list(self.gaps))
+            changes = list(ReferenceChange.objects.filter(condition).order_by('id').values_list('id', 'model',
+                                                                                                'object_id'))
+            for pk, model, object_id in changes:
+                self.gaps.pop(pk, None)
+                if pk > self.last_id:
+                    self.gaps.update((missing, now) for missing in range(max(self.last_id + 1, pk - MAX_GAPS), pk))
+                    self.last_id = pk
+                _invalidate(model, object_id)
+            if now - self.pruned > PRUNE_INTERVAL:
+                self.pruned = now
+                ReferenceChange.objects.filter(time__lt=timezone.now() - RETENTION).delete()
+            return len(changes)
+
+
+# one feed per process
+feed = ReferenceChangeFeed()
+
+
+def _invalidate(label, object_id):
+    cache.invalidate(label, object_id)
+    paths.invalidate(label.split('.', 1)[1], object_id)
+
+
+def log_change(instance):
+    log_path_change(instance._meta.model_name, instance.pk)
+
+
+def log_path_change(model_name, object_id):
+    """
+    log a change of the entry model_name, object_id of the path cache, which is the row of a nymph model
+    except for profile entries keyed by user id
+    """
+    label = "nymph." + model_name
+    _invalidate(label, object_id)
+    ReferenceChange.objects.create(model=label, object_id=object_id)
+
+
+class ReferenceCacheMiddleware:
+    """
+    bring the reference cache of this process up to date before handling a request
+    """
+
+    def process_request(self, request):
+        feed.poll()
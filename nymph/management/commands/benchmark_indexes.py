@@ -0,0 +1,105 @@
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.migrations.executor import MigrationExecutor
+from nymph.models import (AssemblyTask, BaffleCalculation, RobinTask, EgretFollowTask, EgretSequenceTask, Material,
+                          AssemblyCut, FuelAssemblyLoadingPattern, EgretFollowCase)
+from nymph.management.commands.check_squashed_migrations import OriginalMigrationLoader
+from nymph.routers import write_database
+from nymph.synthetic import SyntheticData
+
+# migration before the one adding the composite indexes
+BEFORE_INDEXES = '0011_referencechange'
+EXPLAIN = {
+    'sqlite': "EXPLAIN QUERY PLAN ",
+    'mysql': "EXPLAIN ",
+    'postgresql': "EXPLAIN ",
+}
+
+
+def hot_queries(data):
+    """
+    (name, queryset) of the query paths served by the composite indexes
+    """
+    node = data.nodes[0]
+    queries = [("{} status+compute_node".format(model._meta.db_table),
+                model.objects.filter(status=1, compute_node=node).values_list('pk', flat=True))
+               for model in (AssemblyTask, BaffleCalculation, RobinTask, EgretFollowTask, EgretSequenceTask)]
+    for model in (Material, AssemblyCut, RobinTask):
+        sample = model.objects.order_by('pk')[len(data.nodes)]
+        queries.append(("{} content_type+object_id".format(model._meta.db_table),
+                        model.objects.filter(content_type_id=sample.content_type_id, object_id=sample.object_id)))
+    queries.append(("fuel_assembly_loading_pattern cycle+position",
+                     FuelAssemblyLoadingPattern.objects.filter(cycle=data.cycles[len(data.cycles) // 2],
+                                                               position=data.reactor_positions[0])))
+    queries.append(("egret_follow_case follow_task+_order",
+                     EgretFollowCase.objects.filter(follow_task=data.follow_tasks[0]).order_by('_order')))
+    return queries
+
+
+class Command(BaseCommand):
+    help = "compare query plans and timings of hot query paths without and with the composite indexes " \
+           "on a synthetic test database"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help="rows of every task table")
+        parser.add_argument('--repeat', type=int, default=20, help="runs of every query")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--keepdb', action='store_true', help="keep the test database")
+
+    def measure(self, connection, queries, repeat):
+        results = {}
+        for name, queryset in queries:
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(EXPLAIN.get(connection.vendor, "EXPLAIN ") + sql, params)
+                plan = [" ".join(str(item) for item in row) for row in cursor.fetchall()]
+            seconds = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                list(queryset.all())
+                seconds.append(time.perf_counter() - start)
+            results[name] = (statistics.median(seconds) * 1000, plan)
+        return results
+
+    def migrate(self, connection, target=None):
+        """
+        migrate nymph through the original migrations, the squashed one cannot stop before the indexes
+        """
+        executor = MigrationExecutor(connection)
+        executor.loader = OriginalMigrationLoader(connection)
+        targets = [node for node in executor.loader.graph.leaf_nodes() if node[0] != 'nymph' or target is None]
+        if target is not None:
+            targets.append(('nymph', target))
+        executor.migrate(targets)
+
+    def handle(self, *args, **options):
+        connection = connections[write_database()]
+        old_name = connection.settings_dict['NAME']
+        # an empty test database, create_test_db() would migrate it through the squashed migration
+        test_name = connection.creation._create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        connection.close()
+        connection.settings_dict['NAME'] = test_name
+        try:
+            self.migrate(connection)
+            self.stdout.write("generating {} rows per table".format(options['rows']))
+            data = SyntheticData(options['seed']).base().hot_paths(options['rows'])
+            queries = hot_queries(data)
+            after = self.measure(connection, queries, options['repeat'])
+            self.migrate(connection, BEFORE_INDEXES)
+            try:
+                before = self.measure(connection, queries, options['repeat'])
+            finally:
+                self.migrate(connection)
+            self.stdout.write("{:50} {:>12} {:>12} {:>8}".format("query", "before ms", "after ms", "speedup"))
+            for name, queryset in queries:
+                self.stdout.write("{:50} {:12.3f} {:12.3f} {:8.1f}".format(
+                    name, before[name][0], after[name][0], before[name][0] / max(after[name][0], 1e-9)))
+            for name, queryset in queries:
+                self.stdout.write("\n" + name)
+                for label, result in (("before", before), ("after", after)):
+                    for line in result[name][1]:
+                        self.stdout.write("  {}: {}".format(label, line))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
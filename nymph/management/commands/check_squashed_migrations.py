@@ -0,0 +1,99 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.migrations.executor import MigrationExecutor
+from django.db.migrations.loader import MigrationLoader
+from nymph.routers import write_database
+
+
+class OriginalMigrationLoader(MigrationLoader):
+    """
+    loader of the migrations replaced by squashed ones
+    """
+
+    def load_disk(self):
+        super().load_disk()
+        self.disk_migrations = {key: migration for key, migration in self.disk_migrations.items()
+                                if not migration.replaces}
+
+
+def schema(connection):
+    """
+    {table: (columns, constraints)} of the database;
+    columns by name since the order of columns differs between added and created fields
+    """
+    result = {}
+    with connection.cursor() as cursor:
+        for table in connection.introspection.table_names(cursor):
+            if table == 'django_migrations':
+                continue
+            columns = {row[0]: tuple(row[1:]) for row in connection.introspection.get_table_description(cursor, table)}
+            constraints = set()
+            for name, item in connection.introspection.get_constraints(cursor, table).items():
+                constraints.add((tuple(item['columns']), item['primary_key'], item['unique'], item['index'],
+                                 tuple(item['foreign_key'] or ()), item['check']))
+            result[table] = (columns, constraints)
+    return result
+
+
+class Command(BaseCommand):
+    help = "migrate two test databases, through the original nymph migrations and through the squashed one, " \
+           "and compare their schemas"
+
+    def add_arguments(self, parser):
+        parser.add_argument('squashed', help="name of the squashed nymph migration like 0001_squashed_0012")
+
+    def migrate(self, connection, squashed):
+        executor = MigrationExecutor(connection)
+        if not squashed:
+            # keep the replaced migrations in the graph instead of the squashed one
+            executor.loader = OriginalMigrationLoader(connection)
+        targets = [node for node in executor.loader.graph.leaf_nodes() if node[0] != 'nymph']
+        targets.append(('nymph', squashed or self.replaced[-1][1]))
+        executor.migrate(targets)
+        return schema(connection)
+
+    def snapshot(self, squashed):
+        connection = connections[write_database()]
+        old_name = connection.settings_dict['NAME']
+        # an empty test database, create_test_db() would migrate it
+        test_name = connection.creation._create_test_db(verbosity=0, autoclobber=True, keepdb=False)
+        connection.close()
+        connection.settings_dict['NAME'] = test_name
+        try:
+            return self.migrate(connection, squashed)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def handle(self, *args, **options):
+        loader = MigrationLoader(None)
+        try:
+            migration = loader.get_migration_by_prefix('nymph', options['squashed'])
+        except (KeyError, ValueError) as e:
+            raise CommandError(e)
+        if not migration.replaces:
+            raise CommandError("{} replaces no migration".format(migration.name))
+        self.replaced = migration.replaces
+        original = self.snapshot(None)
+        squashed = self.snapshot(migration.name)
+        differences = []
+        for table in sorted(set(original) | set(squashed)):
+            if table not in squashed:
+                differences.append("{}: only created by the original migrations".format(table))
+                continue
+            if table not in original:
+                differences.append("{}: only created by {}".format(table, migration.name))
+                continue
+            original_columns, original_constraints = original[table]
+            squashed_columns, squashed_constraints = squashed[table]
+            for column in sorted(set(original_columns) | set(squashed_columns)):
+                if original_columns.get(column) != squashed_columns.get(column):
+                    differences.append("{}.{}: {} != {}".format(table, column, original_columns.get(column),
+                                                                squashed_columns.get(column)))
+            for constraint in sorted(original_constraints ^ squashed_constraints, key=str):
+                side = "original" if constraint in original_constraints else migration.name
+                differences.append("{}: constraint {} only in {}".format(table, constraint, side))
+        for line in differences:
+            self.stdout.write(line)
+        if differences:
+            raise CommandError("{} differences between the original and squashed schemas".format(len(differences)))
+        self.stdout.write("{} tables identical".format(len(original)))
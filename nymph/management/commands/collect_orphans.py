@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from nymph.orphans import Collector
+from nymph.storage import DeduplicatedNymphStorage
+
+
+class Command(BaseCommand):
+    help = "report directories of the storage root whose database rows were deleted, remove them with --remove"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--remove', action='store_true', help="remove orphans, only report them by default")
+        parser.add_argument('--root', help="storage root, get_file_root() if not given")
+        parser.add_argument('--workers', type=int, default=16, help="number of scandir workers")
+        parser.add_argument('--min-age', type=int, default=3600,
+                            help="seconds, orphans modified more recently are kept")
+
+    def handle(self, *args, **options):
+        collector = Collector(options['root'], options['remove'], options['workers'], options['min_age'])
+        report = collector.run()
+        for orphan in report.orphans:
+            self.stdout.write("{} {}: {} files, {} bytes".format("removed" if orphan.removed else "orphan",
+                                                                 orphan.path, orphan.files, orphan.bytes))
+        self.stdout.write("{} orphans, {} files, {} bytes; {} recent kept".format(
+            len(report.orphans), report.files, report.bytes, report.recent))
+        self.stdout.write("{} directories, {} entries in {:.1f}s ({:.0f} entries/s)".format(
+            report.directories, report.entries, report.seconds, report.entries_per_second))
+        if options['remove'] and options['root'] is None:
+            blobs = DeduplicatedNymphStorage().collect_blobs()
+            self.stdout.write("{} unreferenced blobs removed".format(blobs))
@@ -0,0 +1,27 @@
+import json
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from nymph import spans
+
+
+class Command(BaseCommand):
+    help = "export the spans of tasks in the Trace Event Format of chrome://tracing and Perfetto"
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', help="task model name like assemblytask")
+        parser.add_argument('ids', nargs='+', type=int, help="task ids")
+        parser.add_argument('--output', help="json file, standard output if not given")
+
+    def handle(self, *args, **options):
+        try:
+            model = apps.get_model('nymph', options['model'])
+        except LookupError as e:
+            raise CommandError(e)
+        tasks = model.objects.filter(pk__in=options['ids'])
+        trace = spans.chrome_trace(spans.task_spans(tasks))
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(trace, f)
+            self.stdout.write("{} events written to {}".format(len(trace['traceEvents']), options['output']))
+        else:
+            self.stdout.write(json.dumps(trace))
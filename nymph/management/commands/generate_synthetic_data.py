@@ -0,0 +1,50 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction, IntegrityError
+from nymph.models import (Plant, Unit, Cycle, ReactorPosition, FuelElementLoadingPattern, FuelAssembly,
+                          FuelAssemblyLoadingPattern, LoadingPattern, EgretFollowTask, EgretFollowCase,
+                          EgretSequenceTask, AssemblyTask, BPOutTask, BaffleCalculation, RobinTask)
+from nymph.routers import write_database
+from nymph.synthetic import SyntheticData, CORE_ROWS
+
+REPORTED_MODELS = (Plant, Unit, Cycle, ReactorPosition, FuelElementLoadingPattern, FuelAssembly,
+                   FuelAssemblyLoadingPattern, LoadingPattern, EgretFollowTask, EgretFollowCase, EgretSequenceTask,
+                   AssemblyTask, BPOutTask, BaffleCalculation, RobinTask)
+
+
+class Command(BaseCommand):
+    help = "generate synthetic plants with their cycles, fuel loading and egret tasks for scale testing; " \
+           "the same seed generates the same data"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--plants', type=int, default=2)
+        parser.add_argument('--units', type=int, default=2, help="units of every plant")
+        parser.add_argument('--cycles', type=int, default=10, help="cycles of every unit")
+        parser.add_argument('--core', type=int, choices=sorted(CORE_ROWS), default=157, help="assemblies of the core")
+        parser.add_argument('--follow-tasks', type=int, default=5, help="egret follow tasks of every cycle")
+        parser.add_argument('--cases', type=int, default=20, help="cases of every follow task")
+        parser.add_argument('--assembly-tasks', type=int, default=5)
+        parser.add_argument('--bp-out-tasks', type=int, default=5)
+        parser.add_argument('--burn-up-points', type=int, default=10, help="burn up points of every bp out task")
+        parser.add_argument('--baffle-calculations', type=int, default=5,
+                            help="baffle calculations, at most one of every assembly task")
+        parser.add_argument('--nodes', type=int, default=20, help="compute nodes running the tasks")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=1000, help="rows of every insert")
+
+    def handle(self, *args, **options):
+        counts = {model: model.objects.count() for model in REPORTED_MODELS}
+        start = time.perf_counter()
+        data = SyntheticData(options['seed'], options['batch_size'])
+        try:
+            with transaction.atomic(using=write_database()):
+                data.base(options['nodes'], cycles=1).plants(
+                    options['plants'], options['units'], options['cycles'], options['core'],
+                    options['follow_tasks'], options['cases'], options['assembly_tasks'], options['bp_out_tasks'],
+                    options['burn_up_points'], options['baffle_calculations'])
+        except IntegrityError as e:
+            raise CommandError("seed {} is already generated in this database: {}".format(options['seed'], e))
+        seconds = time.perf_counter() - start
+        for model in REPORTED_MODELS:
+            self.stdout.write("{:40} {:>10}".format(model._meta.db_table, model.objects.count() - counts[model]))
+        self.stdout.write("generated in {:.1f}s".format(seconds))
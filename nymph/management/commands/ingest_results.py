@@ -0,0 +1,26 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from nymph import results
+
+
+class Command(BaseCommand):
+    help = "parse outputs of completed tasks into binary result stores"
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', help="task model name like robintask")
+        parser.add_argument('ids', nargs='*', type=int, help="task ids, all completed tasks if not given")
+
+    def handle(self, *args, **options):
+        try:
+            model = apps.get_model('nymph', options['model'])
+        except LookupError as e:
+            raise CommandError(e)
+        tasks = model.objects.filter(status=6)
+        if options['ids']:
+            tasks = tasks.filter(pk__in=options['ids'])
+        for task in tasks.iterator():
+            index = results.ingest_task(task)
+            if index is None:
+                self.stdout.write("{} {}: no output".format(options['model'], task.pk))
+            else:
+                self.stdout.write("{} {}: {} arrays".format(options['model'], task.pk, len(index['arrays'])))
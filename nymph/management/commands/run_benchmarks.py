@@ -0,0 +1,71 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import setup_test_environment, teardown_test_environment
+from nymph.benchmarks import BENCHMARKS, DATA_OPTIONS, budget, measure
+from nymph.routers import write_database
+from nymph.synthetic import SyntheticData, CORE_ROWS
+
+
+class Command(BaseCommand):
+    help = "run the benchmarks of nymph hot paths on a synthetic test database, save the results as json " \
+           "and fail when a benchmark executes more queries than its budget"
+
+    def add_arguments(self, parser):
+        parser.add_argument('benchmarks', nargs='*', help="names of the benchmarks to run, all by default")
+        parser.add_argument('--output', help="json file the results are written to")
+        parser.add_argument('--compare', help="json file of earlier results to compare with")
+        parser.add_argument('--repeat', type=int, default=5, help="runs of every benchmark")
+        parser.add_argument('--seed', type=int, default=DATA_OPTIONS['seed'])
+        parser.add_argument('--plants', type=int, default=DATA_OPTIONS['plants'])
+        parser.add_argument('--cycles', type=int, default=DATA_OPTIONS['cycles'], help="cycles of every unit")
+        parser.add_argument('--core', type=int, choices=sorted(CORE_ROWS), default=DATA_OPTIONS['core'])
+        parser.add_argument('--materials', type=int, default=DATA_OPTIONS['materials'])
+        parser.add_argument('--keepdb', action='store_true', help="keep the test database")
+
+    def handle(self, *args, **options):
+        unknown = set(options['benchmarks']) - set(BENCHMARKS)
+        if unknown:
+            raise CommandError("unknown benchmarks: {}".format(", ".join(sorted(unknown))))
+        selected = [BENCHMARKS[name] for name in options['benchmarks'] or BENCHMARKS]
+        previous = {}
+        if options['compare']:
+            with open(options['compare']) as f:
+                previous = json.load(f)['benchmarks']
+        connection = connections[write_database()]
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            data = SyntheticData(options['seed']).base().plants(
+                options['plants'], cycles=options['cycles'], core=options['core']).materials(options['materials'])
+            budgets = {item.name: budget(item, data) for item in selected}
+            results = {item.name: measure(item, data, options['repeat']) for item in selected}
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        self.stdout.write("{:20} {:>10} {:>12} {:>8} {:>8} {:>10} {:>10}".format(
+            "benchmark", "ms", "peak KiB", "queries", "budget", "ms diff", "query diff"))
+        over = []
+        for item in selected:
+            result = results[item.name]
+            line = "{:20} {:10.2f} {:12.1f} {:8} {:8}".format(item.name, result.seconds * 1000,
+                                                             result.peak_bytes / 1024, result.queries,
+                                                             budgets[item.name])
+            if item.name in previous:
+                before = previous[item.name]
+                line += " {:+9.0%} {:+10}".format(result.seconds / max(before['seconds'], 1e-9) - 1,
+                                                  result.queries - before['queries'])
+            self.stdout.write(line)
+            if result.queries > budgets[item.name]:
+                over.append("{}: {} queries, budget {}".format(item.name, result.queries, budgets[item.name]))
+        if options['output']:
+            output = {
+                'options': dict({key: options[key] for key in DATA_OPTIONS}, repeat=options['repeat']),
+                'benchmarks': {name: dict(result._asdict(), budget=budgets[name])
+                               for name, result in results.items()},
+            }
+            with open(options['output'], 'w') as f:
+                json.dump(output, f, indent=2, sort_keys=True)
+        if over:
+            raise CommandError("over query budget: " + "; ".join(over))
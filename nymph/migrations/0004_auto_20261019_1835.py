@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9.9 on 2026-10-19 18:35
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('nymph', '0003_auto_20160908_1512'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskRuntimeStatistic',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('samples', models.PositiveIntegerField(default=0)),
+                ('total_workload', models.FloatField(default=0)),
+                ('total_seconds', models.FloatField(default=0)),
+                ('compute_node', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='runtime_statistics', to='nymph.ComputeNode')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.ContentType')),
+            ],
+            options={
+                'db_table': 'task_runtime_statistic',
+            },
+        ),
+        migrations.AddField(
+            model_name='fuelpelletmodel',
+            name='linear_density',
+            field=models.DecimalField(blank=True, decimal_places=5, help_text='B10 mg/cm', max_digits=10, null=True),
+        ),
+        migrations.AlterField(
+            model_name='assemblycut',
+            name='content_type',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to='contenttypes.ContentType'),
+        ),
+        migrations.AlterField(
+            model_name='assemblycut',
+            name='object_id',
+            field=models.PositiveIntegerField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name='fuelpelletmodel',
+            name='content_type',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to='contenttypes.ContentType'),
+        ),
+        migrations.AlterField(
+            model_name='fuelpelletmodel',
+            name='object_id',
+            field=models.PositiveIntegerField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name='material',
+            name='content_type',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to='contenttypes.ContentType'),
+        ),
+        migrations.AlterField(
+            model_name='material',
+            name='object_id',
+            field=models.PositiveIntegerField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name='robintask',
+            name='content_type',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to='contenttypes.ContentType'),
+        ),
+        migrations.AlterField(
+            model_name='robintask',
+            name='object_id',
+            field=models.PositiveIntegerField(editable=False),
+        ),
+        migrations.AlterUniqueTogether(
+            name='taskruntimestatistic',
+            unique_together=set([('compute_node', 'content_type')]),
+        ),
+    ]
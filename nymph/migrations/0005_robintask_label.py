@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9.9 on 2026-10-19 18:36
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nymph', '0004_auto_20261019_1835'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='robintask',
+            name='label',
+            field=models.CharField(blank=True, help_text='model type of baffle calculation or burn up point of bp out task', max_length=16),
+        ),
+    ]
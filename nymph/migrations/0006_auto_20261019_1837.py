@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9.9 on 2026-10-19 18:37
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import nymph.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nymph', '0005_robintask_label'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bpouttask',
+            name='burn_up_points',
+            field=models.CharField(help_text='GWd/tU separated by comma', max_length=128, validators=[nymph.models.validate_burn_up_points]),
+        ),
+    ]
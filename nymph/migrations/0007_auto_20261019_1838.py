@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9.9 on 2026-10-19 18:38
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nymph', '0006_auto_20261019_1837'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='egretfollowtask',
+            name='restart_case',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='egretfollowtask',
+            name='restart_task',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='restarted_tasks', to='nymph.EgretFollowTask'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9.9 on 2026-10-19 18:41
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('nymph', '0007_auto_20261019_1838'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskStatusChange',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField(editable=False)),
+                ('status', models.PositiveSmallIntegerField(choices=[(0, 'prepared'), (1, 'waiting'), (2, 'calculating'), (3, 'suspended'), (4, 'canceled'), (5, 'stopped'), (6, 'completed'), (7, 'error')])),
+                ('time', models.DateTimeField(auto_now_add=True)),
+                ('content_type', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to='contenttypes.ContentType')),
+            ],
+            options={
+                'db_table': 'task_status_change',
+            },
+        ),
+    ]
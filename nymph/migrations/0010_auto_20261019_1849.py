@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9.9 on 2026-10-19 18:49
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import nymph.models
+import nymph.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nymph', '0009_auto_20261019_1847'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='egretfollowtask',
+            name='input_file',
+            field=models.FileField(blank=True, null=True, storage=nymph.storage.DeduplicatedNymphStorage(), upload_to=nymph.models.custom_path),
+        ),
+        migrations.AlterField(
+            model_name='loadingpattern',
+            name='file',
+            field=models.FileField(storage=nymph.storage.DeduplicatedNymphStorage(), upload_to=nymph.models.custom_path),
+        ),
+        migrations.AlterField(
+            model_name='robintask',
+            name='input_file',
+            field=models.FileField(storage=nymph.storage.DeduplicatedNymphStorage(), upload_to=nymph.models.custom_path),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9.9 on 2026-10-19 18:57
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nymph', '0011_referencechange'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='assemblycut',
+            index_together=set([('content_type', 'object_id')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='assemblytask',
+            index_together=set([('status', 'compute_node')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='bafflecalculation',
+            index_together=set([('status', 'compute_node')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='egretfollowcase',
+            index_together=set([('follow_task', '_order')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='egretfollowtask',
+            index_together=set([('status', 'compute_node')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='egretsequencetask',
+            index_together=set([('status', 'compute_node')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='fuelassemblyloadingpattern',
+            index_together=set([('cycle', 'position')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='material',
+            index_together=set([('content_type', 'object_id')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='robintask',
+            index_together=set([('content_type', 'object_id'), ('status', 'compute_node')]),
+        ),
+    ]
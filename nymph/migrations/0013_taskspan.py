@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9.9 on 2026-10-19 19:14
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('nymph', '0012_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskSpan',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField(editable=False)),
+                ('name', models.CharField(max_length=32)),
+                ('start', models.DateTimeField()),
+                ('duration', models.FloatField(help_text='unit:s')),
+                ('depth', models.PositiveSmallIntegerField(default=0)),
+                ('compute_node', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='nymph.ComputeNode')),
+                ('content_type', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to='contenttypes.ContentType')),
+            ],
+            options={
+                'db_table': 'task_span',
+            },
+        ),
+        migrations.AlterIndexTogether(
+            name='taskspan',
+            index_together=set([('content_type', 'object_id')]),
+        ),
+    ]
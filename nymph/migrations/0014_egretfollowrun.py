@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9.9 on 2026-10-19 19:28
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nymph', '0013_taskspan'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EgretFollowRun',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cases', models.TextField()),
+                ('start_time', models.DateTimeField(auto_now_add=True)),
+                ('end_time', models.DateTimeField(blank=True, null=True)),
+                ('follow_task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='runs', to='nymph.EgretFollowTask')),
+            ],
+            options={
+                'db_table': 'egret_follow_run',
+            },
+        ),
+    ]
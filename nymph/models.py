@@ -1,11 +1,18 @@
+import logging
 import os
+import re
+from decimal import Decimal, InvalidOperation
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
-from django.db.models import Q
-from .storage import NymphStorage, get_file_root
+from django.db.models import Count, Q
+from .storage import DeduplicatedNymphStorage, Checkpoints, get_file_root
+from . import paths
+
+logger = logging.getLogger(__name__)
 
 
 # Create your models here.
@@ -235,6 +242,7 @@ class SymbolicMaterial(BaseModel):
 class Material(GenericModel):
     class Meta:
         db_table = "material"
+        index_together = [('content_type', 'object_id')]
 
 
 class Fuel(models.Model):
@@ -338,6 +346,7 @@ class AssemblyCut(GenericModel):
 
     class Meta:
         db_table = "assembly_cut"
+        index_together = [('content_type', 'object_id')]
 
 
 ########################################################################################################################
@@ -688,8 +697,7 @@ class Unit(BaseModel):
     reactor_model = models.ForeignKey(ReactorModel)
 
     def dir(self, user_id):
-        user = User.objects.get(id=id)
-        user_dir = user.profile.dir(self.plant_id)
+        user_dir = paths.user_dir(self.plant_id, user_id)
         return os.path.join(user_dir, "unit_" + str(self.unit_num))
 
     class Meta:
@@ -709,7 +717,7 @@ class Cycle(BaseModel):
                                        help_text=r"to pull out the control rod cluster at specific position")
 
     def dir(self, user_id):
-        unit_dir = self.unit.dir(user_id)
+        unit_dir = paths.unit_dir(self.unit_id, user_id)
         return os.path.join(unit_dir, "cycle_" + str(self.cycle_num))
 
     class Meta:
@@ -740,6 +748,7 @@ class FuelAssemblyLoadingPattern(models.Model):
 
     class Meta:
         db_table = 'fuel_assembly_loading_pattern'
+        index_together = [('cycle', 'position')]
 
 
 ########################################################################################################################
@@ -753,6 +762,34 @@ class ComputeNode(models.Model):
     class Meta:
         db_table = "compute_node"
 
+    def __str__(self):
+        return self.name
+
+
+class TaskRuntimeStatistic(models.Model):
+    """
+    accumulated runtime of completed tasks of one type on one compute node;
+    workload is the relative cost given by task.workload so that
+    total_seconds/total_workload is the node speed for that task type
+    """
+    compute_node = models.ForeignKey(ComputeNode, related_name="runtime_statistics")
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    samples = models.PositiveIntegerField(default=0)
+    total_workload = models.FloatField(default=0)
+    total_seconds = models.FloatField(default=0)
+
+    class Meta:
+        db_table = "task_runtime_statistic"
+        unique_together = ("compute_node", "content_type")
+
+    @property
+    def seconds_per_workload(self):
+        if self.total_workload > 0:
+            return self.total_seconds / self.total_workload
+
+    def __str__(self):
+        return "{} {}".format(self.compute_node, self.content_type)
+
 
 class AbstractTask(BaseModel):
     """
@@ -786,14 +823,123 @@ class AbstractTask(BaseModel):
     # input_file = models.FileField(upload_to=task_path, storage=NymphStorage(), blank=True, null=True)
     # authorized = models.BooleanField(default=False)
 
+    # status when loaded from database, used to detect status transitions on save
+    _loaded_status = None
+    # fields the directory of the task depends on, see nymph.paths
+    PATH_FIELDS = ()
+    _loaded_path = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'status' in field_names:
+            instance._loaded_status = values[field_names.index('status')]
+        if all(name in field_names for name in cls.PATH_FIELDS):
+            instance._loaded_path = instance.path_values()
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_status = self.status
+        self._loaded_path = self.path_values()
+
+    def path_values(self):
+        return tuple(getattr(self, name) for name in self.PATH_FIELDS)
+
     @property
     def time_cost(self):
         return self.end_time - self.start_time
 
+    # rows workload reads, loaded for many tasks at once by with_workload():
+    # the related name of the cases counted and the relations prefetched
+    WORKLOAD_CASES = None
+    WORKLOAD_PREFETCH = ()
+
+    @classmethod
+    def with_workload(cls, queryset):
+        """
+        queryset of tasks whose workload needs no further query
+        """
+        if cls.WORKLOAD_CASES is not None:
+            queryset = queryset.annotate(case_count=Count(cls.WORKLOAD_CASES))
+        return queryset.prefetch_related(*cls.WORKLOAD_PREFETCH)
+
+    def workload_cases(self):
+        """
+        number of WORKLOAD_CASES of the task, annotated as case_count by with_workload() or counted
+        """
+        count = getattr(self, 'case_count', None)
+        if count is None:
+            count = getattr(self, self.WORKLOAD_CASES + '_set').count()
+        return count
+
+    @property
+    def workload(self):
+        """
+        relative cost of the task used by the scheduler to predict its runtime
+        """
+        return 1
+
+    def child_workload(self, label):
+        """
+        workload of one robin task generated by this task, label is the robin task label
+        """
+        return self.workload
+
+    def checkpoints(self):
+        """
+        restart files saved by the compute node, a suspended task resumes from the latest one;
+        a task group is calculated by its robin tasks, which hold the checkpoints
+        """
+        if hasattr(self, 'child_labels'):
+            raise ValueError("checkpoints of a task group are those of its robin tasks")
+        return Checkpoints(self.dir())
+
     class Meta:
         abstract = True
 
 
+class TaskStatusChange(GenericModel):
+    """
+    log of task status transitions, tailed by id to push progress to clients
+    """
+    status = models.PositiveSmallIntegerField(choices=AbstractTask.STATUS_CHOICES)
+    time = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "task_status_change"
+
+
+class TaskSpan(GenericModel):
+    """
+    timing of one phase of a task, see nymph.spans
+    depth: 0 for a span opened outside any other, spans of larger depth are nested in time
+    """
+    name = models.CharField(max_length=32)
+    compute_node = models.ForeignKey(ComputeNode, blank=True, null=True, on_delete=models.SET_NULL,
+                                     related_name='+')
+    start = models.DateTimeField()
+    duration = models.FloatField(help_text='unit:s')
+    depth = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        db_table = "task_span"
+        index_together = [('content_type', 'object_id')]
+
+
+class ReferenceChange(models.Model):
+    """
+    log of saved or deleted reference rows, tailed by id so every process drops its stale cache entries
+    model: label like nymph.rod
+    """
+    model = models.CharField(max_length=100)
+    object_id = models.PositiveIntegerField()
+    time = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        db_table = "reference_change"
+
+
 class AssemblyCalculation(BaseModel):
     reactor_model = models.ForeignKey(ReactorModel)
     fuel_assembly_type = models.ForeignKey(FuelAssemblyType)
@@ -844,6 +990,34 @@ NUM_GROUP_2D_CHOICES = (
 )
 
 
+# smallest track density the field stores, used for 0 which the validator allows
+MIN_TRACK_DENSITY = 0.00001
+
+
+def transport_workload(track_density, polar_azimuth, num_group_2D):
+    """
+    relative cost of one transport calculation:
+    number of tracks grows with polar*azimuth angles over track density and each group is swept
+    """
+    angles = 1
+    for item in str(polar_azimuth).split(','):
+        if item.strip():
+            angles *= int(item)
+    return angles * num_group_2D / max(float(track_density or 0), MIN_TRACK_DENSITY)
+
+
+def branch_values(min_value, max_value, interval):
+    """
+    values from min_value by interval, max_value included even off the step grid
+    """
+    if not interval or max_value <= min_value:
+        return [min_value]
+    values = list(range(min_value, max_value + 1, interval))
+    if values[-1] < max_value:
+        values.append(max_value)
+    return values
+
+
 class AssemblyTask(AbstractTask):
     """
     one layer for assembly
@@ -897,21 +1071,121 @@ class AssemblyTask(AbstractTask):
 
     robin_tasks = GenericRelation("RobinTask")
 
+    def branch_axes(self):
+        """
+        branch values of boron density, fuel temperature and moderator temperature
+        """
+        return (
+            ('boron_density', branch_values(self.min_boron_density, self.max_boron_density,
+                                            self.boron_density_interval)),
+            ('fuel_temperature', branch_values(self.min_fuel_temperature, self.max_fuel_temperature,
+                                               self.fuel_temperature_interval)),
+            ('moderator_temperature', branch_values(self.min_moderator_temperature, self.max_moderator_temperature,
+                                                    self.moderator_temperature_interval)),
+        )
+
+    @property
+    def branch_count(self):
+        """
+        number of boron * fuel temperature * moderator temperature branches
+        """
+        count = 1
+        for name, values in self.branch_axes():
+            count *= len(values)
+        return count
+
+    @property
+    def workload(self):
+        return self.branch_count * transport_workload(self.track_density, self.polar_azimuth, self.num_group_2D)
+
+    PATH_FIELDS = ('reactor_model_id',)
+
     def dir(self):
-        reactor_model_dir = self.reactor_model.dir()
+        reactor_model_dir = paths.reactor_model_dir(self.reactor_model_id)
         return os.path.join(reactor_model_dir, "assembly_task", "task_" + str(self.pk))
 
     class Meta:
         db_table = "assembly_task"
+        index_together = [('status', 'compute_node')]
+
+
+# burn up points are kept to this precision, GWd/tU
+BURN_UP_PRECISION = Decimal('0.001')
+# a burn up point labels its robin task
+LABEL_LENGTH = 16
+
+
+def burn_up_label(point):
+    """
+    shortest plain notation of a burn up point like 10 or 10.5
+    """
+    text = format(point, 'f')
+    return text.rstrip('0').rstrip('.') if '.' in text else text
+
+
+def parse_burn_up_points(value, strict=True):
+    """
+    burn up points separated by comma or blank space like "0,10.5,20";
+    return sorted distinct Decimal rounded to BURN_UP_PRECISION.
+    invalid items raise ValidationError, or are logged and skipped if not strict
+    """
+    points = []
+    for item in re.split(r'[,\s]+', (value or '').strip()):
+        if not item:
+            continue
+        try:
+            point = Decimal(item)
+            if not point.is_finite() or point < 0:
+                raise InvalidOperation
+            point = point.quantize(BURN_UP_PRECISION)
+        except InvalidOperation:
+            point = None
+        if point is None or len(burn_up_label(point)) > LABEL_LENGTH:
+            if strict:
+                raise ValidationError("invalid burn up point: {}".format(item))
+            logger.warning("invalid burn up point skipped: %r", item)
+            continue
+        if point not in points:
+            points.append(point)
+    if not points and strict:
+        raise ValidationError("at least one burn up point is needed")
+    return sorted(points)
+
+
+def validate_burn_up_points(value):
+    parse_burn_up_points(value)
 
 
 class BPOutTask(AssemblyTask):
-    burn_up_points = models.CharField(max_length=128)
+    burn_up_points = models.CharField(max_length=128, validators=[validate_burn_up_points],
+                                      help_text='GWd/tU separated by comma')
     robin_tasks = GenericRelation("RobinTask")
 
-    def dir(self,burn_up_point):
+    def get_burn_up_points(self):
+        # rows saved before validation may hold invalid points, those are skipped
+        return parse_burn_up_points(self.burn_up_points, strict=False)
+
+    def child_labels(self):
+        """
+        each burn up point is calculated by its own robin task
+        """
+        return [burn_up_label(point) for point in self.get_burn_up_points()]
+
+    def child_workload(self, label):
+        return super().workload
+
+    @property
+    def workload(self):
+        return len(self.get_burn_up_points()) * super().workload
+
+    def dir(self, burn_up_point=None):
+        """
+        directory of the burn up point, of the whole task without one
+        """
         base = super().dir()
-        return os.path.join(base, "bp_out_task", "burn_up_" + str(burn_up_point))
+        if burn_up_point is None:
+            return base
+        return os.path.join(base, "bp_out_task", "burn_up_" + burn_up_label(Decimal(str(burn_up_point))))
 
     class Meta:
         db_table = "bp_out_task"
@@ -941,27 +1215,60 @@ class BaffleCalculation(AbstractTask):
     robin_tasks = GenericRelation("RobinTask")
 
     MODEL_TYPES = ['BR1', 'BR2', 'BR3', 'BR_BOT', 'BR_TOP']
+    PATH_FIELDS = ('assembly_task_id',)
 
-    def dir(self, model_type):
-        base = self.assembly_task.dir()
-        return os.path.join(base, "baffle_task", model_type)
+    @property
+    def workload(self):
+        return len(self.MODEL_TYPES) * self.child_workload(None)
+
+    def child_workload(self, label):
+        return transport_workload(self.track_density, self.polar_azimuth, self.num_group_2D)
+
+    def child_labels(self):
+        """
+        each model type is calculated by its own robin task
+        """
+        return self.MODEL_TYPES
+
+    def dir(self, model_type=None):
+        """
+        directory of the model type, of the whole calculation without one
+        """
+        base = os.path.join(paths.assembly_task_dir(self.assembly_task_id), "baffle_task")
+        if model_type is None:
+            return base
+        return os.path.join(base, model_type)
 
     class Meta:
         db_table = "baffle_calculation"
+        index_together = [('status', 'compute_node')]
 
 
 class RobinTask(AbstractTask, GenericModel):
-    input_file = models.FileField(upload_to=custom_path, storage=NymphStorage())
+    input_file = models.FileField(upload_to=custom_path, storage=DeduplicatedNymphStorage())
+    label = models.CharField(max_length=LABEL_LENGTH, blank=True,
+                             help_text="model type of baffle calculation or burn up point of bp out task")
 
     @property
     def reactor_model(self):
-        return self.content_object.reactor_model
+        group = self.content_object
+        # a baffle calculation reaches its reactor model through its assembly task
+        if isinstance(group, BaffleCalculation):
+            return group.assembly_task.reactor_model
+        return group.reactor_model
+
+    WORKLOAD_PREFETCH = ('content_object',)
+
+    @property
+    def workload(self):
+        return self.content_object.child_workload(self.label)
 
     def dir(self):
-        return os.path.join(self.reactor_model.name, "robin_task", "task_" + self.id)
+        return paths.robin_task_dir(self.id, self.content_type_id, self.object_id)
 
     class Meta:
         db_table = "robin_task"
+        index_together = [('status', 'compute_node'), ('content_type', 'object_id')]
 
 
 class IdyllTask:
@@ -979,15 +1286,14 @@ class LoadingPattern(BaseModel):
     user = models.ForeignKey(User)
     pre_loading_pattern = models.ForeignKey('self', related_name='post_loading_patterns', blank=True, null=True)
     cycle = models.ForeignKey(Cycle)
-    file = models.FileField(upload_to=custom_path)
+    file = models.FileField(upload_to=custom_path, storage=DeduplicatedNymphStorage())
     authorized = models.BooleanField(default=False)
 
     class Meta:
         db_table = "loading_pattern"
 
     def dir(self):
-        user_id = self.user.id
-        cycle_dir = self.cycle.dir(user_id)
+        cycle_dir = paths.cycle_dir(self.cycle_id, self.user_id)
         return os.path.join(cycle_dir, "loading_pattern", "pattern_" + str(self.id))
 
 
@@ -1013,7 +1319,7 @@ class ControlRodClusterStep(models.Model):
 
 class EgretTask(AbstractTask):
     loading_pattern = models.ForeignKey(LoadingPattern)
-    input_file = models.FileField(upload_to=custom_path,storage=NymphStorage(),blank=True, null=True,)
+    input_file = models.FileField(upload_to=custom_path,storage=DeduplicatedNymphStorage(),blank=True, null=True,)
     pre_egret_task = models.ForeignKey('self', related_name='post_egret_tasks', blank=True, null=True)
     authorized = models.BooleanField(default=False)
 
@@ -1021,8 +1327,7 @@ class EgretTask(AbstractTask):
         abstract = True
 
     def dir(self):
-        user_id = self.user.id
-        cycle_dir = self.cycle.dir(user_id)
+        cycle_dir = paths.loading_pattern_cycle_dir(self.loading_pattern_id, self.user_id)
         return os.path.join(cycle_dir, "egret_task", "task_" + str(self.id))
 
     @property
@@ -1031,8 +1336,44 @@ class EgretTask(AbstractTask):
 
 
 class EgretFollowTask(EgretTask):
+    """
+    restart_task: the task, possibly this one, of an earlier run of the same follow whose saved state is reused
+    restart_case: number of leading cases taken from restart_task, calculation starts from the next case
+    """
+    restart_task = models.ForeignKey('self', related_name='restarted_tasks', blank=True, null=True,
+                                     on_delete=models.SET_NULL)
+    restart_case = models.PositiveSmallIntegerField(default=0)
+
     class Meta:
         db_table = "egret_follow_task"
+        index_together = [('status', 'compute_node')]
+
+    WORKLOAD_CASES = 'egretfollowcase'
+
+    @property
+    def workload(self):
+        return max(self.workload_cases() - self.restart_case, 1)
+
+    def restart_file(self, case_index):
+        """
+        state saved by egret after the case with index case_index(from 0)
+        """
+        return os.path.join(self.dir(), "restart", "case_" + str(case_index))
+
+
+class EgretFollowRun(models.Model):
+    """
+    cases of one run of a follow task, compared by later runs to restart from the last unchanged case
+    cases: JSON list of the case signatures, see nymph.follow
+    end_time: set when the run completes, only completed runs are restarted from
+    """
+    follow_task = models.ForeignKey(EgretFollowTask, related_name='runs')
+    cases = models.TextField()
+    start_time = models.DateTimeField(auto_now_add=True)
+    end_time = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = "egret_follow_run"
 
 
 class EgretFollowCase(models.Model):
@@ -1049,6 +1390,7 @@ class EgretFollowCase(models.Model):
 
     class Meta:
         db_table = "egret_follow_case"
+        index_together = [('follow_task', '_order')]
         order_with_respect_to = "follow_task"
 
 
@@ -1064,6 +1406,13 @@ class EgretSequenceTask(AbstractTask):
 
     class Meta:
         db_table = "egret_sequence_task"
+        index_together = [('status', 'compute_node')]
+
+    WORKLOAD_CASES = 'egretsequencecase'
+
+    @property
+    def workload(self):
+        return max(self.workload_cases(), 1)
 
 
 class EgretSequenceCase(models.Model):
@@ -0,0 +1,203 @@
+"""
+orphan directories of the storage root
+
+the directories expected under get_file_root() are given by dir() of every row (see the models and paths):
+a task or a loading pattern owns its directory and everything below it, e.g. its checkpoints; the directories
+of plants, reactor models, users, units and cycles and every level above an owned directory hold other rows.
+they are resolved with a few queries per model, then the tree is walked by a pool of os.scandir workers:
+levels holding rows are descended, owned directories and names not managed by nymph (e.g. the blobs of
+DeduplicatedNymphStorage) are kept, the other directories of a managed name are orphans. orphans are measured
+by the same pool and removed on request.
+directories modified after the database snapshot minus min_age are kept, they may belong to new rows.
+"""
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from django.core.exceptions import ObjectDoesNotExist
+from . import paths
+from .storage import get_file_root
+
+CONTAINER = 'container'
+KEEP = 'keep'
+ORPHAN = 'orphan'
+MANAGED = re.compile(r'^(plant|user|unit|cycle|task|pattern)_(\d+)$')
+
+
+class ExpectedPaths:
+    """
+    directories expected from the database, as tuples of names from the storage root
+    """
+
+    def __init__(self):
+        from .models import (Plant, ReactorModel, Profile, Unit, Cycle, LoadingPattern, AssemblyTask,
+                             BaffleCalculation, RobinTask, EgretFollowTask)
+        self.time = time.time()
+        self.root = get_file_root()
+        self.owned = set()
+        self.containers = set()
+        # users whose rows no longer resolve, e.g. not given the plant any more, their directories are kept
+        self.unresolved_users = set()
+        for obj in list(Plant.objects.all()) + list(ReactorModel.objects.all()):
+            self._add(self.containers, obj.dir())
+        profiles = list(Profile.objects.prefetch_related('plants'))
+        paths.warm(profiles)
+        users = {}
+        for profile in profiles:
+            for plant in profile.plants.all():
+                users.setdefault(plant.pk, []).append(profile.user_id)
+                self._add(self.containers, paths.user_dir(plant.pk, profile.user_id))
+        for unit in Unit.objects.all():
+            for user_id in users.get(unit.plant_id, ()):
+                self._add(self.containers, unit.dir(user_id))
+        cycles = list(Cycle.objects.select_related('unit'))
+        paths.warm(cycles)
+        for cycle in cycles:
+            for user_id in users.get(cycle.unit.plant_id, ()):
+                self._add(self.containers, cycle.dir(user_id))
+        for model in (LoadingPattern, AssemblyTask, BaffleCalculation, RobinTask, EgretFollowTask):
+            objects = list(model.objects.all())
+            paths.warm(objects)
+            for obj in objects:
+                try:
+                    self._add(self.owned, obj.dir())
+                except ObjectDoesNotExist:
+                    self.unresolved_users.add(obj.user_id)
+
+    def _add(self, target, path):
+        parts = tuple(os.path.relpath(path, self.root).split(os.sep))
+        target.add(parts)
+        self.containers.update(parts[:depth] for depth in range(1, len(parts)))
+
+    def classify(self, parts):
+        """
+        parts: names of the directory from the storage root
+        """
+        if parts in self.owned:
+            return KEEP
+        if parts in self.containers:
+            return CONTAINER
+        match = MANAGED.match(parts[-1])
+        if match is None or match.group(1) == 'user' and int(match.group(2)) in self.unresolved_users:
+            return KEEP
+        return ORPHAN
+
+
+class Orphan:
+    def __init__(self, path):
+        self.path = path
+        self.files = 0
+        self.bytes = 0
+        self.removed = False
+
+
+class Report:
+    def __init__(self):
+        self.orphans = []
+        self.directories = 0
+        self.entries = 0
+        self.recent = 0
+        self.seconds = 0.0
+
+    @property
+    def files(self):
+        return sum(orphan.files for orphan in self.orphans)
+
+    @property
+    def bytes(self):
+        return sum(orphan.bytes for orphan in self.orphans)
+
+    @property
+    def entries_per_second(self):
+        return self.entries / self.seconds if self.seconds else 0.0
+
+
+class Collector:
+    """
+    Collector().run() reports orphans, Collector(remove=True).run() also removes them
+    """
+
+    def __init__(self, root=None, remove=False, workers=16, min_age=3600, expected=None):
+        self.root = root or get_file_root()
+        self.remove = remove
+        self.workers = workers
+        self.min_age = min_age
+        self.expected = expected or ExpectedPaths()
+
+    def _scan(self, path, parts):
+        """
+        (directories to descend, orphans, number of entries) of one directory
+        """
+        containers = []
+        orphans = []
+        recent = 0
+        count = 0
+        with os.scandir(path) as entries:
+            for entry in entries:
+                count += 1
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                child = parts + (entry.name,)
+                kind = self.expected.classify(child)
+                if kind == CONTAINER:
+                    containers.append((entry.path, child))
+                elif kind == ORPHAN:
+                    if entry.stat(follow_symlinks=False).st_mtime > self.expected.time - self.min_age:
+                        recent += 1
+                    else:
+                        orphans.append(Orphan(entry.path))
+        return containers, orphans, count, recent
+
+    @staticmethod
+    def _measure(path):
+        """
+        (files, bytes, sub directories, number of entries) of one directory of an orphan
+        """
+        files = 0
+        size = 0
+        directories = []
+        count = 0
+        with os.scandir(path) as entries:
+            for entry in entries:
+                count += 1
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                else:
+                    files += 1
+                    size += entry.stat(follow_symlinks=False).st_size
+        return files, size, directories, count
+
+    def run(self):
+        report = Report()
+        start = time.time()
+        with ThreadPoolExecutor(self.workers) as executor:
+            pending = {executor.submit(self._scan, self.root, ()): None}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    orphan = pending.pop(future)
+                    report.directories += 1
+                    if orphan is None:
+                        containers, orphans, count, recent = future.result()
+                        report.recent += recent
+                        for path, parts in containers:
+                            pending[executor.submit(self._scan, path, parts)] = None
+                        for item in orphans:
+                            report.orphans.append(item)
+                            pending[executor.submit(self._measure, item.path)] = item
+                    else:
+                        files, size, directories, count = future.result()
+                        orphan.files += files
+                        orphan.bytes += size
+                        for path in directories:
+                            pending[executor.submit(self._measure, path)] = orphan
+                    report.entries += count
+            if self.remove:
+                for orphan, future in [(orphan, executor.submit(shutil.rmtree, orphan.path))
+                                       for orphan in report.orphans]:
+                    future.result()
+                    orphan.removed = True
+        report.orphans.sort(key=lambda orphan: orphan.path)
+        report.seconds = time.time() - start
+        return report
@@ -0,0 +1,241 @@
+"""
+storage path resolver
+
+a directory only depends on a few ids and numbers up the plant/unit/cycle chain,
+they are kept in a process cache so dir() needs at most one query instead of one per level.
+each entry holds the fields of one row, the least recently used entries are dropped beyond MAX_ENTRIES.
+an entry is dropped when its row is saved or deleted, by this process at once and by the others
+when they read the change log before a lookup (see signals and invalidation).
+reactor model names come from the replica of reference reads, from the write database within the replica lag
+of a change like the reference cache (see cache.fresh).
+a directory under a plant is only given to users having the plant in their profile.
+bulk_dirs() resolves the directories of a list of objects with one query per level of missing entries.
+"""
+import os
+import threading
+from collections import OrderedDict
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from . import cache
+from .storage import get_file_root
+
+MAX_ENTRIES = 100000
+# models whose rows hold cached entries, changes of their rows are logged for the other processes
+MODELS = ('unit', 'cycle', 'loadingpattern', 'reactormodel', 'assemblytask', 'bafflecalculation', 'profile')
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def _set(key, value):
+    with _lock:
+        _cache[key] = value
+        _cache.move_to_end(key)
+        if len(_cache) > MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+
+def _get(key):
+    with _lock:
+        value = _cache.get(key)
+        if value is not None:
+            _cache.move_to_end(key)
+        return value
+
+
+def invalidate(model_name, pk):
+    with _lock:
+        _cache.pop((model_name, pk), None)
+
+
+def clear():
+    with _lock:
+        _cache.clear()
+
+
+########################################################################################################################
+# loaders fill the entries of every level of the chain from one query
+########################################################################################################################
+def _load_units(ids):
+    Unit = apps.get_model('nymph', 'Unit')
+    for pk, plant_id, unit_num in Unit.objects.filter(pk__in=ids).values_list('pk', 'plant_id', 'unit_num'):
+        _set(('unit', pk), (plant_id, unit_num))
+
+
+def _load_cycles(ids):
+    Cycle = apps.get_model('nymph', 'Cycle')
+    for row in Cycle.objects.filter(pk__in=ids).values_list('pk', 'cycle_num', 'unit_id', 'unit__plant_id',
+                                                            'unit__unit_num'):
+        pk, cycle_num, unit_id, plant_id, unit_num = row
+        _set(('cycle', pk), (unit_id, cycle_num))
+        _set(('unit', unit_id), (plant_id, unit_num))
+
+
+def _load_loading_patterns(ids):
+    LoadingPattern = apps.get_model('nymph', 'LoadingPattern')
+    for row in LoadingPattern.objects.filter(pk__in=ids).values_list('pk', 'cycle_id', 'cycle__cycle_num',
+                                                                     'cycle__unit_id', 'cycle__unit__plant_id',
+                                                                     'cycle__unit__unit_num'):
+        pk, cycle_id, cycle_num, unit_id, plant_id, unit_num = row
+        _set(('loadingpattern', pk), cycle_id)
+        _set(('cycle', cycle_id), (unit_id, cycle_num))
+        _set(('unit', unit_id), (plant_id, unit_num))
+
+
+def _load_profiles(user_ids):
+    """
+    plants of the profile of every user, no plant for a user without profile
+    """
+    Profile = apps.get_model('nymph', 'Profile')
+    plants = {user_id: set() for user_id in user_ids}
+    for user_id, plant_id in Profile.plants.through.objects.filter(profile__user__in=user_ids).values_list(
+            'profile__user_id', 'plant_id'):
+        plants[user_id].add(plant_id)
+    for user_id, plant_ids in plants.items():
+        _set(('profile', user_id), frozenset(plant_ids))
+
+
+def _load_reactor_models(ids):
+    ReactorModel = apps.get_model('nymph', 'ReactorModel')
+    # a reference model read from the replica, which may not have a recent change yet
+    with cache.fresh([ReactorModel]):
+        rows = list(ReactorModel.objects.filter(pk__in=ids).values_list('pk', 'name'))
+    for pk, name in rows:
+        _set(('reactormodel', pk), name)
+
+
+def _load_assembly_tasks(ids):
+    AssemblyTask = apps.get_model('nymph', 'AssemblyTask')
+    for pk, reactor_model_id, name in AssemblyTask.objects.filter(pk__in=ids).values_list('pk', 'reactor_model_id',
+                                                                                         'reactor_model__name'):
+        _set(('assemblytask', pk), reactor_model_id)
+        _set(('reactormodel', reactor_model_id), name)
+
+
+def _load_baffle_calculations(ids):
+    BaffleCalculation = apps.get_model('nymph', 'BaffleCalculation')
+    for pk, assembly_task_id, reactor_model_id, name in BaffleCalculation.objects.filter(pk__in=ids).values_list(
+            'pk', 'assembly_task_id', 'assembly_task__reactor_model_id', 'assembly_task__reactor_model__name'):
+        _set(('bafflecalculation', pk), assembly_task_id)
+        _set(('assemblytask', assembly_task_id), reactor_model_id)
+        _set(('reactormodel', reactor_model_id), name)
+
+
+def _refresh():
+    from .invalidation import feed
+    feed.poll()
+
+
+def _lookup(model_name, pk, loader):
+    # drop the entries changed by other processes before serving one
+    _refresh()
+    value = _get((model_name, pk))
+    if value is None:
+        loader([pk])
+        value = _get((model_name, pk))
+        if value is None:
+            model = apps.get_model('nymph', model_name)
+            raise model.DoesNotExist("{} {} does not exist".format(model_name, pk))
+    return value
+
+
+########################################################################################################################
+# directories
+########################################################################################################################
+def plant_dir(plant_id):
+    return os.path.join(get_file_root(), "plant_" + str(plant_id))
+
+
+def user_dir(plant_id, user_id):
+    """
+    raise Plant.DoesNotExist if the plant is not in the profile of the user
+    """
+    if plant_id not in _lookup('profile', user_id, _load_profiles):
+        Plant = apps.get_model('nymph', 'Plant')
+        raise Plant.DoesNotExist("plant {} is not in the profile of user {}".format(plant_id, user_id))
+    return os.path.join(plant_dir(plant_id), "user_" + str(user_id))
+
+
+def unit_dir(unit_id, user_id):
+    plant_id, unit_num = _lookup('unit', unit_id, _load_units)
+    return os.path.join(user_dir(plant_id, user_id), "unit_" + str(unit_num))
+
+
+def cycle_dir(cycle_id, user_id):
+    unit_id, cycle_num = _lookup('cycle', cycle_id, _load_cycles)
+    return os.path.join(unit_dir(unit_id, user_id), "cycle_" + str(cycle_num))
+
+
+def loading_pattern_cycle_dir(loading_pattern_id, user_id):
+    cycle_id = _lookup('loadingpattern', loading_pattern_id, _load_loading_patterns)
+    return cycle_dir(cycle_id, user_id)
+
+
+def reactor_model_dir(reactor_model_id):
+    name = _lookup('reactormodel', reactor_model_id, _load_reactor_models)
+    return os.path.join(get_file_root(), name)
+
+
+def assembly_task_dir(assembly_task_id):
+    reactor_model_id = _lookup('assemblytask', assembly_task_id, _load_assembly_tasks)
+    return os.path.join(reactor_model_dir(reactor_model_id), "assembly_task", "task_" + str(assembly_task_id))
+
+
+def robin_task_dir(robin_task_id, content_type_id, object_id):
+    """
+    under the reactor model of the task group, a BPOutTask or the assembly task of a BaffleCalculation
+    """
+    if ContentType.objects.get_for_id(content_type_id).model == 'bafflecalculation':
+        object_id = _lookup('bafflecalculation', object_id, _load_baffle_calculations)
+    reactor_model_id = _lookup('assemblytask', object_id, _load_assembly_tasks)
+    return os.path.join(reactor_model_dir(reactor_model_id), "robin_task", "task_" + str(robin_task_id))
+
+
+########################################################################################################################
+# bulk resolution
+########################################################################################################################
+def warm(objects):
+    """
+    load the missing entries needed by dir() of objects, one query per kind of entry
+    """
+    from .models import EgretTask
+    _refresh()
+    missing = {name: set() for name in ('bafflecalculation', 'loadingpattern', 'cycle', 'unit', 'profile',
+                                        'reactormodel', 'assemblytask')}
+    for obj in objects:
+        model_name = obj._meta.model_name
+        if isinstance(obj, EgretTask):
+            missing['loadingpattern'].add(obj.loading_pattern_id)
+            missing['profile'].add(obj.user_id)
+        elif model_name == 'loadingpattern':
+            missing['cycle'].add(obj.cycle_id)
+            missing['profile'].add(obj.user_id)
+        elif model_name == 'cycle':
+            missing['unit'].add(obj.unit_id)
+        elif model_name == 'profile':
+            missing['profile'].add(obj.user_id)
+        elif model_name in ('assemblytask', 'bpouttask'):
+            missing['reactormodel'].add(obj.reactor_model_id)
+        elif model_name == 'bafflecalculation':
+            missing['assemblytask'].add(obj.assembly_task_id)
+        elif model_name == 'robintask':
+            if ContentType.objects.get_for_id(obj.content_type_id).model == 'bafflecalculation':
+                missing['bafflecalculation'].add(obj.object_id)
+            else:
+                missing['assemblytask'].add(obj.object_id)
+    loaders = (('bafflecalculation', _load_baffle_calculations), ('loadingpattern', _load_loading_patterns),
+               ('cycle', _load_cycles), ('unit', _load_units), ('profile', _load_profiles),
+               ('reactormodel', _load_reactor_models), ('assemblytask', _load_assembly_tasks))
+    for model_name, loader in loaders:
+        ids = [pk for pk in missing[model_name] if pk is not None and _get((model_name, pk)) is None]
+        if ids:
+            loader(ids)
+
+
+def bulk_dirs(objects):
+    """
+    {pk: dir()} of objects whose dir() takes no argument, e.g. a page of EgretFollowTask
+    """
+    objects = list(objects)
+    warm(objects)
+    return {obj.pk: obj.dir() for obj in objects}
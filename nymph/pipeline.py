@@ -0,0 +1,199 @@
+"""
+dependency graph of calculation tasks
+
+a task depends on every task its foreign keys point to, e.g.
+BaffleCalculation.assembly_task, EgretFollowTask.pre_egret_task, EgretSequenceTask.follow_task,
+except those of REUSE_FIELDS pointing to a task whose saved results are reused, possibly the task itself.
+robin tasks are not nodes of the graph: they are the calculation of their task (see fanout).
+a prepared task is released as soon as all its dependencies are completed, an egret task only once
+it is authorized;
+tasks released together are dispatched together so independent branches run concurrently.
+"""
+import logging
+from collections import OrderedDict
+from django.contrib.contenttypes.models import ContentType
+from .models import AbstractTask, RobinTask
+from . import fanout, scheduler
+
+COMPLETED = 6
+# a dependency in these status will never complete without user action
+FAILED_STATUS = (4, 5, 7)
+# foreign keys to a task whose saved state is reused, not waited for (see nymph.follow)
+REUSE_FIELDS = ('restart_task',)
+
+logger = logging.getLogger(__name__)
+
+
+def dependency_fields(model):
+    """
+    foreign keys of model to another task, parent link of multi-table inheritance and REUSE_FIELDS excluded
+    """
+    fields = []
+    for field in model._meta.get_fields():
+        if not (field.many_to_one or field.one_to_one) or not field.concrete or field.auto_created:
+            continue
+        if getattr(field.remote_field, 'parent_link', False) or field.name in REUSE_FIELDS:
+            continue
+        if issubclass(field.related_model, AbstractTask) and field.related_model is not RobinTask:
+            fields.append(field)
+    return fields
+
+
+def dependencies(task):
+    result = []
+    for field in dependency_fields(type(task)):
+        dependency = getattr(task, field.name)
+        # a task never waits for itself
+        if dependency is not None and key(dependency) != key(task):
+            result.append(dependency)
+    return result
+
+
+def dependents(task):
+    """
+    tasks having a foreign key to task
+    """
+    result = []
+    for model in scheduler.task_models():
+        for field in dependency_fields(model):
+            if isinstance(task, field.related_model):
+                result.extend(model.objects.filter(**{field.name: task.pk}))
+    return result
+
+
+def key(task):
+    return task._meta.label_lower, task.pk
+
+
+def is_authorized(task):
+    """
+    egret tasks wait for the authorization of their user, other tasks need none
+    """
+    return getattr(task, 'authorized', True)
+
+
+def is_ready(task):
+    return task.status == 0 and is_authorized(task) and all(item.status == COMPLETED for item in dependencies(task))
+
+
+def release(tasks, nodes=None):
+    """
+    dispatch tasks at once: task groups fan out to their robin tasks, others are dispatched directly
+    """
+    single = []
+    for task in tasks:
+        if fanout.is_group(task):
+            fanout.fan_out(task, nodes)
+        else:
+            single.append(task)
+    if single:
+        scheduler.dispatch(single, nodes)
+    return tasks
+
+
+def release_dependents(task, nodes=None):
+    """
+    called on commit when task completes: release the prepared dependents whose dependencies are all completed;
+    a failure is logged since the completion of task is already committed
+    """
+    try:
+        return release([item for item in dependents(task) if is_ready(item)], nodes)
+    except Exception:
+        logger.exception("failed to release the dependents of %s %s", task._meta.model_name, task.pk)
+        return []
+
+
+class Pipeline:
+    """
+    graph of the given tasks and all their dependencies
+    """
+
+    def __init__(self, tasks):
+        self.tasks = OrderedDict()
+        self.edges = OrderedDict()
+        pending = list(tasks)
+        while pending:
+            task = pending.pop()
+            if key(task) in self.tasks:
+                continue
+            self.tasks[key(task)] = task
+            self.edges[key(task)] = []
+            for dependency in dependencies(task):
+                self.edges[key(task)].append(key(dependency))
+                pending.append(dependency)
+
+    def topological_order(self):
+        order = []
+        visited = set()
+
+        def visit(node):
+            if node in visited:
+                return
+            visited.add(node)
+            for dependency in self.edges[node]:
+                visit(dependency)
+            order.append(node)
+
+        for node in self.tasks:
+            visit(node)
+        return order
+
+    def ready(self):
+        return [task for node, task in self.tasks.items()
+                if task.status == 0 and is_authorized(task) and
+                all(self.tasks[item].status == COMPLETED for item in self.edges[node])]
+
+    def blocked(self):
+        """
+        prepared tasks which can not start because a dependency failed
+        """
+        failed = set(node for node, task in self.tasks.items() if task.status in FAILED_STATUS)
+        result = []
+        for node in self.topological_order():
+            if any(item in failed for item in self.edges[node]):
+                failed.add(node)
+                if self.tasks[node].status == 0:
+                    result.append(self.tasks[node])
+        return result
+
+    def run(self, nodes=None):
+        """
+        release every ready task, the rest is released by release_dependents when their inputs complete
+        """
+        return release(self.ready(), nodes)
+
+    def expected_seconds(self, task, runtime_model):
+        if task.status == COMPLETED and task.start_time and task.end_time:
+            return task.time_cost.total_seconds()
+        if fanout.is_group(task):
+            # robin tasks of a group run concurrently
+            robin_type = ContentType.objects.get_for_model(RobinTask)
+            rate = runtime_model.seconds_per_workload(None, robin_type.id)
+            return max([task.child_workload(label) * rate for label in task.child_labels()] or [0])
+        return runtime_model.predict(task, task.compute_node_id)
+
+    def critical_path(self):
+        """
+        longest chain of dependent tasks weighted by actual or predicted runtime;
+        return (tasks on the path from first to last, total seconds)
+        """
+        runtime_model = scheduler.RuntimeModel()
+        finish = {}
+        previous = {}
+        for node in self.topological_order():
+            start = 0
+            previous[node] = None
+            for dependency in self.edges[node]:
+                if finish[dependency] > start:
+                    start = finish[dependency]
+                    previous[node] = dependency
+            finish[node] = start + self.expected_seconds(self.tasks[node], runtime_model)
+        if not finish:
+            return [], 0
+        node = max(finish, key=finish.get)
+        total = finish[node]
+        path = []
+        while node is not None:
+            path.append(self.tasks[node])
+            node = previous[node]
+        return path[::-1], total
@@ -0,0 +1,155 @@
+"""
+sampled SQL profiling of requests
+
+SQLProfileMiddleware turns on the debug cursor of every connection for a share NYMPH_SQL_PROFILE_RATE
+of the requests, the others run as usual. the queries of a sampled request are reduced to its count,
+total SQL time, slowest statements and statements repeated with different parameters (N+1 queries),
+and kept in a ring buffer of the process of NYMPH_SQL_PROFILE_SIZE requests.
+the admin site aggregates the buffer by URL pattern.
+a connection logs its latest queries_limit queries only, a request executing more is marked truncated:
+its earliest queries are missing from its count and statistics.
+"""
+import random
+import re
+import threading
+import time
+from collections import Counter, deque, namedtuple, OrderedDict
+from django.conf import settings
+from django.db import connections
+
+SLOWEST = 5
+# a statement executed more often than this in one request is reported as repeated
+REPEAT_THRESHOLD = 3
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LIST = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+
+Profile = namedtuple('Profile', 'time method path pattern status seconds queries sql_seconds slowest repeated '
+                                'truncated')
+
+
+def sample_rate():
+    return getattr(settings, 'NYMPH_SQL_PROFILE_RATE', 0)
+
+
+def fingerprint(sql):
+    """
+    statement with its literals replaced by ?, lists of literals by (...)
+    """
+    sql = _NUMBER.sub("?", _STRING.sub("?", sql))
+    return _LIST.sub("(...)", sql)
+
+
+def pattern(request):
+    """
+    name of the URL pattern which served the request
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return "unresolved"
+    return match.view_name or "{}.{}".format(match.func.__module__, match.func.__name__)
+
+
+class ProfileBuffer:
+    def __init__(self, size=None):
+        self.profiles = deque(maxlen=size or getattr(settings, 'NYMPH_SQL_PROFILE_SIZE', 1000))
+        self.lock = threading.Lock()
+
+    def add(self, profile):
+        with self.lock:
+            self.profiles.append(profile)
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.profiles)
+
+    def clear(self):
+        with self.lock:
+            self.profiles.clear()
+
+    def by_pattern(self):
+        """
+        statistics of every URL pattern, most total SQL time first
+        """
+        groups = OrderedDict()
+        for profile in self.snapshot():
+            groups.setdefault(profile.pattern, []).append(profile)
+        result = []
+        for name, profiles in groups.items():
+            repeated = Counter()
+            for profile in profiles:
+                for statement, count in profile.repeated:
+                    repeated[statement] = max(repeated[statement], count)
+            slowest = sorted((item for profile in profiles for item in profile.slowest), reverse=True)
+            result.append({
+                'pattern': name,
+                'requests': len(profiles),
+                'mean_ms': sum(profile.seconds for profile in profiles) / len(profiles) * 1000,
+                'max_ms': max(profile.seconds for profile in profiles) * 1000,
+                'mean_queries': sum(profile.queries for profile in profiles) / len(profiles),
+                'max_queries': max(profile.queries for profile in profiles),
+                'sql_ms': sum(profile.sql_seconds for profile in profiles) * 1000,
+                'mean_sql_ms': sum(profile.sql_seconds for profile in profiles) / len(profiles) * 1000,
+                'slowest': [(seconds * 1000, sql) for seconds, sql in slowest[:SLOWEST]],
+                'repeated': repeated.most_common(SLOWEST),
+                'truncated': sum(profile.truncated for profile in profiles),
+            })
+        result.sort(key=lambda item: item['sql_ms'], reverse=True)
+        return result
+
+
+# one buffer per process
+profiles = ProfileBuffer()
+
+
+def summarize(request, response, seconds, queries, truncated=False):
+    """
+    Profile of a request from its queries, {'sql': ..., 'time': seconds as str} like connection.queries;
+    truncated if the earliest queries of the request were dropped from the log
+    """
+    timed = [(float(query['time']), query['sql']) for query in queries]
+    counts = Counter(fingerprint(sql) for _, sql in timed)
+    return Profile(time=time.time(), method=request.method, path=request.path, pattern=pattern(request),
+                   status=response.status_code, seconds=seconds, queries=len(timed),
+                   sql_seconds=sum(duration for duration, _ in timed),
+                   slowest=sorted(timed, reverse=True)[:SLOWEST],
+                   repeated=[(statement, count) for statement, count in counts.most_common()
+                             if count > REPEAT_THRESHOLD],
+                   truncated=truncated)
+
+
+class SQLProfileMiddleware:
+    """
+    profile the SQL of a sampled share of requests, see the module docstring
+    """
+
+    def process_request(self, request):
+        rate = sample_rate()
+        if not rate or random.random() >= rate:
+            return
+        debug_cursors = {}
+        for connection in connections.all():
+            debug_cursors[connection.alias] = connection.force_debug_cursor
+            connection.force_debug_cursor = True
+            # like django.db.reset_queries() at request start with DEBUG
+            connection.queries_log.clear()
+        request._sql_profile = (time.perf_counter(), debug_cursors)
+
+    def process_response(self, request, response):
+        state = getattr(request, '_sql_profile', None)
+        if state is None:
+            return response
+        start, debug_cursors = state
+        del request._sql_profile
+        queries = []
+        truncated = False
+        for alias, force_debug_cursor in debug_cursors.items():
+            connection = connections[alias]
+            connection.force_debug_cursor = force_debug_cursor
+            # the log is a bounded deque, a request logging more than its length loses the earliest queries
+            truncated = truncated or len(connection.queries_log) >= connection.queries_log.maxlen
+            queries.extend(connection.queries_log)
+            if not force_debug_cursor and not settings.DEBUG:
+                connection.queries_log.clear()
+        profiles.add(summarize(request, response, time.perf_counter() - start, queries, truncated))
+        return response
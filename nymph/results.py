@@ -0,0 +1,253 @@
+"""
+binary result store of finished calculations
+
+text outputs of robin and egret are parsed in one streaming pass when the task completes;
+every numeric block becomes a .npy array in the results directory of the task with index.json,
+so later reads are memory-mapped slices instead of text scans.
+
+a block is a title line followed by lines of numbers, blocks with the same title are appended;
+rows of a block shorter than its widest row are padded with NaN. the numbers of a block are spilled
+to its array file while parsing so memory does not grow with the size of the outputs.
+ingestion of a completed task runs in a background thread of the process (see ingest_later).
+"""
+import glob
+import json
+import os
+import re
+import shutil
+import struct
+import tempfile
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from django.db import connections
+
+RESULT_DIR = "results"
+INDEX_FILE = "index.json"
+# output files of each task type, relative to task.dir()
+OUTPUT_PATTERNS = {
+    'robintask': ('*.out',),
+    'assemblytask': ('*.out',),
+    'egretfollowtask': ('*.out',),
+    'egretsequencetask': ('*.out',),
+}
+NUMBER = re.compile(r'^[-+]?(\d+\.?\d*|\.\d+)([eEdD][-+]?\d+)?$')
+MAX_NAME = 64
+# values of a block kept in memory before they are written to its file
+BUFFER_SIZE = 1 << 16
+# rows padded at once
+PAD_ROWS = 1 << 16
+# bytes reserved for the .npy header, written when the shape is known
+HEADER_SIZE = 128
+
+
+def _numbers(line):
+    items = line.split()
+    if not items or not all(NUMBER.match(item) for item in items):
+        return None
+    return [float(item.replace('D', 'E').replace('d', 'e')) for item in items]
+
+
+def array_name(title, taken=()):
+    """
+    file name of the array of title, at most MAX_NAME characters and not in taken
+    """
+    base = re.sub(r'[^0-9A-Za-z]+', '_', title).strip('_').lower()[:MAX_NAME].rstrip('_') or "block"
+    name = base
+    number = 1
+    while name in taken:
+        number += 1
+        suffix = "_{}".format(number)
+        name = base[:MAX_NAME - len(suffix)] + suffix
+    return name
+
+
+def _header(shape):
+    """
+    .npy version 1.0 header of a float64 array padded to HEADER_SIZE
+    """
+    header = "{{'descr': {!r}, 'fortran_order': False, 'shape': {!r}, }}".format(np.dtype(np.float64).str,
+                                                                               tuple(shape))
+    header = header.ljust(HEADER_SIZE - 11) + "\n"
+    return b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1')
+
+
+class Block:
+    """
+    rows of the blocks of one title, written to path as they are parsed
+    """
+
+    def __init__(self, name, title, path):
+        self.name = name
+        self.title = title
+        self.path = path
+        self.values = array('d')
+        self.widths = array('L')
+        self.occurrences = 0
+        with open(path, 'wb') as f:
+            f.write(bytes(HEADER_SIZE))
+
+    def add(self, numbers):
+        self.values.extend(numbers)
+        self.widths.append(len(numbers))
+        if len(self.values) >= BUFFER_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.values:
+            with open(self.path, 'ab') as f:
+                self.values.tofile(f)
+            self.values = array('d')
+
+    @property
+    def shape(self):
+        return len(self.widths), max(self.widths)
+
+    @property
+    def padded(self):
+        return min(self.widths) != max(self.widths)
+
+    def save(self, path):
+        """
+        write the array file to path
+        """
+        self.flush()
+        if not self.padded:
+            with open(self.path, 'r+b') as f:
+                f.write(_header(self.shape))
+            os.replace(self.path, path)
+            return
+        rows, width = self.shape
+        widths = np.frombuffer(self.widths, dtype=self.widths.typecode)
+        padded = self.path + ".padded"
+        with open(self.path, 'rb') as source, open(padded, 'wb') as f:
+            source.seek(HEADER_SIZE)
+            f.write(_header(self.shape))
+            for start in range(0, rows, PAD_ROWS):
+                chunk = widths[start:start + PAD_ROWS]
+                data = np.full((len(chunk), width), np.nan)
+                data[np.arange(width) < chunk[:, None]] = np.fromfile(source, np.float64, int(chunk.sum()))
+                data.tofile(f)
+        os.remove(self.path)
+        os.replace(padded, path)
+
+
+def parse_blocks(lines, blocks, directory):
+    """
+    one pass over lines adding their numbers to blocks {title: Block}, new blocks are written in directory
+    """
+    title = None
+    block = None
+    for line in lines:
+        if not line.strip():
+            continue
+        numbers = _numbers(line)
+        if numbers is None:
+            title = line.strip()
+            block = None
+            continue
+        if block is None:
+            if title is None:
+                continue
+            block = blocks.get(title)
+            if block is None:
+                name = array_name(title, {item.name for item in blocks.values()})
+                block = blocks[title] = Block(name, title, os.path.join(directory, name + ".npy"))
+            block.occurrences += 1
+        block.add(numbers)
+    return blocks
+
+
+def ingest_files(files, directory):
+    """
+    parse text files and write arrays with index into directory, arrays of an earlier ingestion are removed
+    """
+    os.makedirs(directory, exist_ok=True)
+    work = tempfile.mkdtemp(prefix=".ingest-", dir=directory)
+    try:
+        blocks = OrderedDict()
+        for file in files:
+            with open(file, errors='replace') as f:
+                parse_blocks(f, blocks, work)
+        index = OrderedDict([('source', [os.path.basename(file) for file in files]), ('arrays', OrderedDict())])
+        for block in blocks.values():
+            file = block.name + ".npy"
+            block.save(os.path.join(directory, file))
+            index['arrays'][block.name] = OrderedDict([
+                ('file', file), ('title', block.title), ('shape', list(block.shape)),
+                ('dtype', str(np.dtype(np.float64))), ('occurrences', block.occurrences), ('padded', block.padded)])
+        tmp = os.path.join(work, INDEX_FILE)
+        with open(tmp, 'w') as f:
+            json.dump(index, f, indent=1)
+        os.replace(tmp, os.path.join(directory, INDEX_FILE))
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    files = set(item['file'] for item in index['arrays'].values())
+    for path in glob.glob(os.path.join(directory, "*.npy")):
+        if os.path.basename(path) not in files:
+            os.remove(path)
+    return index
+
+
+def result_dir(task):
+    return os.path.join(task.dir(), RESULT_DIR)
+
+
+def output_files(task):
+    patterns = OUTPUT_PATTERNS.get(task._meta.model_name, ())
+    files = []
+    for pattern in patterns:
+        files.extend(sorted(glob.glob(os.path.join(task.dir(), pattern))))
+    return files
+
+
+def ingest_task(task):
+    """
+    called when task completes, return the index or None if the task has no output
+    """
+    files = output_files(task)
+    if files:
+        return ingest_files(files, result_dir(task))
+
+
+# one ingestion at a time per process, off the request which completed the task
+_executor = ThreadPoolExecutor(max_workers=1)
+
+
+def ingest_later(function, *args):
+    """
+    run function(*args) in the ingestion thread, its database connections are closed after every call
+    """
+
+    def run():
+        try:
+            return function(*args)
+        finally:
+            connections.close_all()
+
+    return _executor.submit(run)
+
+
+class ResultStore:
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, INDEX_FILE)) as f:
+            self.index = json.load(f, object_pairs_hook=OrderedDict)
+
+    @classmethod
+    def for_task(cls, task):
+        return cls(result_dir(task))
+
+    def names(self):
+        return list(self.index['arrays'])
+
+    def __contains__(self, name):
+        return name in self.index['arrays']
+
+    def __getitem__(self, name):
+        """
+        memory-mapped array, slicing reads only the needed part of the file
+        """
+        item = self.index['arrays'][name]
+        return np.load(os.path.join(self.directory, item['file']), mmap_mode='r')
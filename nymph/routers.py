@@ -0,0 +1,112 @@
+"""
+database router of nymph
+
+reference models (see cache.REFERENCE_MODELS) are read from settings.NYMPH_REFERENCE_READ_DATABASE,
+a replica of settings.NYMPH_WRITE_DATABASE which receives every write and all task tables.
+after a reference write the thread reads references from the write database for NYMPH_REPLICA_LAG seconds,
+RouterMiddleware carries this to the next requests of the client with a cookie so a redirect after
+saving shows the saved data. reads inside a transaction of the write database stay on it.
+the reference cache builds values of recently changed models inside primary() (see cache).
+"""
+import threading
+import time
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import connections
+from .cache import REFERENCE_MODELS
+
+PIN_COOKIE = 'nymph_db_pin'
+_reference_models = frozenset(REFERENCE_MODELS)
+_state = threading.local()
+
+
+def write_database():
+    return getattr(settings, 'NYMPH_WRITE_DATABASE', 'default')
+
+
+def reference_read_database():
+    return getattr(settings, 'NYMPH_REFERENCE_READ_DATABASE', write_database())
+
+
+def replica_lag():
+    return getattr(settings, 'NYMPH_REPLICA_LAG', 5)
+
+
+def pin(seconds=None):
+    """
+    read references from the write database for seconds, the replica lag by default
+    """
+    _state.until = max(getattr(_state, 'until', 0), time.time() + (replica_lag() if seconds is None else seconds))
+    _state.written = True
+
+
+@contextmanager
+def primary():
+    """
+    read references from the write database in the block
+    """
+    until = getattr(_state, 'until', 0)
+    _state.until = float('inf')
+    try:
+        yield
+    finally:
+        _state.until = until
+
+
+def unpin():
+    _state.until = 0
+    _state.written = False
+
+
+def is_pinned():
+    return getattr(_state, 'until', 0) > time.time()
+
+
+def is_reference(model):
+    return model._meta.app_label == 'nymph' and model.__name__ in _reference_models
+
+
+class NymphRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label != 'nymph':
+            return None
+        if is_reference(model):
+            primary = write_database()
+            if is_pinned() or connections[primary].in_atomic_block:
+                return primary
+            return reference_read_database()
+        return write_database()
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label != 'nymph':
+            return None
+        if is_reference(model):
+            pin()
+        return write_database()
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {write_database(), reference_read_database()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+class RouterMiddleware:
+    """
+    read-your-writes across the requests of a client within the replica lag
+    """
+
+    def process_request(self, request):
+        unpin()
+        if request.COOKIES.get(PIN_COOKIE):
+            pin()
+        _state.written = False
+
+    def process_response(self, request, response):
+        if getattr(_state, 'written', False):
+            response.set_cookie(PIN_COOKIE, '1', max_age=replica_lag(), httponly=True)
+        unpin()
+        return response
@@ -0,0 +1,219 @@
+"""
+assign compute node to task by predicted runtime
+
+runtime of a task on a node is predicted as task.workload * seconds_per_workload,
+where seconds_per_workload comes from TaskRuntimeStatistic aggregated from completed tasks.
+tasks are assigned longest first to the node which finishes earliest (LPT) to minimize makespan.
+"""
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import F, Sum
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from .models import AbstractTask, ComputeNode, TaskRuntimeStatistic, EgretFollowTask
+from . import follow, spans
+
+# used before any task of the type has completed
+DEFAULT_SECONDS_PER_WORKLOAD = 1.0
+# waiting and calculating tasks still occupy their compute node
+ACTIVE_STATUS = (1, 2)
+
+
+def task_models():
+    return [model for model in apps.get_app_config('nymph').get_models() if issubclass(model, AbstractTask)]
+
+
+def _own_rows(model):
+    """
+    queryset of model excluding rows which belong to a multi-table child task (BPOutTask of AssemblyTask)
+    """
+    queryset = model.objects.all()
+    for child in task_models():
+        if child is not model and model in child._meta.parents:
+            link = child._meta.parents[model]
+            queryset = queryset.filter(**{link.related_query_name() + '__isnull': True})
+    return queryset
+
+
+def record_runtime(task):
+    """
+    add runtime of a completed task to the statistic of its compute node
+    """
+    if task.compute_node_id is None or task.start_time is None or task.end_time is None:
+        return
+    seconds = task.time_cost.total_seconds()
+    workload = task.workload
+    if seconds < 0 or workload <= 0:
+        return
+    content_type = ContentType.objects.get_for_model(task)
+    statistic, created = TaskRuntimeStatistic.objects.get_or_create(compute_node_id=task.compute_node_id,
+                                                                    content_type=content_type)
+    TaskRuntimeStatistic.objects.filter(pk=statistic.pk).update(samples=F('samples') + 1,
+                                                               total_workload=F('total_workload') + workload,
+                                                               total_seconds=F('total_seconds') + seconds)
+
+
+class RuntimeModel:
+    """
+    seconds per workload of every (node, task type) loaded from the statistic table;
+    falls back to the aggregate of the task type over all nodes and then to the default
+    """
+
+    def __init__(self):
+        self.node_rates = {}
+        for item in TaskRuntimeStatistic.objects.all():
+            rate = item.seconds_per_workload
+            if rate is not None:
+                self.node_rates[(item.compute_node_id, item.content_type_id)] = rate
+        self.type_rates = {}
+        totals = TaskRuntimeStatistic.objects.values('content_type').annotate(workload=Sum('total_workload'),
+                                                                              seconds=Sum('total_seconds'))
+        for item in totals:
+            if item['workload'] > 0:
+                self.type_rates[item['content_type']] = item['seconds'] / item['workload']
+
+    def seconds_per_workload(self, node_id, content_type_id):
+        rate = self.node_rates.get((node_id, content_type_id))
+        if rate is None:
+            rate = self.type_rates.get(content_type_id, DEFAULT_SECONDS_PER_WORKLOAD)
+        return rate
+
+    def predict(self, task, node_id, workload=None):
+        if workload is None:
+            workload = task.workload
+        content_type = ContentType.objects.get_for_model(task)
+        return workload * self.seconds_per_workload(node_id, content_type.id)
+
+
+def node_backlog(nodes, runtime_model):
+    """
+    predicted seconds until each node has finished its waiting and calculating tasks
+    """
+    now = timezone.now()
+    backlog = {node.id: 0.0 for node in nodes}
+    for model in task_models():
+        queryset = model.with_workload(_own_rows(model).filter(status__in=ACTIVE_STATUS, compute_node__in=nodes))
+        for task in queryset:
+            cost = runtime_model.predict(task, task.compute_node_id)
+            if task.status == 2 and task.start_time is not None:
+                cost -= (now - task.start_time).total_seconds()
+            backlog[task.compute_node_id] += max(cost, 0)
+    return backlog
+
+
+def assign_compute_nodes(tasks, nodes=None, save=True):
+    """
+    set compute_node of tasks so that the predicted makespan over nodes is minimal;
+    return the predicted finish time in seconds of every node
+    """
+    if nodes is None:
+        nodes = list(ComputeNode.objects.all())
+    if not nodes:
+        raise ComputeNode.DoesNotExist("no compute node available")
+    runtime_model = RuntimeModel()
+    backlog = node_backlog(nodes, runtime_model)
+    node_map = {node.id: node for node in nodes}
+
+    costs = []
+    for task in tasks:
+        workload = task.workload
+        costs.append((task, {node.id: runtime_model.predict(task, node.id, workload) for node in nodes}))
+    # longest task first, each to the node where it would finish earliest
+    costs.sort(key=lambda item: max(item[1].values()), reverse=True)
+    for task, cost in costs:
+        finish, node_id = min((backlog[node_id] + seconds, node_id) for node_id, seconds in cost.items())
+        backlog[node_id] = finish
+        task.compute_node = node_map[node_id]
+        if save:
+            task.save(update_fields=['compute_node', 'last_modified'])
+    return backlog
+
+
+def get_publisher():
+    """
+    callable sending a task to the queue of its compute node, configured by NYMPH_TASK_PUBLISHER
+    """
+    path = getattr(settings, 'NYMPH_TASK_PUBLISHER', None)
+    if path:
+        return import_string(path)
+
+
+def dispatch(tasks, nodes=None, checkpoints=None):
+    """
+    assign compute nodes to tasks, send them to their queues and mark them waiting;
+    a follow task restarts from the last unchanged case of an earlier run (see nymph.follow)
+    checkpoints: {task: manifest of the checkpoint it restarts from} of resumed tasks, sent with them
+    """
+    tasks = list(tasks)
+    for task in tasks:
+        if isinstance(task, EgretFollowTask):
+            follow.start_run(task, save=False)
+    backlog = assign_compute_nodes(tasks, nodes, save=False)
+    publish = get_publisher()
+    for task in tasks:
+        with spans.span('dispatch', task):
+            task.status = 1
+            fields = ['compute_node', 'status', 'last_modified']
+            if isinstance(task, EgretFollowTask):
+                fields += ['restart_task', 'restart_case']
+            task.save(update_fields=fields)
+            if publish is not None:
+                if checkpoints is None:
+                    publish(task)
+                else:
+                    publish(task, checkpoint=checkpoints.get(task))
+    return backlog
+
+
+def _robin_tasks(group, status):
+    from . import fanout
+    return list(fanout.children(group).filter(status__in=status))
+
+
+def _refresh(group):
+    from . import fanout
+    fanout.refresh_group(group)
+
+
+def suspend(task):
+    """
+    command the compute node to pause the task, the node saves a checkpoint before it stops;
+    a task group suspends its active robin tasks
+    """
+    if hasattr(task, 'child_labels'):
+        robin_tasks = _robin_tasks(task, ACTIVE_STATUS)
+        if not robin_tasks:
+            raise ValueError("task group has no waiting or calculating robin task")
+        for robin_task in robin_tasks:
+            suspend(robin_task)
+        _refresh(task)
+        return
+    if task.status not in ACTIVE_STATUS:
+        raise ValueError("only waiting or calculating task can be suspended")
+    task.status = 3
+    task.save(update_fields=['status', 'last_modified'])
+    publish = get_publisher()
+    if publish is not None:
+        publish(task)
+
+
+def resume(task, nodes=None):
+    """
+    dispatch a suspended task again, possibly to another node; the publisher gets the manifest of
+    the checkpoint it restarts from, None if it restarts from the beginning
+    return {task: manifest}, the suspended robin tasks of a task group are resumed together
+    """
+    if hasattr(task, 'child_labels'):
+        tasks = _robin_tasks(task, (3,))
+        if not tasks:
+            raise ValueError("task group has no suspended robin task")
+    elif task.status != 3:
+        raise ValueError("only suspended task can be resumed")
+    else:
+        tasks = [task]
+    checkpoints = {item: item.checkpoints().latest() for item in tasks}
+    dispatch(tasks, nodes, checkpoints)
+    if tasks[0] is not task:
+        _refresh(task)
+    return checkpoints
@@ -0,0 +1,133 @@
+"""
+plan of egret sequence task
+
+every flagged quantity of every EgretSequenceCase needs the reactivity of some solver states
+of its follow case: the base state (the follow case itself) and perturbed states.
+quantities share states (FTC, MTC, ITC, PWD... all need the base state), so the states of all cases
+are collapsed into one set of the states the flagged quantities use: each base state is calculated once,
+then all perturbed states are independent and calculated in parallel.
+"""
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from .models import EgretSequenceCase
+
+DELTA_FUEL_TEMPERATURE = 10  # K
+DELTA_MODERATOR_TEMPERATURE = 2  # K
+DELTA_BORON_DENSITY = 10  # ppm
+
+# perturbation: ((parameter, operation, value),) operation is "add" to the base value or "set" to value
+STATES = {
+    'BASE': (),
+    'TF_UP': (('fuel_temperature', 'add', DELTA_FUEL_TEMPERATURE),),
+    'TM_UP': (('moderator_temperature', 'add', DELTA_MODERATOR_TEMPERATURE),),
+    'ISO_UP': (('fuel_temperature', 'add', DELTA_MODERATOR_TEMPERATURE),
+               ('moderator_temperature', 'add', DELTA_MODERATOR_TEMPERATURE)),
+    'BORON_UP': (('boron_density', 'add', DELTA_BORON_DENSITY),),
+    'TF_HZP': (('fuel_temperature', 'set', 'HZP'),),
+    'TM_HZP': (('moderator_temperature', 'set', 'HZP'),),
+    'ISO_HZP': (('fuel_temperature', 'set', 'HZP'), ('moderator_temperature', 'set', 'HZP')),
+    'HZP': (('relative_power', 'set', 0),),
+    'NO_XE': (('xenon', 'set', 0),),
+    'NO_SM': (('samarium', 'set', 0),),
+    'ARI': (('control_rod', 'set', 'ALL_IN'),),
+    'ARI_STUCK': (('control_rod', 'set', 'ALL_IN_STUCK'),),
+}
+
+
+def reactivity(keff):
+    """
+    unit:pcm
+    """
+    return (keff - 1) / keff * 1e5
+
+
+def _difference(delta=1):
+    def combine(reference, perturbed):
+        return (reactivity(perturbed) - reactivity(reference)) / delta
+
+    return combine
+
+
+def _shutdown_margin(all_in_stuck):
+    return -reactivity(all_in_stuck)
+
+
+# quantity: (states, combine) combine gets keff of the states in order
+QUANTITIES = OrderedDict([
+    # reactivity coefficient pcm/K or pcm/ppm
+    ('FTC', (('BASE', 'TF_UP'), _difference(DELTA_FUEL_TEMPERATURE))),
+    ('MTC', (('BASE', 'TM_UP'), _difference(DELTA_MODERATOR_TEMPERATURE))),
+    ('DBW', (('BASE', 'BORON_UP'), _difference(DELTA_BORON_DENSITY))),
+    ('ITC', (('BASE', 'ISO_UP'), _difference(DELTA_MODERATOR_TEMPERATURE))),
+    # reactivity worth pcm
+    ('MTD', (('BASE', 'TM_HZP'), _difference())),
+    ('FTD', (('BASE', 'TF_HZP'), _difference())),
+    ('ITD', (('BASE', 'ISO_HZP'), _difference())),
+    ('PWD', (('BASE', 'HZP'), _difference())),
+    ('XEN', (('BASE', 'NO_XE'), _difference())),
+    ('SMW', (('BASE', 'NO_SM'), _difference())),
+    # SDM pcm
+    ('SDM', (('ARI_STUCK',), _shutdown_margin)),
+])
+
+
+class SequencePlan:
+    """
+    requests: [(sequence case id, follow case id, quantity)]
+    base_states: follow case ids whose base state is needed
+    perturbed_states: distinct (follow case id, state name) other than base
+    """
+
+    def __init__(self, cases):
+        self.requests = []
+        states = OrderedDict()
+        for case in cases:
+            for quantity, (state_names, combine) in QUANTITIES.items():
+                if getattr(case, quantity):
+                    self.requests.append((case.pk, case.follow_case_id, quantity))
+                    for name in state_names:
+                        states[(case.follow_case_id, name)] = None
+        self.base_states = [follow_case_id for follow_case_id, name in states if name == 'BASE']
+        self.perturbed_states = [state for state in states if state[1] != 'BASE']
+
+    @classmethod
+    def for_task(cls, sequence_task):
+        return cls(EgretSequenceCase.objects.filter(sequence_task=sequence_task).order_by('_order'))
+
+    @property
+    def state_num(self):
+        return len(self.base_states) + len(self.perturbed_states)
+
+    @property
+    def naive_state_num(self):
+        """
+        states needed if every quantity was calculated by its own run
+        """
+        return sum(len(QUANTITIES[quantity][0]) for _, _, quantity in self.requests)
+
+    def run(self, solve, max_workers=None):
+        """
+        solve(follow_case_id, perturbation) returns keff of the state;
+        base states are calculated first then all perturbed states in parallel
+        return {(follow case id, state name): keff}
+        """
+        keff = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for follow_case_id, value in zip(self.base_states, executor.map(
+                    lambda follow_case_id: solve(follow_case_id, STATES['BASE']), self.base_states)):
+                keff[(follow_case_id, 'BASE')] = value
+            for state, value in zip(self.perturbed_states, executor.map(
+                    lambda state: solve(state[0], STATES[state[1]]), self.perturbed_states)):
+                keff[state] = value
+        return keff
+
+    def evaluate(self, keff):
+        """
+        return {sequence case id: {quantity: value}} from keff of the states
+        """
+        result = OrderedDict()
+        for case_id, follow_case_id, quantity in self.requests:
+            state_names, combine = QUANTITIES[quantity]
+            values = [keff[(follow_case_id, name)] for name in state_names]
+            result.setdefault(case_id, OrderedDict())[quantity] = combine(*values)
+        return result
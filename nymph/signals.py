@@ -1,6 +1,12 @@
+import logging
 from django.dispatch import receiver
-from django.db.models.signals import post_save
-from .models import BasicMaterial,Mixture,Material,SymbolicMaterial
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from .models import BasicMaterial,Mixture,Material,SymbolicMaterial,AbstractTask,RobinTask,TaskStatusChange,\
+    Unit,Cycle,LoadingPattern,AssemblyTask,EgretFollowTask,Profile
+from . import scheduler, fanout, pipeline, results, paths, cache, invalidation, spans, follow
+
+logger = logging.getLogger(__name__)
 
 
 @receiver(post_save,sender=BasicMaterial)
@@ -8,4 +14,111 @@ from .models import BasicMaterial,Mixture,Material,SymbolicMaterial
 @receiver(post_save,sender=SymbolicMaterial)
 def create_material(sender, instance, created=False, **kwargs):
     if created:
-        Material.objects.create(content_object=instance)
\ No newline at end of file
+        Material.objects.create(content_object=instance)
+
+
+@receiver(post_save)
+def log_task_status(sender, instance, created=False, **kwargs):
+    if isinstance(instance, AbstractTask) and instance.status != instance._loaded_status:
+        spans.record_transition(instance)
+        TaskStatusChange.objects.create(content_object=instance, status=instance.status)
+
+
+@receiver(post_save)
+def record_task_runtime(sender, instance, created=False, **kwargs):
+    if isinstance(instance, AbstractTask) and instance.status == 6 and instance._loaded_status != 6:
+        scheduler.record_runtime(instance)
+        if not isinstance(instance, RobinTask):
+            transaction.on_commit(lambda: pipeline.release_dependents(instance))
+
+
+@receiver(post_save, sender=EgretFollowTask)
+def complete_follow_run(sender, instance, created=False, **kwargs):
+    if instance.status == 6 and instance._loaded_status != 6:
+        follow.complete_run(instance)
+
+
+@receiver(fanout.group_completed)
+def release_group_dependents(sender, group, **kwargs):
+    pipeline.release_dependents(group)
+
+
+@receiver(post_save, sender=RobinTask)
+def refresh_task_group(sender, instance, created=False, **kwargs):
+    if instance.status != instance._loaded_status:
+        group = instance.content_object
+        if group is not None and fanout.is_group(group):
+            transaction.on_commit(lambda: fanout.refresh_group(group))
+
+
+def ingest_results(task):
+    try:
+        with spans.span('ingest', task):
+            results.ingest_task(task)
+    except Exception:
+        logger.exception("failed to ingest results of %s %s", task._meta.model_name, task.pk)
+
+
+@receiver(post_save)
+def ingest_task_results(sender, instance, created=False, **kwargs):
+    if isinstance(instance, AbstractTask) and instance.status == 6 and instance._loaded_status != 6:
+        if not fanout.is_group(instance):
+            transaction.on_commit(lambda: results.ingest_later(ingest_results, instance))
+
+
+@receiver(post_save, sender=Unit)
+@receiver(post_save, sender=Cycle)
+@receiver(post_save, sender=LoadingPattern)
+@receiver(post_delete, sender=Unit)
+@receiver(post_delete, sender=Cycle)
+@receiver(post_delete, sender=LoadingPattern)
+def invalidate_path(sender, instance, **kwargs):
+    # reactor models are logged as reference data
+    invalidation.log_change(instance)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_profile_path(sender, instance, **kwargs):
+    invalidation.log_path_change('profile', instance.user_id)
+
+
+@receiver(m2m_changed, sender=Profile.plants.through)
+def invalidate_profile_plants(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        user_ids = [instance.user_id]
+    elif pk_set is None:
+        # cleared from the plant side, which profiles had the plant is not known any more
+        user_ids = Profile.objects.values_list('user_id', flat=True)
+    else:
+        user_ids = Profile.objects.filter(pk__in=pk_set).values_list('user_id', flat=True)
+    for user_id in user_ids:
+        invalidation.log_path_change('profile', user_id)
+
+
+@receiver(post_save)
+def invalidate_task_path(sender, instance, created=False, **kwargs):
+    if isinstance(instance, AbstractTask) and instance.PATH_FIELDS and not created and \
+            instance.path_values() != instance._loaded_path:
+        model_name = 'assemblytask' if isinstance(instance, AssemblyTask) else instance._meta.model_name
+        invalidation.log_path_change(model_name, instance.pk)
+
+
+@receiver(post_delete)
+def drop_task_path(sender, instance, **kwargs):
+    # ids of deleted rows are not used again, other processes keep a harmless entry
+    if isinstance(instance, AbstractTask) and instance.PATH_FIELDS:
+        model_name = 'assemblytask' if isinstance(instance, AssemblyTask) else instance._meta.model_name
+        paths.invalidate(model_name, instance.pk)
+
+
+_reference_models = frozenset(cache.REFERENCE_MODELS)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def log_reference_change(sender, instance, **kwargs):
+    if sender._meta.app_label == 'nymph' and sender.__name__ in _reference_models:
+        invalidation.log_change(instance)
@@ -0,0 +1,173 @@
+"""
+timings of the phases of a task
+
+    with spans.span('deck', task):
+        with spans.span('geometry'):
+            ...
+
+a span opened inside another one of the same thread belongs to its task and compute node and is nested;
+the spans of a tree are inserted together when its outermost span closes. phases which are not run by
+this process, queue wait and solver run, are recorded from the task status transitions (see signals, and
+fanout for task groups).
+chrome_trace() exports spans in the Trace Event Format read by chrome://tracing and Perfetto.
+"""
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+from .models import ComputeNode, TaskSpan, TaskStatusChange
+
+# status transitions recorded as spans: (status left, status entered) -> span name
+TRANSITION_SPANS = {
+    (1, 2): 'queue_wait',
+    (2, 5): 'solver',
+    (2, 6): 'solver',
+    (2, 7): 'solver',
+}
+
+logger = logging.getLogger(__name__)
+
+_state = threading.local()
+
+
+def _node_id(compute_node):
+    return compute_node.pk if isinstance(compute_node, ComputeNode) else compute_node
+
+
+def _stack():
+    if not hasattr(_state, 'stack'):
+        _state.stack = []
+        _state.finished = []
+    return _state.stack
+
+
+def active():
+    return bool(_stack())
+
+
+@contextmanager
+def span(name, task=None, compute_node=None):
+    """
+    time the block as a phase of task, by default the task and compute node of the enclosing span
+    """
+    stack = _stack()
+    parent = stack[-1] if stack else None
+    if task is None and parent is not None:
+        task = parent['task']
+    if compute_node is None:
+        compute_node = parent['compute_node'] if parent is not None else getattr(task, 'compute_node_id', None)
+    item = {'name': name, 'task': task, 'compute_node': _node_id(compute_node), 'depth': len(stack),
+            'start': timezone.now()}
+    stack.append(item)
+    start = time.perf_counter()
+    try:
+        yield item
+    finally:
+        item['duration'] = time.perf_counter() - start
+        stack.pop()
+        if item['task'] is not None:
+            _state.finished.append(item)
+        if not stack:
+            finished, _state.finished = _state.finished, []
+            try:
+                with transaction.atomic():
+                    save(finished)
+            except Exception:
+                # timings are not worth the exception raised by the block, if any
+                logger.exception("failed to save %d spans", len(finished))
+
+
+def traced(name):
+    """
+    decorator timing every call inside a span, calls outside any span run as is
+    """
+
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not active():
+                return function(*args, **kwargs)
+            with span(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def save(items):
+    TaskSpan.objects.bulk_create([
+        TaskSpan(content_type=ContentType.objects.get_for_model(item['task']), object_id=item['task'].pk,
+                 name=item['name'], compute_node_id=item['compute_node'], start=item['start'],
+                 duration=item['duration'], depth=item['depth'])
+        for item in items])
+
+
+def record(task, name, start, end, compute_node=None):
+    """
+    span of a phase measured outside this process
+    """
+    TaskSpan.objects.create(content_object=task, name=name, start=start, duration=(end - start).total_seconds(),
+                            compute_node_id=_node_id(compute_node) or task.compute_node_id)
+
+
+def record_transition(task, now=None):
+    """
+    record the span ended by the status change of task, the time it entered the status left is logged by
+    TaskStatusChange
+    """
+    name = TRANSITION_SPANS.get((task._loaded_status, task.status))
+    if name is None:
+        return
+    content_type = ContentType.objects.get_for_model(task)
+    entered = TaskStatusChange.objects.filter(content_type=content_type, object_id=task.pk,
+                                              status=task._loaded_status).order_by('-id').values_list(
+        'time', flat=True).first()
+    if entered is not None:
+        record(task, name, entered, now or timezone.now())
+
+
+def task_spans(tasks):
+    """
+    spans of tasks, a queryset or list of one task model
+    """
+    tasks = list(tasks)
+    if not tasks:
+        return TaskSpan.objects.none()
+    return TaskSpan.objects.filter(content_type=ContentType.objects.get_for_model(tasks[0]),
+                                   object_id__in=[task.pk for task in tasks]).order_by('start', 'depth')
+
+
+def chrome_trace(spans):
+    """
+    Trace Event Format of spans: a process for every task, a thread for every compute node
+    """
+    spans = list(spans)
+    events = []
+    processes = {}
+    threads = set()
+    nodes = dict(ComputeNode.objects.values_list('id', 'name'))
+    origin = min((item.start for item in spans), default=None)
+    for item in spans:
+        task = (item.content_type_id, item.object_id)
+        if task not in processes:
+            processes[task] = len(processes) + 1
+            events.append({'ph': 'M', 'name': 'process_name', 'pid': processes[task], 'tid': 0,
+                           'args': {'name': "{} {}".format(ContentType.objects.get_for_id(item.content_type_id).model,
+                                                           item.object_id)}})
+        pid = processes[task]
+        tid = item.compute_node_id or 0
+        if (pid, tid) not in threads:
+            threads.add((pid, tid))
+            events.append({'ph': 'M', 'name': 'thread_name', 'pid': pid, 'tid': tid,
+                           'args': {'name': nodes.get(tid, "web")}})
+        events.append({'ph': 'X', 'name': item.name, 'cat': 'nymph', 'pid': pid, 'tid': tid,
+                       'ts': (item.start - origin) / timedelta(microseconds=1), 'dur': item.duration * 1e6,
+                       'args': {'depth': item.depth}})
+    return {'traceEvents': events, 'displayTimeUnit': 'ms',
+            'otherData': {'origin': origin.isoformat() if origin is not None else None}}
@@ -1,8 +1,28 @@
+from django.conf import settings
+from django.core.files import File
 from django.core.files.storage import FileSystemStorage
+import gzip
+import hashlib
+import io
+import itertools
+import json
+import lzma
+import os
 import platform
+import shutil
+import time
+import uuid
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 
 def get_file_root():
+    location = getattr(settings, 'NYMPH_FILE_ROOT', None)
+    if location:
+        return location
     system = platform.system()
     if system == "Windows":
         location = "D:\\orient\\nymph"
@@ -11,6 +31,13 @@ def get_file_root():
     return location
 
 
+def _temporary(path):
+    """
+    unique name of a temporary file renamed to path
+    """
+    return "{}.{}.tmp".format(path, uuid.uuid4().hex)
+
+
 class NymphStorage(FileSystemStorage):
     """
     Returns same name for existing file and deletes existing file on save.
@@ -20,3 +47,505 @@ class NymphStorage(FileSystemStorage):
         location = get_file_root()
         base_url = "/orient/nymph"
         return super().__init__(location=location, base_url=base_url)
+
+
+class _Target:
+    """
+    file written by a codec writer, closing the writer leaves the file open
+    """
+
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, data):
+        return self.f.write(data)
+
+    def flush(self):
+        self.f.flush()
+
+
+class Codec:
+    def __init__(self, name, suffix, writer, reader):
+        self.name = name
+        self.suffix = suffix
+        self.writer = writer
+        self.reader = reader
+
+
+CODECS = {
+    # no file name and mtime in gzip header so same content gives same bytes
+    'gzip': Codec('gzip', '.gz', lambda f: gzip.GzipFile(filename='', fileobj=f, mode='wb', compresslevel=6, mtime=0),
+                  lambda f: gzip.GzipFile(fileobj=f, mode='rb')),
+    'lzma': Codec('lzma', '.xz', lambda f: lzma.LZMAFile(f, 'wb', preset=6), lambda f: lzma.LZMAFile(f, 'rb')),
+}
+if zstandard is not None:
+    CODECS['zstd'] = Codec('zstd', '.zst', lambda f: zstandard.ZstdCompressor(level=9).stream_writer(f),
+                           lambda f: zstandard.ZstdDecompressor().stream_reader(f))
+
+
+class _DecompressedFile(File):
+    """
+    File reading through a decompressing reader, closing it closes the file on disk as well
+    """
+
+    def __init__(self, reader, raw, name, mode):
+        super().__init__(reader, name)
+        self.raw = raw
+        self.mode = mode
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self.raw.close()
+
+
+class CompressedNymphStorage(NymphStorage):
+    """
+    NymphStorage compressing file content on save, name keeps the logical name used by FileField
+    while the file on disk gets the codec suffix, e.g. input.inp is stored as input.inp.gz
+    next to input.inp.gz.meta holding the size and sha256 of its uncompressed content; the metadata file tells
+    a compressed file from a file uploaded compressed like data.tar.gz, which is stored and read as it is.
+    existing files without codec suffix are read as they are.
+    compression is enabled by settings.NYMPH_STORAGE_COMPRESSION, path() of a compressed file raises NotImplementedError
+    """
+    # codec preference by file extension, the first available codec is used
+    CODEC_PREFERENCE = {
+        '.out': ('zstd', 'lzma', 'gzip'),
+        '.log': ('zstd', 'lzma', 'gzip'),
+    }
+    DEFAULT_CODEC_PREFERENCE = ('zstd', 'gzip')
+    INCOMPRESSIBLE = {'.gz', '.xz', '.zst', '.zip', '.bz2', '.7z', '.npy', '.npz', '.png', '.jpg', '.pdf'}
+    CHUNK_SIZE = 1024 * 1024
+    META_SUFFIX = ".meta"
+
+    def codec_for(self, name):
+        if not getattr(settings, 'NYMPH_STORAGE_COMPRESSION', False):
+            return None
+        extension = os.path.splitext(name)[1].lower()
+        if extension in self.INCOMPRESSIBLE:
+            return None
+        for codec_name in self.CODEC_PREFERENCE.get(extension, self.DEFAULT_CODEC_PREFERENCE):
+            if codec_name in CODECS:
+                return CODECS[codec_name]
+
+    def _disk_path(self, name):
+        """
+        path of a file as it is stored on disk
+        """
+        return super().path(name)
+
+    def path(self, name):
+        """
+        path of an uncompressed file, a compressed file has no path of its content and is read through open()
+        """
+        stored, codec = self.stored_name(name)
+        if codec is not None:
+            raise NotImplementedError("{} is stored compressed as {}, open it through the storage".format(name, stored))
+        return self._disk_path(name)
+
+    def stored_name(self, name):
+        """
+        (name on disk, codec) of an existing file, codec is None for an uncompressed file
+        """
+        for codec in CODECS.values():
+            if os.path.exists(self._disk_path(name + codec.suffix + self.META_SUFFIX)):
+                return name + codec.suffix, codec
+        return name, None
+
+    _temporary = staticmethod(_temporary)
+
+    def metadata(self, stored):
+        with open(self._disk_path(stored + self.META_SUFFIX)) as f:
+            return json.load(f)
+
+    def _open(self, name, mode='rb'):
+        stored, codec = self.stored_name(name)
+        if codec is None:
+            return super()._open(name, mode)
+        if 'w' in mode or 'a' in mode or '+' in mode:
+            raise ValueError("compressed file {} can only be opened for reading".format(name))
+        raw = open(self._disk_path(stored), 'rb')
+        try:
+            reader = codec.reader(raw)
+            if 'b' not in mode:
+                if not hasattr(reader, 'read1'):
+                    reader = io.BufferedReader(reader)
+                reader = io.TextIOWrapper(reader, encoding='utf-8')
+        except Exception:
+            raw.close()
+            raise
+        return _DecompressedFile(reader, raw, name, mode)
+
+    def _write(self, path, content, codec):
+        """
+        write content to path through codec, return (sha256 of content, size of content)
+        """
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, 'wb') as f:
+            writer = codec.writer(_Target(f)) if codec is not None else f
+            for chunk in content.chunks(self.CHUNK_SIZE):
+                chunk = chunk if isinstance(chunk, bytes) else chunk.encode('utf-8')
+                digest.update(chunk)
+                size += len(chunk)
+                writer.write(chunk)
+            if writer is not f:
+                writer.close()
+            f.flush()
+            os.fsync(f.fileno())
+        return digest.hexdigest(), size
+
+    def _place(self, tmp, full_path, digest, codec):
+        os.replace(tmp, full_path)
+
+    def _save(self, name, content):
+        codec = self.codec_for(name)
+        suffix = codec.suffix if codec is not None else ''
+        full_path = self._disk_path(name + suffix)
+        directory = os.path.dirname(full_path)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        tmp = self._temporary(full_path)
+        digest, size = self._write(tmp, content, codec)
+        if self.file_permissions_mode is not None:
+            os.chmod(tmp, self.file_permissions_mode)
+        self._place(tmp, full_path, digest, codec)
+        if codec is not None:
+            meta = full_path + self.META_SUFFIX
+            tmp = self._temporary(meta)
+            with open(tmp, 'w') as f:
+                json.dump({'codec': codec.name, 'size': size, 'sha256': digest}, f)
+            os.replace(tmp, meta)
+        # remove the file of the same name stored in another way
+        for other in CODECS.values():
+            if other is not codec and os.path.exists(self._disk_path(name + other.suffix + self.META_SUFFIX)):
+                self.delete_stored(name + other.suffix)
+        if codec is not None and os.path.exists(self._disk_path(name)):
+            self.delete_stored(name)
+        return name.replace('\\', '/')
+
+    def delete_stored(self, stored):
+        super().delete(stored)
+        try:
+            os.remove(self._disk_path(stored + self.META_SUFFIX))
+        except FileNotFoundError:
+            pass
+
+    def exists(self, name):
+        return self.stored_name(name)[1] is not None or super().exists(name)
+
+    def delete(self, name):
+        self.delete_stored(self.stored_name(name)[0])
+
+    def size(self, name):
+        """
+        uncompressed size
+        """
+        stored, codec = self.stored_name(name)
+        if codec is None:
+            return super().size(name)
+        return self.metadata(stored)['size']
+
+    def url(self, name):
+        """
+        url of the file on disk, compressed content is served as it is stored
+        """
+        return super().url(self.stored_name(name)[0])
+
+    def listdir(self, path):
+        directories, files = super().listdir(path)
+        files = set(files)
+        metas = set(name for name in files if name.endswith(self.META_SUFFIX) and
+                    name[:-len(self.META_SUFFIX)] in files)
+        names = set()
+        for name in files - metas:
+            # a compressed file is listed by its logical name
+            names.add(name.rsplit('.', 1)[0] if name + self.META_SUFFIX in metas else name)
+        return directories, sorted(names)
+
+    def accessed_time(self, name):
+        return super().accessed_time(self.stored_name(name)[0])
+
+    def created_time(self, name):
+        return super().created_time(self.stored_name(name)[0])
+
+    def modified_time(self, name):
+        return super().modified_time(self.stored_name(name)[0])
+
+
+class DeduplicatedNymphStorage(CompressedNymphStorage):
+    """
+    CompressedNymphStorage keeping every distinct content once under .blobs/<sha256><codec suffix>,
+    sha256 of the uncompressed content; the file of a logical name is a hard link to its blob, so the link
+    count is the reference count and the blob is removed with its last link.
+    opening a linked file for writing first replaces it by a copy, the other links keep the blob content
+    """
+    BLOB_DIR = ".blobs"
+
+    def blob_path(self, digest, codec=None):
+        suffix = codec.suffix if codec is not None else ''
+        return os.path.join(self.location, self.BLOB_DIR, digest[:2], digest[2:] + suffix)
+
+    def exists_digest(self, digest):
+        """
+        if content with sha256 digest is already stored, compressed with any codec or not
+        """
+        return any(os.path.exists(self.blob_path(digest, codec)) for codec in [None] + list(CODECS.values()))
+
+    def _open(self, name, mode='rb'):
+        if 'w' in mode or 'a' in mode or '+' in mode:
+            stored, codec = self.stored_name(name)
+            path = self._disk_path(stored)
+            if codec is None and os.path.exists(path) and os.stat(path).st_nlink > 1:
+                # copy on write, the blob and its other links keep their content
+                tmp = self._temporary(path)
+                shutil.copy2(path, tmp)
+                os.replace(tmp, path)
+        return super()._open(name, mode)
+
+    def _place(self, tmp, full_path, digest, codec):
+        blob = self.blob_path(digest, codec)
+        for attempt in range(3):
+            if os.path.exists(blob):
+                linked = tmp
+            else:
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                os.replace(tmp, blob)
+                linked = None
+            link = self._temporary(full_path)
+            try:
+                os.link(blob, link)
+            except FileNotFoundError:
+                # blob removed by a concurrent delete, store it again
+                if linked is None:
+                    raise
+                continue
+            os.replace(link, full_path)
+            if os.path.lexists(link):
+                # full_path was already a link to the blob, replace does nothing
+                os.remove(link)
+            if linked is not None:
+                os.remove(linked)
+            return
+        raise IOError("can not link {} to its blob".format(full_path))
+
+    def _blob_of(self, stored):
+        """
+        (sha256 of the content, codec) of a stored file
+        """
+        codec = None
+        if os.path.exists(self._disk_path(stored + self.META_SUFFIX)):
+            meta = self.metadata(stored)
+            codec = CODECS[meta['codec']]
+            if 'sha256' in meta:
+                return meta['sha256'], codec
+        digest = hashlib.sha256()
+        with open(self._disk_path(stored), 'rb') as raw:
+            f = codec.reader(raw) if codec is not None else raw
+            for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest(), codec
+
+    def delete_stored(self, stored):
+        path = self._disk_path(stored)
+        try:
+            links = os.stat(path).st_nlink
+        except FileNotFoundError:
+            return
+        blob = None
+        if links == 2:
+            # the blob is only referenced by this file
+            blob = self.blob_path(*self._blob_of(stored))
+        super().delete_stored(stored)
+        if blob is not None and os.path.exists(blob) and os.stat(blob).st_nlink == 1:
+            os.remove(blob)
+
+    def deduplicate(self, stored):
+        """
+        replace an existing file by a link to its blob, for files stored before deduplication
+        """
+        path = self._disk_path(stored)
+        if os.stat(path).st_nlink > 1:
+            return
+        tmp = self._temporary(path)
+        os.link(path, tmp)
+        self._place(tmp, path, *self._blob_of(stored))
+
+    def collect_blobs(self):
+        """
+        remove blobs no longer linked by any file, return the number removed
+        """
+        removed = 0
+        root = os.path.join(self.location, self.BLOB_DIR)
+        for directory, _, files in os.walk(root):
+            for name in files:
+                path = os.path.join(directory, name)
+                if os.stat(path).st_nlink == 1:
+                    os.remove(path)
+                    removed += 1
+        return removed
+
+
+class Checkpoints:
+    """
+    restart files of one task under <task dir>/checkpoint;
+    a checkpoint is <sequence>.chk with <sequence>.json holding its size and sha256,
+    the sequence is claimed by creating an empty <sequence>.chk, then both are written to a temporary file
+    and renamed, the manifest last so it marks a complete checkpoint;
+    another process may save or prune the same checkpoints concurrently
+    """
+    CHUNK_SIZE = 1024 * 1024
+    # temporary files and claims older than this are left by interrupted saves, younger ones may still be written
+    TMP_AGE = 24 * 3600
+
+    def __init__(self, task_dir, keep=2):
+        self.location = os.path.join(task_dir, "checkpoint")
+        self.keep = keep
+
+    def _path(self, sequence, suffix):
+        return os.path.join(self.location, "{:06d}{}".format(sequence, suffix))
+
+    def _numbered(self, suffix):
+        if not os.path.isdir(self.location):
+            return []
+        return sorted((int(name[:-len(suffix)]) for name in os.listdir(self.location)
+                       if name.endswith(suffix) and name[:-len(suffix)].isdigit()), reverse=True)
+
+    def sequences(self):
+        """
+        sequences of the checkpoints having a manifest, newest first
+        """
+        return self._numbered(".json")
+
+    def _claim(self):
+        """
+        sequence after every checkpoint, claimed or complete, by creating its empty checkpoint file
+        """
+        claimed = self._numbered(".chk") + self.sequences()
+        sequence = max(claimed) + 1 if claimed else 1
+        while True:
+            try:
+                os.close(os.open(self._path(sequence, ".chk"), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return sequence
+            except FileExistsError:
+                sequence += 1
+
+    @staticmethod
+    def _replace(tmp, path):
+        with open(tmp, 'rb+') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        # the rename is durable once the directory is synced, which Windows does not support
+        if os.name == 'posix':
+            fd = os.open(os.path.dirname(path), os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def save(self, content, label=""):
+        """
+        content is a file like object or bytes; return the manifest of the new checkpoint
+        """
+        os.makedirs(self.location, exist_ok=True)
+        sequence = self._claim()
+        if isinstance(content, bytes):
+            content = io.BytesIO(content)
+        digest = hashlib.sha256()
+        size = 0
+        path = self._path(sequence, ".chk")
+        tmp = _temporary(path)
+        with open(tmp, 'wb') as f:
+            for chunk in iter(lambda: content.read(self.CHUNK_SIZE), b''):
+                digest.update(chunk)
+                size += len(chunk)
+                f.write(chunk)
+        self._replace(tmp, path)
+        manifest = {'sequence': sequence, 'label': label, 'size': size, 'sha256': digest.hexdigest(),
+                    'time': time.time()}
+        manifest_path = self._path(sequence, ".json")
+        tmp = _temporary(manifest_path)
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f)
+        self._replace(tmp, manifest_path)
+        self.prune()
+        return manifest
+
+    def manifest(self, sequence):
+        with open(self._path(sequence, ".json")) as f:
+            return json.load(f)
+
+    def verify(self, manifest):
+        path = self._path(manifest['sequence'], ".chk")
+        if not os.path.isfile(path) or os.path.getsize(path) != manifest['size']:
+            return False
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest() == manifest['sha256']
+
+    def latest(self):
+        """
+        manifest of the newest checkpoint passing the integrity check, None if there is none
+        """
+        for manifest in self.valid():
+            return manifest
+
+    def complete(self):
+        """
+        manifests of the checkpoints whose file has the size of the manifest, newest first, without reading them;
+        checkpoints removed meanwhile by a concurrent prune are skipped
+        """
+        for sequence in self.sequences():
+            try:
+                manifest = self.manifest(sequence)
+                if os.path.getsize(self._path(sequence, ".chk")) == manifest['size']:
+                    yield manifest
+            except (ValueError, KeyError, FileNotFoundError):
+                continue
+
+    def valid(self):
+        """
+        manifests of the complete checkpoints passing the integrity check, newest first
+        """
+        for manifest in self.complete():
+            try:
+                if self.verify(manifest):
+                    yield manifest
+            except FileNotFoundError:
+                continue
+
+    def open(self, manifest):
+        return open(self._path(manifest['sequence'], ".chk"), 'rb')
+
+    def path(self, manifest):
+        return self._path(manifest['sequence'], ".chk")
+
+    def prune(self):
+        """
+        remove the checkpoints older than the newest keep complete ones and the temporary files and claims
+        left by interrupted saves; checkpoints are only read by latest(), which skips the corrupt ones
+        """
+        kept = [manifest['sequence'] for manifest in itertools.islice(self.complete(), self.keep)]
+        if len(kept) == self.keep:
+            for sequence in self.sequences():
+                if sequence >= kept[-1]:
+                    continue
+                for suffix in (".json", ".chk"):
+                    try:
+                        os.remove(self._path(sequence, suffix))
+                    except FileNotFoundError:
+                        pass
+        now = time.time()
+        manifests = set(self.sequences())
+        for name in os.listdir(self.location):
+            path = os.path.join(self.location, name)
+            left = name.endswith(".tmp") or (name.endswith(".chk") and name[:-4].isdigit() and
+                                             int(name[:-4]) not in manifests)
+            try:
+                if left and now - os.path.getmtime(path) > self.TMP_AGE:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,364 @@
+"""
+synthetic data of production size
+
+rows are generated by a random.Random seeded by the caller so the same seed gives the same data,
+and inserted with bulk_create in batches; signals are not sent and no file is written.
+"""
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.color import no_style
+from django.db import connections, router, transaction
+from .models import (WimsNuclide, WmisElement, WmisElementComposition, BasicMaterial, BasicMaterialNumCompo, Mixture,
+                     MixtureCompo, Material, ComputeNode, Coordinate, PositionPattern, AssemblyPosition,
+                     ReactorPosition, ReactorModel, Plant, Unit, Cycle, Rod, RodIntersectSurface,
+                     RodIntersectSurfaceMaterial, AssemblyIntersectSurface, AssemblyIntersectSurfaceCompo, AssemblyCut,
+                     FuelAssemblyModel, FuelElementType, FuelAssemblyType, FuelElementLoadingPattern, FuelAssembly,
+                     FuelAssemblyLoadingPattern, LoadingPattern, ControlRodClusterMap, AssemblyTask, BPOutTask,
+                     BaffleCalculation, RobinTask, EgretFollowTask, EgretFollowCase, EgretSequenceTask,
+                     burn_up_label)
+
+BATCH_SIZE = 1000
+# share of tasks in each status, most tasks are finished
+STATUS_WEIGHTS = ((0, 2), (1, 3), (2, 3), (3, 1), (4, 1), (5, 1), (6, 85), (7, 4))
+# assemblies in every row of the core
+CORE_ROWS = {
+    157: (9, 11, 13, 13, 13, 13, 13, 13, 13, 13, 13, 11, 9),
+    193: (7, 11, 13, 13, 15, 15, 15, 15, 15, 15, 15, 13, 13, 11, 7),
+}
+ROW_LETTERS = 'ABCDEFGHJKLMNPRST'
+# 17x17 assembly: 264 fuel pins, 24 guide tubes and the central instrument tube, (row, column) from 0
+ASSEMBLY_SIZE = 17
+GUIDE_TUBES = frozenset([(2, 5), (2, 8), (2, 11), (3, 3), (3, 13), (5, 2), (5, 5), (5, 8), (5, 11), (5, 14),
+                         (8, 2), (8, 5), (8, 11), (8, 14), (11, 2), (11, 5), (11, 8), (11, 11), (11, 14),
+                         (13, 3), (13, 13), (14, 5), (14, 8), (14, 11)])
+INSTRUMENT_TUBE = (8, 8)
+ENRICHMENTS = (Decimal('1.8'), Decimal('2.4'), Decimal('3.1'), Decimal('3.7'), Decimal('4.45'))
+CYCLE_LENGTH = 540
+CYCLE_BURN_UP = 20000
+
+
+class SyntheticData:
+    def __init__(self, seed=0, batch_size=BATCH_SIZE):
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self._statuses = [status for status, weight in STATUS_WEIGHTS for _ in range(weight)]
+
+    def batch_size_of(self, model, fields, objects):
+        # sqlite limits the number of rows of one insert
+        limit = connections[router.db_for_write(model)].ops.bulk_batch_size(fields, objects)
+        return min(self.batch_size, max(limit, 1))
+
+    def bulk(self, model, objects):
+        """
+        insert objects and return them with primary keys
+        """
+        objects = list(objects)
+        if not objects:
+            return objects
+        using = router.db_for_write(model)
+        connection = connections[using]
+        with transaction.atomic(using=using):
+            if objects[0].pk is None:
+                # ids of bulk inserts are not returned: take those after the highest id, the row of which is
+                # locked against concurrent inserts where the backend supports it; a concurrent insert taking
+                # one of them anyway makes the insert fail instead of giving objects wrong ids
+                last = model.objects.using(using).select_for_update().order_by('-pk').values_list(
+                    'pk', flat=True).first()
+                for pk, obj in enumerate(objects, (last or 0) + 1):
+                    obj.pk = pk
+            model.objects.using(using).bulk_create(
+                objects, self.batch_size_of(model, model._meta.concrete_fields, objects))
+            with connection.cursor() as cursor:
+                # backends with sequences do not advance them for explicit ids
+                for sql in connection.ops.sequence_reset_sql(no_style(), [model]):
+                    cursor.execute(sql)
+        return objects
+
+    def bulk_inherited(self, model, objects):
+        """
+        bulk() of a multi-table inherited model like BPOutTask: the parent rows first, then the rows of model
+        """
+        objects = list(objects)
+        parent = model._meta.pk.related_model
+        parents = self.bulk(parent, (parent(**{field.attname: getattr(obj, field.attname)
+                                               for field in parent._meta.concrete_fields if not field.primary_key})
+                                     for obj in objects))
+        for obj, row in zip(objects, parents):
+            obj.pk = row.pk
+            setattr(obj, parent._meta.pk.attname, row.pk)
+        using = router.db_for_write(model)
+        fields = model._meta.local_concrete_fields
+        size = self.batch_size_of(model, fields, objects)
+        with transaction.atomic(using=using):
+            for start in range(0, len(objects), size):
+                model._base_manager._insert(objects[start:start + size], fields=fields, using=using)
+        return objects
+
+    def status(self):
+        return self.random.choice(self._statuses)
+
+    def base(self, nodes=20, cycles=10):
+        """
+        reference rows every generated table points to
+        """
+        self.user = User.objects.create(username="synthetic_{}".format(self.random.getrandbits(32)))
+        # nodes are shared by the data of every seed
+        existing = {node.name: node for node in ComputeNode.objects.filter(name__startswith="node_")}
+        self.bulk(ComputeNode, (
+            ComputeNode(name="node_{}".format(i), IP="10.0.{}.{}".format(i // 250, i % 250 + 1),
+                        queue="queue_{}".format(i)) for i in range(nodes) if "node_{}".format(i) not in existing))
+        self.nodes = list(ComputeNode.objects.filter(name__in=["node_{}".format(i) for i in range(nodes)])
+                          .order_by('pk'))
+        self.core_pattern = PositionPattern.objects.create(name="synthetic core {}".format(self.user.pk), type=2)
+        self.assembly_pattern = PositionPattern.objects.create(name="synthetic assembly {}".format(self.user.pk),
+                                                               type=1)
+        self.reactor_positions = self.bulk(ReactorPosition, (ReactorPosition(pattern=self.core_pattern)
+                                                             for _ in range(157)))
+        self.reactor_model = self.create_reactor_model(self.core_pattern, 15, 15)
+        self.plant = Plant.objects.create(name="synthetic")
+        self.unit = Unit.objects.create(plant=self.plant, unit_num=1, reactor_model=self.reactor_model)
+        self.cycles = []
+        self.add_cycles(cycles)
+        self.rod = Rod.objects.create(usage=4)
+        self.rod_surface = RodIntersectSurface.objects.create(outer_diameter=Decimal('0.95'))
+        self.pin_map = AssemblyIntersectSurface.objects.create(fuel=False, position_pattern=self.assembly_pattern)
+        self.fuel_map = AssemblyIntersectSurface.objects.create(fuel=True, position_pattern=self.assembly_pattern)
+        self.assembly_model = FuelAssemblyModel.objects.create(
+            name='AFA3G', position_pattern=self.assembly_pattern, active_length=365.8, side_length=21.4,
+            guide_tube=self.rod, pin_pitch=1.26)
+        self.assembly_type = FuelAssemblyType.objects.create(model=self.assembly_model, assembly_enrichment=4.45)
+        self.loading_pattern = LoadingPattern.objects.create(name="synthetic", user=self.user, cycle=self.cycles[0],
+                                                             file="synthetic")
+        self.rod_map = ControlRodClusterMap.objects.create(reactor_model=self.reactor_model)
+        return self
+
+    def create_reactor_model(self, pattern, rows, columns):
+        return ReactorModel.objects.create(
+            name='M310', position_pattern=pattern, row_index=" ".join(ROW_LETTERS[:rows]),
+            column_index=" ".join(str(i + 1) for i in range(columns)), diameter=304, active_height=365.8,
+            primary_system_pressure=15.5, rated_power=2895, power_density=38.4, coolant_volume=270,
+            coolant_flow_rate=68520, fuel_temperature=900, moderator_temperature=580, step_size=1.58,
+            default_step=225, max_step=225)
+
+    def add_cycles(self, number):
+        start = len(self.cycles)
+        self.cycles.extend(self.bulk(Cycle, (Cycle(unit=self.unit, cycle_num=i + 1, _order=i)
+                                             for i in range(start, start + number))))
+        return self.cycles[start:]
+
+    def task_fields(self, i):
+        return dict(name="task_{}".format(i), user=self.user, status=self.status(),
+                    compute_node=self.random.choice(self.nodes))
+
+    def generic_objects(self, model, rows, fields=lambda i: {}):
+        """
+        rows pointing to rows of a few content types, like materials of basic materials and mixtures
+        """
+        content_types = [ContentType.objects.get_for_model(item) for item in (BasicMaterial, AssemblyTask, Rod)]
+        return self.bulk(model, (model(content_type=self.random.choice(content_types),
+                                       object_id=self.random.randint(1, rows), **fields(i)) for i in range(rows)))
+
+    def hot_paths(self, rows):
+        """
+        rows in every table of the indexed query paths
+        """
+        self.assembly_tasks = self.bulk(AssemblyTask, (
+            AssemblyTask(reactor_model=self.reactor_model, pin_map=self.pin_map, fuel_map=self.fuel_map, bp_in=False,
+                         **self.task_fields(i)) for i in range(rows)))
+        self.bulk(BaffleCalculation, (BaffleCalculation(assembly_task=task, **self.task_fields(i))
+                                      for i, task in enumerate(self.assembly_tasks)))
+        self.generic_objects(RobinTask, rows, self.task_fields)
+        self.follow_tasks = self.bulk(EgretFollowTask, (EgretFollowTask(loading_pattern=self.loading_pattern,
+                                                                        **self.task_fields(i))
+                                                        for i in range(rows)))
+        self.bulk(EgretSequenceTask, (EgretSequenceTask(follow_task=task, **self.task_fields(i))
+                                      for i, task in enumerate(self.follow_tasks)))
+        self.generic_objects(Material, rows)
+        self.generic_objects(AssemblyCut, rows, lambda i: {'intersect_surface': self.pin_map})
+        assemblies = self.bulk(FuelAssembly, (FuelAssembly(fuel_assembly_type=self.assembly_type)
+                                              for _ in range(len(self.reactor_positions))))
+        self.add_cycles(max(rows // len(self.reactor_positions) - len(self.cycles), 0))
+        self.bulk(FuelAssemblyLoadingPattern, (
+            FuelAssemblyLoadingPattern(cycle=cycle, fuel_assembly=self.random.choice(assemblies), position=position)
+            for cycle in self.cycles for position in self.reactor_positions))
+        cases_per_task = 20
+        self.bulk(EgretFollowCase, (
+            EgretFollowCase(follow_task=task, burn_up=Decimal(order * 1000), relative_power=1,
+                            control_rod_cluster_map=self.rod_map, _order=order)
+            for task in self.follow_tasks[:max(rows // cases_per_task, 1)] for order in range(cases_per_task)))
+        return self
+
+    def coordinates(self, size):
+        """
+        {(row, column): Coordinate} of a size x size grid, from 1, created when missing
+        """
+        grid = {(item.row, item.column): item
+                for item in Coordinate.objects.filter(row__lte=size, column__lte=size)}
+        missing = [Coordinate(row=row, column=column) for row in range(1, size + 1) for column in range(1, size + 1)
+                   if (row, column) not in grid]
+        grid.update(((item.row, item.column), item) for item in self.bulk(Coordinate, missing))
+        return grid
+
+    def positions(self, model, pattern, cells):
+        """
+        positions of pattern at cells, ((row, column), fields) pairs
+        """
+        grid = self.coordinates(max(max(cell) for cell, fields in cells))
+        positions = self.bulk(model, (model(pattern=pattern, **fields) for cell, fields in cells))
+        through = model.coordinates.through
+        column = model._meta.model_name + '_id'
+        self.bulk(through, (through(coordinate_id=grid[cell].pk, **{column: position.pk})
+                            for position, (cell, fields) in zip(positions, cells)))
+        return positions
+
+    def fuel_assembly_types(self):
+        """
+        17x17 assembly model with a type of every enrichment, each loading 264 fuel pins
+        """
+        pattern = PositionPattern.objects.create(name="synthetic 17x17 {}".format(self.user.pk), type=1)
+        cells = []
+        for row in range(ASSEMBLY_SIZE):
+            for column in range(ASSEMBLY_SIZE):
+                kind = 3 if (row, column) == INSTRUMENT_TUBE else 2 if (row, column) in GUIDE_TUBES else 1
+                cells.append(((row + 1, column + 1), {'type': kind}))
+        positions = self.positions(AssemblyPosition, pattern, cells)
+        fuel_positions = [position for position in positions if position.type == 1]
+        fuel_rod = Rod.objects.create(usage=1)
+        guide_surface = RodIntersectSurface.objects.create(outer_diameter=Decimal('1.224'),
+                                                           inner_diameter=Decimal('1.124'))
+        self.pin_map = AssemblyIntersectSurface.objects.create(fuel=False, position_pattern=pattern)
+        self.fuel_map = AssemblyIntersectSurface.objects.create(fuel=True, position_pattern=pattern)
+        self.bulk(AssemblyIntersectSurfaceCompo, (
+            AssemblyIntersectSurfaceCompo(assembly_intersect_surface=surface_map, position=position,
+                                          rod_intersect_surface=self.rod_surface if position.type == 1
+                                          else guide_surface)
+            for surface_map in (self.pin_map, self.fuel_map) for position in positions))
+        self.assembly_model = FuelAssemblyModel.objects.create(
+            name='AFA3G', position_pattern=pattern, active_length=365.8, side_length=21.4, guide_tube=self.rod,
+            instrument_tube=Rod.objects.create(usage=5), pin_pitch=1.26)
+        self.assembly_types = []
+        for enrichment in ENRICHMENTS:
+            element_type = FuelElementType.objects.create(rod=fuel_rod, remark="{}%".format(enrichment))
+            assembly_type = FuelAssemblyType.objects.create(model=self.assembly_model, assembly_enrichment=enrichment)
+            self.bulk(FuelElementLoadingPattern, (
+                FuelElementLoadingPattern(fuel_assembly_type=assembly_type, fuel_element_type=element_type,
+                                          position=position) for position in fuel_positions))
+            self.assembly_types.append(assembly_type)
+        return self.assembly_types
+
+    def core(self, size):
+        """
+        reactor model of a core of size assemblies, returns the model and its positions
+        """
+        rows = CORE_ROWS[size]
+        columns = max(rows)
+        cells = [((row + 1, (columns - width) // 2 + column + 1), {})
+                 for row, width in enumerate(rows) for column in range(width)]
+        pattern = PositionPattern.objects.create(name="synthetic core{} {}".format(size, self.user.pk), type=2)
+        positions = self.positions(ReactorPosition, pattern, cells)
+        return self.create_reactor_model(pattern, len(rows), columns), positions
+
+    def plants(self, plants, units=2, cycles=10, core=157, follow_tasks=5, cases=20, assembly_tasks=5,
+               bp_out_tasks=5, burn_up_points=10, baffle_calculations=5):
+        """
+        plants x units x cycles with their fuel loading, one loading pattern of every cycle and its egret tasks;
+        every cycle reloads a third of the core with fresh assemblies.
+        assembly tasks of the core model, bp out tasks and a baffle calculation of each of the first
+        baffle_calculations assembly tasks, with a robin task of every burn up point and model type
+        """
+        self.fuel_assembly_types()
+        reactor_model, positions = self.core(core)
+        rod_map = ControlRodClusterMap.objects.create(reactor_model=reactor_model)
+        plant_rows = self.bulk(Plant, (Plant(name="synthetic {}".format(i + 1)) for i in range(plants)))
+        unit_rows = self.bulk(Unit, (Unit(plant=plant, unit_num=i + 1, reactor_model=reactor_model, _order=i)
+                                     for plant in plant_rows for i in range(units)))
+        self.plant_cycles = cycle_rows = self.bulk(Cycle, (
+            Cycle(unit=unit, cycle_num=i + 1, _order=i, start_date=date(2000, 1, 1) + timedelta(CYCLE_LENGTH * i),
+                  end_date=date(2000, 1, 1) + timedelta(CYCLE_LENGTH * (i + 1) - 30))
+            for unit in unit_rows for i in range(cycles)))
+        reload = max(core // 3, 1)
+        fresh = core + reload * (cycles - 1)
+        assemblies = self.bulk(FuelAssembly, (
+            FuelAssembly(fuel_assembly_type=self.random.choice(self.assembly_types),
+                         product_num="S{}U{}A{}".format(self.user.pk, unit.pk, i))
+            for unit in unit_rows for i in range(fresh)))
+        loading = []
+        for index, unit in enumerate(unit_rows):
+            stock = iter(assemblies[index * fresh:(index + 1) * fresh])
+            loaded = [next(stock) for _ in range(core)]
+            for cycle in cycle_rows[index * cycles:(index + 1) * cycles]:
+                if cycle.cycle_num > 1:
+                    for i in self.random.sample(range(core), reload):
+                        loaded[i] = next(stock)
+                    self.random.shuffle(loaded)
+                loading.extend(FuelAssemblyLoadingPattern(cycle=cycle, fuel_assembly=assembly, position=position)
+                               for assembly, position in zip(loaded, positions))
+        self.bulk(FuelAssemblyLoadingPattern, loading)
+        patterns = self.bulk(LoadingPattern, (
+            LoadingPattern(name="synthetic {}".format(cycle.cycle_num), user=self.user, cycle=cycle,
+                           file="synthetic", authorized=True) for cycle in cycle_rows))
+        self.follow_tasks = self.bulk(EgretFollowTask, (
+            EgretFollowTask(loading_pattern=pattern, **self.task_fields(i))
+            for pattern in patterns for i in range(follow_tasks)))
+        self.bulk(EgretFollowCase, (
+            EgretFollowCase(follow_task=task, burn_up=Decimal(CYCLE_BURN_UP * order // cases),
+                            relative_power=Decimal(self.random.randint(50, 100)) / 100,
+                            control_rod_cluster_map=rod_map, export=order % 5 == 0, _order=order)
+            for task in self.follow_tasks for order in range(cases)))
+        self.bulk(EgretSequenceTask, (EgretSequenceTask(follow_task=task, **self.task_fields(i))
+                                      for i, task in enumerate(self.follow_tasks)))
+        self.assembly_tasks = self.bulk(AssemblyTask, (
+            AssemblyTask(reactor_model=reactor_model, pin_map=self.pin_map, fuel_map=self.fuel_map, bp_in=False,
+                         **self.task_fields(i)) for i in range(assembly_tasks)))
+        points = ",".join(burn_up_label(Decimal(CYCLE_BURN_UP * i // burn_up_points) / 1000)
+                          for i in range(burn_up_points))
+        self.bp_out_tasks = self.bulk_inherited(BPOutTask, (
+            BPOutTask(reactor_model=reactor_model, pin_map=self.pin_map, fuel_map=self.fuel_map, bp_in=False,
+                      burn_up_points=points, **self.task_fields(i)) for i in range(bp_out_tasks)))
+        self.baffle_calculations = self.bulk(BaffleCalculation, (
+            BaffleCalculation(assembly_task=task, **self.task_fields(i))
+            for i, task in enumerate(self.assembly_tasks[:baffle_calculations])))
+        content_types = ContentType.objects.get_for_models(BPOutTask, BaffleCalculation)
+        self.robin_tasks = self.bulk(RobinTask, (
+            RobinTask(content_type=content_types[type(group)], object_id=group.pk, label=label, input_file="synthetic",
+                      **self.task_fields(i))
+            for group in self.bp_out_tasks + self.baffle_calculations
+            for i, label in enumerate(group.child_labels())))
+        return self
+
+    def materials(self, number=100, elements=8):
+        """
+        basic materials of a few elements, a mixture of two of them for every fourth, and their Material rows;
+        rings of the fuel rod surface are made of the first three
+        """
+        element_rows = self.bulk(WmisElement, (WmisElement(name="synthetic {}".format(i)) for i in range(elements)))
+        nuclides = self.bulk(WimsNuclide, (
+            WimsNuclide(nuclide_name="synthetic {}".format(i), amu=Decimal(self.random.randint(1000, 240000)) / 1000,
+                        nf=0, material_type='S', description="synthetic") for i in range(2 * elements)))
+        self.bulk(WmisElementComposition, (
+            WmisElementComposition(wmis_element=element, wmis_nuclide=nuclides[2 * i + j], weight_percent=50)
+            for i, element in enumerate(element_rows) for j in range(2)))
+        basic_materials = self.bulk(BasicMaterial, (
+            BasicMaterial(name="S{}B{}".format(self.user.pk, i), density=Decimal(self.random.randint(100, 2000)) / 100)
+            for i in range(number)))
+        self.bulk(BasicMaterialNumCompo, (
+            BasicMaterialNumCompo(basic_material=basic_material, element=element,
+                                  element_number=self.random.randint(1, 4), _order=order)
+            for basic_material in basic_materials
+            for order, element in enumerate(self.random.sample(element_rows, min(3, elements)))))
+        mixtures = self.bulk(Mixture, (Mixture(name="S{}X{}".format(self.user.pk, i)) for i in range(number // 4)))
+        self.bulk(MixtureCompo, (MixtureCompo(mixture=mixture, basic_material=basic_material, percent=50)
+                                 for mixture in mixtures for basic_material in self.random.sample(basic_materials, 2)))
+        content_types = ContentType.objects.get_for_models(BasicMaterial, Mixture)
+        self.material_rows = self.bulk(Material, (
+            Material(content_type=content_types[type(item)], object_id=item.pk)
+            for item in basic_materials + mixtures))
+        self.bulk(RodIntersectSurfaceMaterial, (
+            RodIntersectSurfaceMaterial(intersect_surface=self.rod_surface, material=material,
+                                        outer_diameter=diameter, _order=order)
+            for order, (material, diameter) in enumerate(zip(self.material_rows,
+                                                             (Decimal('0.819'), Decimal('0.836'), Decimal('0.95'))))))
+        return self
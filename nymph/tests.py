@@ -1,4 +1,1138 @@
-from django.test import TestCase
+import datetime
+import gc
+import hashlib
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+from collections import deque
+from types import SimpleNamespace
+from unittest import mock, skipUnless
+import warnings
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.db import DatabaseError, connection, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+import numpy as np
+from .models import (ComputeNode, PositionPattern, ReactorModel, AssemblyIntersectSurface, AssemblyTask, BPOutTask,
+                     TaskRuntimeStatistic, Plant, Profile, Unit, Cycle, LoadingPattern, ComponentAssembly,
+                     ControlRodCluster, ControlRodClusterMap, ControlRodClusterStep, EgretFollowTask,
+                     EgretFollowCase, BaffleCalculation, RobinTask, TaskStatusChange, ReferenceChange,
+                     EgretSequenceTask, Element, Material, WmisElement,
+                     transport_workload, parse_burn_up_points, branch_values)
+from .feed import ChangeFeed
+from .storage import Checkpoints, CompressedNymphStorage, DeduplicatedNymphStorage
+from .interpolation import Interpolator, interpolate_core
+from .xs_table import BranchTable
+from . import (scheduler, fanout, follow, paths, sequence, pipeline, views, results, invalidation, cache, routers,
+               profiling, spans, orphans, xs_table, builders)
+from .synthetic import SyntheticData
+from .management.commands import benchmark_indexes, check_squashed_migrations
+
+
+def reference_data(test):
+    """
+    the rows every task points to, set as attributes of test
+    """
+    # ids of rolled back rows are used again
+    paths.clear()
+    test.node1 = ComputeNode.objects.create(name='node1', IP='10.0.0.1', queue='queue1')
+    test.node2 = ComputeNode.objects.create(name='node2', IP='10.0.0.2', queue='queue2')
+    core_pattern = PositionPattern.objects.create(name='core', type=2)
+    test.reactor_model = ReactorModel.objects.create(
+        name='M310', position_pattern=core_pattern, row_index='A B', column_index='1 2', diameter=1, active_height=1,
+        primary_system_pressure=1, rated_power=1, power_density=1, coolant_volume=1, coolant_flow_rate=1,
+        fuel_temperature=1, moderator_temperature=1, step_size=1, default_step=1, max_step=1)
+    test.assembly_pattern = PositionPattern.objects.create(name='assembly', type=1)
+    test.pin_map = AssemblyIntersectSurface.objects.create(fuel=False, position_pattern=test.assembly_pattern)
+    test.user = User.objects.create_user('user', password='password')
+    test.plant = Plant.objects.create(name='plant')
+    Profile.objects.create(user=test.user).plants.add(test.plant)
+    test.unit = Unit.objects.create(plant=test.plant, unit_num=1, reactor_model=test.reactor_model)
+    test.cycle = Cycle.objects.create(unit=test.unit, cycle_num=1)
+    test.loading_pattern = LoadingPattern.objects.create(name='pattern', user=test.user, cycle=test.cycle, file='x')
+    component = ComponentAssembly.objects.create(name='rcca', position_pattern=test.assembly_pattern, type=1)
+    cluster = ControlRodCluster.objects.create(reactor_model=test.reactor_model, cluster_name='R',
+                                               component_assembly=component)
+    test.rod_map = ControlRodClusterMap.objects.create(reactor_model=test.reactor_model)
+    ControlRodClusterStep.objects.create(map=test.rod_map, control_rod_cluster=cluster, step=100)
+
+
+def assembly_task(test, **fields):
+    fields.setdefault('name', 'assembly')
+    fields.setdefault('user', test.user)
+    return AssemblyTask.objects.create(reactor_model=test.reactor_model, pin_map=test.pin_map, fuel_map=test.pin_map,
+                                       bp_in=False, **fields)
+
+
+def follow_task(test, cases=3, **fields):
+    fields.setdefault('user', test.user)
+    task = EgretFollowTask.objects.create(name='follow', loading_pattern=test.loading_pattern, **fields)
+    for i in range(cases):
+        EgretFollowCase.objects.create(follow_task=task, burn_up=i * 100, relative_power=1,
+                                       control_rod_cluster_map=test.rod_map)
+    return task
+
+
+class SchedulerTest(TestCase):
+    def setUp(self):
+        reference_data(self)
+
+    def test_transport_workload_of_zero_track_density(self):
+        self.assertGreater(transport_workload(0, '4,16', 2), transport_workload('0.03', '4,16', 2))
+        task = assembly_task(self, track_density=0)
+        self.assertGreater(task.workload, 0)
+        scheduler.assign_compute_nodes([task], save=False)
+        self.assertIsNotNone(task.compute_node)
+
+    def test_longest_task_first_to_earliest_node(self):
+        tasks = [assembly_task(self, name='t{}'.format(i), max_boron_density=200 * i) for i in (1, 5, 5)]
+        backlog = scheduler.assign_compute_nodes(tasks)
+        nodes = [AssemblyTask.objects.get(pk=task.pk).compute_node_id for task in tasks]
+        # both long tasks can not share a node
+        self.assertNotEqual(nodes[1], nodes[2])
+        self.assertAlmostEqual(max(backlog.values()), tasks[1].workload + tasks[0].workload * (nodes[0] in nodes[1:]))
+
+    def test_completed_task_updates_runtime_statistic(self):
+        task = assembly_task(self, compute_node=self.node1)
+        task.start_time = timezone.now()
+        task.end_time = task.start_time + datetime.timedelta(seconds=100)
+        task.status = 6
+        task.save()
+        task.save()
+        statistic = TaskRuntimeStatistic.objects.get()
+        self.assertEqual(statistic.samples, 1)
+        self.assertAlmostEqual(statistic.seconds_per_workload, 100 / task.workload)
+
+    def test_backlog_counts_child_rows_once(self):
+        BPOutTask.objects.create(name='bp', reactor_model=self.reactor_model, pin_map=self.pin_map,
+                                 fuel_map=self.pin_map, bp_in=False, burn_up_points='1,2', status=1,
+                                 compute_node=self.node1)
+        self.assertEqual(scheduler._own_rows(AssemblyTask).count(), 0)
+        backlog = scheduler.node_backlog([self.node1, self.node2], scheduler.RuntimeModel())
+        self.assertGreater(backlog[self.node1.pk], 0)
+        self.assertEqual(backlog[self.node2.pk], 0)
+
+    def test_backlog_queries_do_not_grow_with_active_tasks(self):
+        def queries():
+            runtime_model = scheduler.RuntimeModel()
+            with CaptureQueriesContext(connection) as context:
+                backlog = scheduler.node_backlog([self.node1], runtime_model)
+            return len(context), backlog[self.node1.pk]
+
+        def add_tasks():
+            follow_task(self, cases=3, status=1, compute_node=self.node1)
+            baffle = BaffleCalculation.objects.create(assembly_task=assembly_task(self), user=self.user)
+            fanout.create_children(baffle).update(status=1, compute_node=self.node1)
+
+        add_tasks()
+        # content types are cached by the first call
+        queries()
+        before, backlog = queries()
+        add_tasks()
+        self.assertEqual(queries(), (before, 2 * backlog))
+
+
+class BurnUpPointTest(TestCase):
+    def setUp(self):
+        reference_data(self)
+
+    def bp_out_task(self, burn_up_points):
+        return BPOutTask.objects.create(name='bp', reactor_model=self.reactor_model, pin_map=self.pin_map,
+                                        fuel_map=self.pin_map, bp_in=False, burn_up_points=burn_up_points)
+
+    def test_labels_are_normalized(self):
+        task = self.bp_out_task('20.0001, 10.50 1e1,0,10.5')
+        self.assertEqual(task.child_labels(), ['0', '10', '10.5', '20'])
+        self.assertTrue(task.dir('10.50').endswith('burn_up_10.5'))
+        labels = [child.label for child in fanout.create_children(task)]
+        self.assertEqual(sorted(labels), ['0', '10', '10.5', '20'])
+
+    def test_point_too_long_for_label(self):
+        with self.assertRaises(ValidationError):
+            parse_burn_up_points('12345678901234567')
+        with self.assertRaises(ValidationError):
+            parse_burn_up_points('1e30')
+
+    def test_invalid_saved_points_are_skipped(self):
+        task = self.bp_out_task('x,5,-1')
+        with self.assertLogs('nymph.models', 'WARNING') as logs:
+            self.assertEqual(task.child_labels(), ['5'])
+            self.assertEqual(task.workload, AssemblyTask.workload.fget(task))
+        self.assertEqual(len(logs.output), 4)
+        self.assertEqual(self.bp_out_task('').workload, 0)
+
+
+def failing_publisher(task, checkpoint=None):
+    raise ConnectionError("queue unreachable")
+
+
+# (task, status, checkpoint) of every call of recording_publisher
+published = []
+
+
+def recording_publisher(task, **kwargs):
+    published.append((task, task.status, kwargs.get('checkpoint')))
+
+
+def file_root(test):
+    """
+    temporary NYMPH_FILE_ROOT for the test
+    """
+    root = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, root, True)
+    settings = override_settings(NYMPH_FILE_ROOT=root)
+    settings.enable()
+    test.addCleanup(settings.disable)
+    return root
+
+
+def touch(path, content=b''):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+
+
+class FollowRestartTest(TestCase):
+    def setUp(self):
+        reference_data(self)
+        file_root(self)
+
+    def complete(self, task):
+        task.status = 6
+        task.end_time = timezone.now()
+        task.save()
+        for case_index in range(task.egretfollowcase_set.count()):
+            touch(task.restart_file(case_index))
+
+    def test_rerun_of_edited_task(self):
+        task = follow_task(self, cases=3)
+        scheduler.dispatch([task], [self.node1])
+        self.assertEqual(task.restart_case, 0)
+        self.complete(task)
+        case = task.egretfollowcase_set.order_by('_order').last()
+        case.relative_power = '0.5'
+        case.save()
+        task.status = 0
+        task.save()
+        scheduler.dispatch([task], [self.node1])
+        task = EgretFollowTask.objects.get(pk=task.pk)
+        self.assertEqual((task.restart_task_id, task.restart_case), (task.pk, 2))
+        self.assertEqual(task.workload, 1)
+        self.assertEqual(follow.restart_state(task), task.restart_file(1))
+        # the second run overwrote the states after case 2 of the first one
+        self.assertEqual([len(json.loads(run.cases)) for run in task.runs.order_by('pk')], [2, 3])
+
+    def test_base_run_cases_are_those_run(self):
+        base = follow_task(self, cases=3)
+        scheduler.dispatch([base], [self.node1])
+        self.complete(base)
+        # editing the base task after its run does not change what was run
+        base.egretfollowcase_set.order_by('_order').first().delete()
+        task = follow_task(self, cases=3)
+        self.assertEqual(follow.plan_restart(task), 3)
+        self.assertEqual(task.restart_task, base)
+
+    def test_run_without_saved_state(self):
+        base = follow_task(self, cases=3)
+        scheduler.dispatch([base], [self.node1])
+        base.status = 6
+        base.save()
+        task = follow_task(self, cases=3)
+        self.assertEqual(follow.plan_restart(task), 0)
+        self.assertIsNone(task.restart_task)
+
+
+class PipelineTest(TestCase):
+    def setUp(self):
+        reference_data(self)
+        self.pre = follow_task(self, status=6)
+
+    def test_only_authorized_dependents_are_released(self):
+        waiting = follow_task(self, pre_egret_task=self.pre)
+        authorized = follow_task(self, pre_egret_task=self.pre, authorized=True)
+        self.assertEqual(pipeline.release_dependents(self.pre, [self.node1]), [authorized])
+        self.assertEqual(EgretFollowTask.objects.get(pk=waiting.pk).status, 0)
+        self.assertEqual(EgretFollowTask.objects.get(pk=authorized.pk).status, 1)
+        self.assertEqual(pipeline.Pipeline([waiting]).ready(), [])
+
+    @override_settings(NYMPH_TASK_PUBLISHER='nymph.tests.failing_publisher')
+    def test_release_failure_is_logged(self):
+        follow_task(self, pre_egret_task=self.pre, authorized=True)
+        with self.assertLogs('nymph.pipeline', 'ERROR'):
+            self.assertEqual(pipeline.release_dependents(self.pre, [self.node1]), [])
+
+    def test_task_restarting_from_itself(self):
+        task = follow_task(self, pre_egret_task=self.pre, authorized=True)
+        task.restart_task = task
+        task.restart_case = 2
+        task.save()
+        self.assertEqual(pipeline.dependencies(task), [self.pre])
+        self.assertTrue(pipeline.is_ready(task))
+        path, seconds = pipeline.Pipeline([task]).critical_path()
+        self.assertEqual(path, [self.pre, task])
+        self.assertEqual(pipeline.release_dependents(self.pre, [self.node1]), [task])
+
+
+class SequencePlanTest(SimpleTestCase):
+    def case(self, pk, follow_case_id, *quantities):
+        flags = {quantity: quantity in quantities for quantity in sequence.QUANTITIES}
+        return SimpleNamespace(pk=pk, follow_case_id=follow_case_id, **flags)
+
+    def test_only_states_of_flagged_quantities(self):
+        plan = sequence.SequencePlan([self.case(1, 10, 'SDM')])
+        self.assertEqual(plan.base_states, [])
+        self.assertEqual(plan.perturbed_states, [(10, 'ARI_STUCK')])
+        plan = sequence.SequencePlan([self.case(1, 10, 'SDM', 'FTC', 'MTC'), self.case(2, 11, 'FTC')])
+        self.assertEqual(plan.base_states, [10, 11])
+        self.assertEqual(plan.perturbed_states, [(10, 'TF_UP'), (10, 'TM_UP'), (10, 'ARI_STUCK'), (11, 'TF_UP')])
+        self.assertEqual(plan.state_num, 6)
+        self.assertEqual(plan.naive_state_num, 7)
+
+    def test_evaluate(self):
+        plan = sequence.SequencePlan([self.case(1, 10, 'SDM', 'PWD')])
+        keff = plan.run(lambda follow_case_id, perturbation: {(): 1.0, (('relative_power', 'set', 0),): 1.01,
+                                                               (('control_rod', 'set', 'ALL_IN_STUCK'),): 0.98}[
+            perturbation])
+        self.assertEqual(set(keff), {(10, 'BASE'), (10, 'HZP'), (10, 'ARI_STUCK')})
+        result = plan.evaluate(keff)[1]
+        self.assertAlmostEqual(result['SDM'], -sequence.reactivity(0.98))
+        self.assertAlmostEqual(result['PWD'], sequence.reactivity(1.01))
+
+
+class ChangeFeedTest(TestCase):
+    def setUp(self):
+        reference_data(self)
+        self.task = follow_task(self, cases=0)
+        self.feed = ChangeFeed(TaskStatusChange, interval=0, gap_timeout=60)
+        self.start = self.feed.latest_id()
+
+    def change(self, offset):
+        return TaskStatusChange.objects.create(id=self.start + offset, content_object=self.task, status=1).id
+
+    def test_rows_after_a_gap_are_held_back(self):
+        second = self.change(2)
+        self.assertEqual(self.feed.since(self.start), ([], True))
+        first = self.change(1)
+        rows, complete = self.feed.since(self.start)
+        self.assertEqual([row.id for row in rows], [first, second])
+        self.assertEqual(self.feed.latest_id(), second)
+
+    def test_gap_given_up_after_timeout(self):
+        self.feed.gap_timeout = 0
+        second = self.change(2)
+        self.feed.refresh()
+        rows, complete = self.feed.since(self.start)
+        self.assertEqual([row.id for row in rows], [second])
+
+
+class TaskStatusViewTest(TestCase):
+    def setUp(self):
+        reference_data(self)
+        self.other = User.objects.create_user('other', password='password')
+        self.feed = ChangeFeed(TaskStatusChange, interval=0, annotate=views._set_task_users)
+        patch = mock.patch.object(views, 'status_feed', self.feed)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.start = self.feed.latest_id()
+        self.own = follow_task(self, cases=0)
+        self.foreign = follow_task(self, cases=0, user=self.other)
+        self.client.force_login(self.user)
+
+    @override_settings(NYMPH_STATUS_POLL_TIMEOUT=0)
+    def test_poll_returns_own_tasks_only(self):
+        response = self.client.get(reverse('nymph:task_status_poll'), {'after': self.start})
+        events = json.loads(response.content.decode())['events']
+        self.assertEqual([event['task_id'] for event in events], [self.own.pk])
+        self.assertEqual(json.loads(response.content.decode())['last_id'], self.feed.latest_id())
+
+    @override_settings(NYMPH_STATUS_STREAM_DURATION=0.05)
+    def test_stream_returns_own_tasks_only(self):
+        response = self.client.get(reverse('nymph:task_status_stream'), {'after': self.start})
+        data = [json.loads(line[len('data: '):]) for line in b''.join(response.streaming_content).decode().split('\n')
+                if line.startswith('data: {"')]
+        self.assertEqual(set(event['task_id'] for event in data), {self.own.pk})
+
+    def test_staff_sees_every_task(self):
+        self.user.is_staff = True
+        self.user.save()
+        with override_settings(NYMPH_STATUS_POLL_TIMEOUT=0):
+            response = self.client.get(reverse('nymph:task_status_poll'), {'after': self.start})
+        events = json.loads(response.content.decode())['events']
+        self.assertEqual(set(event['task_id'] for event in events), {self.own.pk, self.foreign.pk})
+
+
+class ResultStoreTest(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+    def ingest(self, text):
+        output = os.path.join(self.directory, "task.out")
+        touch(output, text.encode())
+        return results.ingest_files([output], os.path.join(self.directory, results.RESULT_DIR))
+
+    def test_blocks_are_written_in_chunks(self):
+        lines = ["Keff"] + ["{} {}".format(i, i * 2) for i in range(1000)] + ["text", "Keff", "1 2"]
+        with mock.patch.object(results, 'BUFFER_SIZE', 7):
+            index = self.ingest("\n".join(lines))
+        store = results.ResultStore(os.path.join(self.directory, results.RESULT_DIR))
+        self.assertEqual(index['arrays']['keff']['shape'], [1001, 2])
+        self.assertEqual(index['arrays']['keff']['occurrences'], 2)
+        self.assertEqual(store['keff'][999].tolist(), [999, 1998])
+        self.assertEqual(store['keff'][-1].tolist(), [1, 2])
+
+    def test_rows_of_mixed_width_are_padded(self):
+        with mock.patch.object(results, 'BUFFER_SIZE', 2), mock.patch.object(results, 'PAD_ROWS', 2):
+            index = self.ingest("power\n1 2 3\n4\n5 6\n7 8 9\n10")
+        self.assertTrue(index['arrays']['power']['padded'])
+        data = results.ResultStore(os.path.join(self.directory, results.RESULT_DIR))['power']
+        np.testing.assert_array_equal(data, [[1, 2, 3], [4, np.nan, np.nan], [5, 6, np.nan], [7, 8, 9],
+                                             [10, np.nan, np.nan]])
+
+    def test_names_are_unique_and_truncated(self):
+        title = "Assembly Power " * 10
+        index = self.ingest("Power Map\n1\npower-map\n2\n{}\n3\n{}!\n4".format(title, title))
+        names = list(index['arrays'])
+        self.assertEqual(names[:2], ['power_map', 'power_map_2'])
+        self.assertEqual([len(name) for name in names[2:]], [results.MAX_NAME] * 2)
+        self.assertNotEqual(names[2], names[3])
+        self.assertEqual(index['arrays']['power_map_2']['title'], 'power-map')
+
+    def test_reingestion_removes_stale_arrays(self):
+        self.ingest("keff\n1\nflux\n2")
+        self.ingest("keff\n1")
+        directory = os.path.join(self.directory, results.RESULT_DIR)
+        self.assertEqual(sorted(os.listdir(directory)), [results.INDEX_FILE, 'keff.npy'])
+
+
+class InterpolationTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        axes = {'boron_density': [0, 1000], 'fuel_temperature': [500, 900], 'moderator_temperature': [560, 600],
+                'burn_up': [0, 50]}
+        self.interpolators = []
+        for number in range(2):
+            table = BranchTable.create(os.path.join(directory, "table_{}".format(number)), axes, num_group=2)
+            boron = np.reshape(axes['boron_density'], (-1, 1, 1, 1, 1, 1))
+            table.data[...] = number * 1e4 + boron + np.arange(2)
+            self.interpolators.append(Interpolator(table))
+
+    def expected(self, table_index, boron_density):
+        table_index, boron_density = np.broadcast_arrays(table_index, boron_density)
+        return (table_index * 1e4 + boron_density)[..., None] + np.arange(2)
+
+    def interpolate(self, table_index, boron_density):
+        return interpolate_core(self.interpolators, table_index, xs='sigma_a', boron_density=boron_density,
+                                fuel_temperature=600, moderator_temperature=580, burn_up=10)
+
+    def test_index_per_assembly(self):
+        boron_density = np.random.RandomState(0).uniform(0, 1000, (157, 20))
+        table_index = np.arange(157) % 2
+        result = self.interpolate(table_index, boron_density)
+        self.assertEqual(result.shape, (157, 20, 2))
+        np.testing.assert_allclose(result, self.expected(table_index[:, None], boron_density))
+        np.testing.assert_allclose(self.interpolate(table_index[:, None], boron_density), result)
+
+    def test_scalar_index(self):
+        boron_density = np.linspace(0, 1000, 157 * 20).reshape(157, 20)
+        result = self.interpolate(1, boron_density)
+        self.assertEqual(result.shape, (157, 20, 2))
+        np.testing.assert_allclose(result, self.expected(1, boron_density))
+        self.assertEqual(self.interpolate(0, 500).shape, (2,))
+
+
+class BranchTableTest(SimpleTestCase):
+    def test_branch_values_end_at_max_value(self):
+        self.assertEqual(branch_values(561, 615, 4)[-2:], [613, 615])
+        self.assertEqual(branch_values(500, 900, 100), [500, 600, 700, 800, 900])
+        self.assertEqual(branch_values(500, 900, 0), [500])
+
+    def test_round_trip(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        path = os.path.join(directory, "task", "branch_table.xs")
+        axes = {'boron_density': [0, 500, 1000], 'fuel_temperature': branch_values(561, 615, 4),
+                'moderator_temperature': [560, 600], 'burn_up': [0, 10, 50]}
+        table = BranchTable.create(path, axes, num_group=2)
+        table.write([1.5, 2.5], xs='sigma_a', boron_density=500, fuel_temperature=615, moderator_temperature=600,
+                    burn_up=10)
+        table.flush()
+        table = BranchTable.open(path)
+        self.assertEqual(table.shape, (3, 15, 2, 3, len(xs_table.XS_NAMES), 2))
+        self.assertEqual(table.index(xs='sigma_a', boron_density=500, fuel_temperature=615,
+                                     moderator_temperature=600, burn_up=10),
+                         (1, 14, 1, 1, xs_table.XS_NAMES.index('sigma_a'), slice(None)))
+        np.testing.assert_array_equal(table.select(xs='sigma_a', boron_density=500, fuel_temperature=615,
+                                                   moderator_temperature=600, burn_up=10), [1.5, 2.5])
+        selected = table.select(xs='sigma_a', group=0, boron_density=slice(0, 500), fuel_temperature=615,
+                                moderator_temperature=600, burn_up=10)
+        self.assertEqual(selected.shape, (2,))
+        self.assertTrue(np.isnan(selected[0]))
+        with self.assertRaises(KeyError):
+            table.index(fuel_temperature=614)
+
+
+class TaskBundleTest(TestCase):
+    def setUp(self):
+        reference_data(self)
+        file_root(self)
+        self.client.force_login(self.user)
+
+    def bundle(self, task):
+        return self.client.get(reverse('nymph:task_bundle', kwargs={
+            'model': task._meta.model_name, 'pk': task.pk, 'format': 'tar'}))
+
+    def test_every_bundled_model(self):
+        bp_out_task = BPOutTask.objects.create(reactor_model=self.reactor_model, pin_map=self.pin_map,
+                                               fuel_map=self.pin_map, bp_in=False, name='bp out', user=self.user,
+                                               burn_up_points='0,10')
+        baffle_calculation = BaffleCalculation.objects.create(assembly_task=assembly_task(self), user=self.user)
+        tasks = [assembly_task(self), bp_out_task, baffle_calculation, follow_task(self, cases=0)]
+        tasks += [fanout.create_children(group).first() for group in (bp_out_task, baffle_calculation)]
+        self.assertEqual(set(task._meta.model_name for task in tasks), set(views.BUNDLE_MODELS))
+        for task in tasks:
+            touch(os.path.join(task.dir(), "output.txt"), b"result")
+            response = self.bundle(task)
+            self.assertEqual(response.status_code, 200, task._meta.model_name)
+            with tarfile.open(fileobj=io.BytesIO(b''.join(response.streaming_content))) as archive:
+                self.assertIn("output.txt", [os.path.basename(name) for name in archive.getnames()])
+
+    def test_task_without_directory(self):
+        task = EgretSequenceTask.objects.create(name='sequence', user=self.user, follow_task=follow_task(self))
+        self.assertEqual(self.bundle(task).status_code, 404)
+
+
+class SyntheticDataTest(TestCase):
+    def test_task_groups(self):
+        data = SyntheticData(seed=1).base(nodes=2, cycles=1).plants(
+            1, units=1, cycles=1, follow_tasks=1, cases=2, assembly_tasks=3, bp_out_tasks=2, burn_up_points=4,
+            baffle_calculations=2)
+        self.assertEqual(AssemblyTask.objects.filter(bpouttask=None).count(), 3)
+        self.assertEqual(BPOutTask.objects.count(), 2)
+        self.assertEqual(BaffleCalculation.objects.count(), 2)
+        for group in data.bp_out_tasks + data.baffle_calculations:
+            self.assertEqual(sorted(fanout.children(group).values_list('label', flat=True)),
+                             sorted(group.child_labels()))
+        self.assertEqual(BPOutTask.objects.get(pk=data.bp_out_tasks[0].pk).get_burn_up_points(),
+                         parse_burn_up_points("0,5,10,15"))
+
+    def test_bulk_ids(self):
+        data = SyntheticData()
+        ComputeNode.objects.create(name='other', IP='10.0.0.1', queue='other').delete()
+        ComputeNode.objects.create(name='existing', IP='10.0.0.2', queue='existing')
+        nodes = data.bulk(ComputeNode, (ComputeNode(name=str(i), IP='10.0.1.{}'.format(i), queue=str(i))
+                                        for i in range(5)))
+        self.assertEqual([ComputeNode.objects.get(pk=node.pk).name for node in nodes], [str(i) for i in range(5)])
+        self.assertEqual(ComputeNode.objects.create(name='next', IP='10.0.0.3', queue='next').pk, nodes[-1].pk + 1)
+
+
+class AdminChangelistTest(TestCase):
+    def changelist_queries(self, model):
+        url = reverse('NYMPH:{}_{}_changelist'.format(model._meta.app_label, model._meta.model_name))
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(queries)
+
+    def test_queries_do_not_grow_with_rows(self):
+        self.client.force_login(User.objects.create_superuser('admin', '', 'password'))
+        counts = []
+        for seed, number in ((0, 4), (1, 40)):
+            SyntheticData(seed).base(nodes=1, cycles=1).materials(number, elements=number // 4)
+            counts.append([self.changelist_queries(model) for model in (Material, WmisElement)])
+        self.assertEqual(counts[0], counts[1])
+
+
+@override_settings(NYMPH_SQL_PROFILE_RATE=1)
+class SQLProfileTest(TestCase):
+    def setUp(self):
+        self.profiles = profiling.ProfileBuffer(10)
+        patch = mock.patch.object(profiling, 'profiles', self.profiles)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def profile(self, queries):
+        middleware = profiling.SQLProfileMiddleware()
+        request = RequestFactory().get('/')
+        middleware.process_request(request)
+        for _ in range(queries):
+            ComputeNode.objects.count()
+        middleware.process_response(request, HttpResponse())
+        return self.profiles.snapshot()[-1]
+
+    def test_truncated_log(self):
+        with mock.patch.object(connection, 'queries_log', deque(maxlen=5)):
+            self.assertFalse(self.profile(4).truncated)
+            profile = self.profile(8)
+        self.assertTrue(profile.truncated)
+        self.assertEqual(profile.queries, 5)
+        self.assertEqual(self.profiles.by_pattern()[0]['truncated'], 1)
+        self.client.force_login(User.objects.create_superuser('admin', '', 'password'))
+        response = self.client.get(reverse('NYMPH:sql_profile'))
+        self.assertContains(response, "1 of the requests executed more than")
+
+
+class SpanTest(TestCase):
+    def setUp(self):
+        reference_data(self)
+
+    def test_transitions_of_task_group(self):
+        group = BaffleCalculation.objects.create(assembly_task=assembly_task(self), user=self.user)
+        fanout.create_children(group)
+        for status in (1, 2, 6):
+            fanout.children(group).update(status=status)
+            fanout.refresh_group(group)
+        self.assertEqual(list(spans.task_spans([group]).values_list('name', flat=True)), ['queue_wait', 'solver'])
+
+    def test_builds_of_deck_are_nested(self):
+        task = assembly_task(self)
+        cache.get_cache().clear()
+        self.addCleanup(cache.get_cache().clear)
+        with spans.span('deck', task):
+            for _ in range(2):
+                builders.element_nuclides(1)
+        self.assertEqual(list(spans.task_spans([task]).values_list('name', 'depth')),
+                         [('deck', 0), ('element_nuclides', 1)])
+
+    def test_failed_save_does_not_mask_exception(self):
+        task = assembly_task(self)
+        with mock.patch.object(spans, 'save', side_effect=DatabaseError("disk full")), \
+                self.assertLogs('nymph.spans', 'ERROR'):
+            with self.assertRaisesMessage(ValueError, "deck"):
+                with spans.span('deck', task):
+                    raise ValueError("deck")
+            with spans.span('deck', task):
+                pass
+        self.assertEqual(AssemblyTask.objects.filter(pk=task.pk).count(), 1)
+
+
+@override_settings(NYMPH_TASK_PUBLISHER='nymph.tests.recording_publisher')
+class SuspendResumeTest(TestCase):
+    def setUp(self):
+        reference_data(self)
+        file_root(self)
+        del published[:]
+
+    def test_task(self):
+        task = assembly_task(self, status=2, compute_node=self.node1)
+        scheduler.suspend(task)
+        manifest = task.checkpoints().save(b'state', label='case 3')
+        self.assertEqual(scheduler.resume(task, [self.node2]), {task: manifest})
+        self.assertEqual(published, [(task, 3, None), (task, 1, manifest)])
+
+    def test_task_group(self):
+        group = BaffleCalculation.objects.create(assembly_task=assembly_task(self), user=self.user)
+        robin_tasks = list(fanout.create_children(group).order_by('pk'))
+        RobinTask.objects.filter(pk__in=[item.pk for item in robin_tasks[1:]]).update(status=2,
+                                                                                      compute_node=self.node1)
+        RobinTask.objects.filter(pk=robin_tasks[0].pk).update(status=6)
+        with self.assertRaises(ValueError):
+            group.checkpoints()
+        scheduler.suspend(group)
+        group.refresh_from_db()
+        self.assertEqual(group.status, 3)
+        self.assertEqual(sorted(set(fanout.children(group).values_list('status', flat=True))), [3, 6])
+        manifest = robin_tasks[1].checkpoints().save(b'state')
+        checkpoints = scheduler.resume(group, [self.node2])
+        self.assertEqual(len(checkpoints), len(robin_tasks) - 1)
+        self.assertEqual(checkpoints[robin_tasks[1]], manifest)
+        self.assertEqual(sum(checkpoint is not None for task, status, checkpoint in published), 1)
+        group.refresh_from_db()
+        self.assertEqual(group.status, 1)
+
+
+class CheckpointsTest(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+    def test_newer_corrupt_checkpoint_keeps_last_valid(self):
+        writer = Checkpoints(self.directory, keep=3)
+        first = writer.save(b'first')
+        second = writer.save(b'second')
+        touch(writer.path(second), b'corrupt')
+        checkpoints = Checkpoints(self.directory, keep=1)
+        checkpoints.prune()
+        self.assertEqual(checkpoints.latest(), first)
+        self.assertEqual(checkpoints.sequences(), [2, 1])
+        checkpoints.save(b'third')
+        self.assertEqual(checkpoints.sequences(), [3])
+
+    def test_only_old_temporary_files_are_removed(self):
+        checkpoints = Checkpoints(self.directory)
+        checkpoints.save(b'first')
+        writing = os.path.join(checkpoints.location, "000002.chk.tmp")
+        left = os.path.join(checkpoints.location, "000001.json.tmp")
+        touch(writing)
+        touch(left)
+        os.utime(left, (0, 0))
+        checkpoints.prune()
+        self.assertTrue(os.path.exists(writing))
+        self.assertFalse(os.path.exists(left))
+
+    def test_sequence_claimed_by_another_save(self):
+        checkpoints = Checkpoints(self.directory)
+        checkpoints.save(b'first')
+        claimed = os.path.join(checkpoints.location, "000002.chk")
+        touch(claimed)
+        self.assertEqual(checkpoints.save(b'third')['sequence'], 3)
+        self.assertTrue(os.path.exists(claimed))
+        self.assertEqual(checkpoints.latest()['sequence'], 3)
+        os.utime(claimed, (0, 0))
+        checkpoints.prune()
+        self.assertFalse(os.path.exists(claimed))
+
+    def test_prune_does_not_read_checkpoints(self):
+        checkpoints = Checkpoints(self.directory, keep=2)
+        with mock.patch.object(checkpoints, 'verify', side_effect=AssertionError):
+            for content in (b'first', b'second', b'third'):
+                checkpoints.save(content)
+        self.assertEqual(checkpoints.sequences(), [3, 2])
+        self.assertEqual([name for name in os.listdir(checkpoints.location) if name.endswith(".tmp")], [])
+
+    def test_latest_skips_checkpoint_pruned_meanwhile(self):
+        checkpoints = Checkpoints(self.directory)
+        manifest = checkpoints.save(b'first')
+        with mock.patch.object(checkpoints, 'sequences', return_value=[5, 1]):
+            self.assertEqual(checkpoints.latest(), manifest)
+
+
+class PathTest(TestCase):
+    def setUp(self):
+        reference_data(self)
+        self.root = file_root(self)
+
+    def test_cache_is_bounded(self):
+        with mock.patch.object(paths, 'MAX_ENTRIES', 2):
+            for pk in range(3):
+                paths._set(('unit', pk), (1, pk))
+            self.assertIsNone(paths._get(('unit', 0)))
+            self.assertEqual(paths._get(('unit', 2)), (1, 2))
+
+    def test_change_logged_by_another_process(self):
+        feed = invalidation.ReferenceChangeFeed()
+        feed.poll(force=True)
+        before = self.cycle.dir(self.user.pk)
+        Unit.objects.filter(pk=self.unit.pk).update(unit_num=2)
+        self.assertEqual(self.cycle.dir(self.user.pk), before)
+        ReferenceChange.objects.create(model='nymph.unit', object_id=self.unit.pk)
+        feed.poll(force=True)
+        self.assertIn(os.sep + "unit_2" + os.sep, self.cycle.dir(self.user.pk))
+
+    def test_change_logged_by_another_process_is_polled(self):
+        feed = invalidation.ReferenceChangeFeed(interval=0)
+        patch = mock.patch.object(invalidation, 'feed', feed)
+        patch.start()
+        self.addCleanup(patch.stop)
+        feed.poll()
+        self.assertIn(os.sep + "unit_1" + os.sep, self.cycle.dir(self.user.pk))
+        Unit.objects.filter(pk=self.unit.pk).update(unit_num=2)
+        ReferenceChange.objects.create(model='nymph.unit', object_id=self.unit.pk)
+        self.assertIn(os.sep + "unit_2" + os.sep, self.cycle.dir(self.user.pk))
+
+    def test_task_path_change_is_logged(self):
+        task = assembly_task(self)
+        task = AssemblyTask.objects.get(pk=task.pk)
+        changes = ReferenceChange.objects.filter(model='nymph.assemblytask')
+        task.status = 1
+        task.save()
+        self.assertFalse(changes.exists())
+        task.reactor_model = ReactorModel.objects.create(
+            name='M311', position_pattern=self.reactor_model.position_pattern, row_index='A', column_index='1',
+            diameter=1, active_height=1, primary_system_pressure=1, rated_power=1, power_density=1,
+            coolant_volume=1, coolant_flow_rate=1, fuel_temperature=1, moderator_temperature=1, step_size=1,
+            default_step=1, max_step=1)
+        task.save()
+        self.assertEqual(list(changes.values_list('object_id', flat=True)), [task.pk])
+        self.assertEqual(task.dir(), os.path.join(self.root, 'M311', 'assembly_task', 'task_{}'.format(task.pk)))
+
+    def test_robin_task_dir_from_cache(self):
+        baffle = BaffleCalculation.objects.create(assembly_task=assembly_task(self), user=self.user)
+        robin_tasks = list(fanout.create_children(baffle))
+        paths.clear()
+        # the change log was read just now
+        invalidation.feed.poll(force=True)
+        with self.assertNumQueries(1):
+            paths.warm(robin_tasks)
+        with self.assertNumQueries(0):
+            dirs = paths.bulk_dirs(robin_tasks)
+        self.assertEqual(dirs[robin_tasks[0].pk], os.path.join(self.root, 'M310', 'robin_task',
+                                                               'task_{}'.format(robin_tasks[0].pk)))
+
+    def test_plant_not_in_profile(self):
+        other = User.objects.create_user('other', password='password')
+        profile = Profile.objects.create(user=other)
+        with self.assertRaises(Plant.DoesNotExist):
+            self.cycle.dir(other.pk)
+        profile.plants.add(self.plant)
+        self.assertIn("user_{}".format(other.pk), self.cycle.dir(other.pk))
+        self.plant.profile_set.clear()
+        with self.assertRaises(Plant.DoesNotExist):
+            self.cycle.dir(self.user.pk)
+
+
+class OrphanTest(TestCase):
+    def setUp(self):
+        reference_data(self)
+        self.root = file_root(self)
+        task = assembly_task(self)
+        baffle = BaffleCalculation.objects.create(assembly_task=task, user=self.user)
+        robin_task = fanout.create_children(baffle).first()
+        self.kept = [os.path.join(task.dir(), "checkpoint", "000001.chk"), os.path.join(baffle.dir(), "output"),
+                     os.path.join(robin_task.dir(), "output"), os.path.join(self.loading_pattern.dir(), "output"),
+                     os.path.join(follow_task(self).dir(), "output"),
+                     os.path.join(self.root, DeduplicatedNymphStorage.BLOB_DIR, "0" * 64)]
+        cycle_dir = self.cycle.dir(self.user.pk)
+        self.orphans = [os.path.join(self.root, "M310", "assembly_task", "task_999"),
+                        os.path.join(self.root, "M310", "robin_task", "task_999"),
+                        os.path.join(cycle_dir, "egret_task", "task_999"),
+                        os.path.join(cycle_dir, "loading_pattern", "pattern_999"),
+                        os.path.join(self.root, "plant_999")]
+        for path in self.kept:
+            touch(path, b"kept")
+        for path in self.orphans:
+            touch(os.path.join(path, "checkpoint", "000001.chk"), b"orphan")
+            os.utime(path, (0, 0))
+
+    def collect(self, remove, min_age=0):
+        return orphans.Collector(self.root, remove=remove, workers=2, min_age=min_age).run()
+
+    def test_report(self):
+        report = self.collect(remove=False)
+        self.assertEqual([orphan.path for orphan in report.orphans], sorted(self.orphans))
+        self.assertEqual((report.files, report.bytes), (5, 30))
+        self.assertTrue(all(os.path.exists(path) for path in self.kept + self.orphans))
+
+    def test_remove(self):
+        report = self.collect(remove=True)
+        self.assertTrue(all(orphan.removed for orphan in report.orphans))
+        self.assertTrue(all(os.path.exists(path) for path in self.kept))
+        self.assertFalse(any(os.path.exists(path) for path in self.orphans))
+
+    def test_recent_orphan_kept(self):
+        os.utime(self.orphans[0])
+        report = self.collect(remove=True, min_age=3600)
+        self.assertEqual(report.recent, 1)
+        self.assertTrue(os.path.exists(self.orphans[0]))
+
+    def test_user_no_longer_given_the_plant(self):
+        self.plant.profile_set.clear()
+        paths.clear()
+        self.collect(remove=True)
+        self.assertTrue(all(os.path.exists(path) for path in self.kept))
+
+
+@cache.reference('Element')
+def element_name(atomic_num):
+    return Element.objects.get(pk=atomic_num).nameEN
+
+
+class CompositeIndexTest(TestCase):
+    INDEXES = [(table, ('status', 'compute_node_id')) for table in (
+        'assembly_task', 'baffle_calculation', 'robin_task', 'egret_follow_task', 'egret_sequence_task')] + [
+        (table, ('content_type_id', 'object_id')) for table in ('material', 'assembly_cut', 'robin_task')] + [
+        ('fuel_assembly_loading_pattern', ('cycle_id', 'position_id')),
+        ('egret_follow_case', ('follow_task_id', '_order'))]
+
+    def test_indexes_of_hot_query_paths(self):
+        with connection.cursor() as cursor:
+            for table, columns in self.INDEXES:
+                constraints = connection.introspection.get_constraints(cursor, table).values()
+                self.assertIn(columns, [tuple(item['columns']) for item in constraints if item['index']], table)
+
+    @skipUnless(connection.vendor == 'sqlite', "plan format of SQLite")
+    def test_hot_query_uses_index(self):
+        reference_data(self)
+        sql, params = EgretFollowTask.objects.filter(status=1, compute_node=self.node1).query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(benchmark_indexes.EXPLAIN['sqlite'] + sql, params)
+            plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn("(status=? AND compute_node_id=?)", plan)
+
+
+class SquashedMigrationTest(TransactionTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+    def migrate(self, alias, loader_class=None):
+        connections.databases[alias] = {'ENGINE': 'django.db.backends.sqlite3',
+                                        'NAME': os.path.join(self.directory, alias + '.sqlite3')}
+        self.addCleanup(self.drop, alias)
+        connection = connections[alias]
+        executor = MigrationExecutor(connection)
+        if loader_class is not None:
+            executor.loader = loader_class(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+        return executor.loader, check_squashed_migrations.schema(connection)
+
+    @staticmethod
+    def drop(alias):
+        connections[alias].close()
+        del connections.databases[alias]
+        delattr(connections._connections, alias)
+
+    def test_same_schema_as_original_migrations(self):
+        original_loader, original = self.migrate('original', check_squashed_migrations.OriginalMigrationLoader)
+        loader, squashed = self.migrate('squashed')
+        self.assertNotIn(('nymph', '0001_squashed_0012_composite_indexes'), original_loader.graph.nodes)
+        self.assertIn(('nymph', '0001_squashed_0012_composite_indexes'), loader.graph.nodes)
+        self.assertEqual(squashed, original)
+
+
+class ReferenceCacheTest(TestCase):
+    def setUp(self):
+        # changes logged by other processes are not read during the test
+        feed = invalidation.ReferenceChangeFeed(interval=3600)
+        patch = mock.patch.object(invalidation, 'feed', feed)
+        patch.start()
+        self.addCleanup(patch.stop)
+        feed.poll()
+        cache.get_cache().clear()
+        self.addCleanup(cache.get_cache().clear)
+        self.element = Element.objects.create(atomic_num=1, symbol='H', nameCH='qing', nameEN='hydrogen')
+
+    def test_value_built_once(self):
+        self.assertEqual(element_name(1), 'hydrogen')
+        with self.assertNumQueries(0):
+            self.assertEqual(element_name(1), 'hydrogen')
+
+    def test_save_and_delete_bump_version(self):
+        element_name(1)
+        version = cache.versions([Element])[0]
+        self.element.nameEN = 'protium'
+        self.element.save()
+        self.assertGreater(cache.versions([Element])[0], version)
+        self.assertEqual(element_name(1), 'protium')
+        self.element.delete()
+        with self.assertRaises(Element.DoesNotExist):
+            element_name(1)
+
+    def test_object_dropped_by_invalidate(self):
+        self.assertEqual(cache.get_object(Element, 1).nameEN, 'hydrogen')
+        Element.objects.filter(pk=1).update(nameEN='protium')
+        with self.assertNumQueries(0):
+            self.assertEqual(cache.get_object(Element, 1).nameEN, 'hydrogen')
+        cache.invalidate(Element, 1)
+        self.assertEqual(cache.get_object(Element, 1).nameEN, 'protium')
+
+
+class ReferenceChangeFeedTest(TestCase):
+    def setUp(self):
+        self.feed = invalidation.ReferenceChangeFeed(interval=0)
+        patch = mock.patch.object(invalidation, 'feed', self.feed)
+        patch.start()
+        self.addCleanup(patch.stop)
+        cache.get_cache().clear()
+        self.addCleanup(cache.get_cache().clear)
+        for atomic_num, name in ((1, 'hydrogen'), (2, 'helium')):
+            Element.objects.create(atomic_num=atomic_num, symbol=name[:2], nameCH='qing', nameEN=name)
+        self.feed.poll()
+        for atomic_num in (1, 2):
+            cache.get_object(Element, atomic_num)
+        # rows changed by another process, which logs them without sending signals here
+        Element.objects.update(nameEN='changed')
+
+    def log(self, atomic_num, offset=None):
+        fields = {} if offset is None else {'id': self.feed.last_id + offset}
+        ReferenceChange.objects.create(model='nymph.element', object_id=atomic_num, **fields)
+
+    def names(self):
+        return [cache.get_object(Element, atomic_num).nameEN for atomic_num in (1, 2)]
+
+    def test_only_changed_rows_dropped(self):
+        self.log(1)
+        self.assertEqual(self.names(), ['changed', 'helium'])
+
+    def test_change_committed_out_of_order(self):
+        self.log(2, offset=2)
+        self.assertEqual(self.names(), ['hydrogen', 'changed'])
+        self.log(1, offset=1)
+        self.assertEqual(self.names(), ['changed', 'changed'])
+
+
+@override_settings(NYMPH_REFERENCE_READ_DATABASE='replica')
+class ReplicaTest(TransactionTestCase):
+    """
+    a second SQLite database plays a replica which has not received the latest write yet;
+    reads inside the transaction of a TestCase would stay on the write database
+    """
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        connections.databases['replica'] = {'ENGINE': 'django.db.backends.sqlite3',
+                                            'NAME': os.path.join(directory, 'replica.sqlite3')}
+        self.addCleanup(self.drop_replica)
+        with connections['replica'].schema_editor() as editor:
+            editor.create_model(Element)
+        feed = invalidation.ReferenceChangeFeed(interval=3600)
+        patch = mock.patch.object(invalidation, 'feed', feed)
+        patch.start()
+        self.addCleanup(patch.stop)
+        feed.poll()
+        self.addCleanup(routers.unpin)
+        self.addCleanup(cache.get_cache().clear)
+
+    def drop_replica(self):
+        connections['replica'].close()
+        del connections.databases['replica']
+        delattr(connections._connections, 'replica')
+
+    def test_value_rebuilt_from_write_database(self):
+        Element.objects.using('replica').create(atomic_num=1, symbol='H', nameCH='qing', nameEN='old')
+        Element.objects.create(atomic_num=1, symbol='H', nameCH='qing', nameEN='new')
+        # another process, which has not seen the change yet
+        routers.unpin()
+        cache.get_cache().clear()
+        self.assertEqual(element_name(1), 'old')
+        self.assertGreater(invalidation.feed.poll(force=True), 0)
+        self.assertFalse(routers.is_pinned())
+        self.assertEqual(element_name(1), 'new')
+        self.assertEqual(cache.get_object(Element, 1).nameEN, 'new')
+        self.assertEqual(Element.objects.get(pk=1).nameEN, 'old')
+
+    def test_reactor_model_dir_from_write_database(self):
+        with connections['replica'].schema_editor() as editor:
+            editor.create_model(ReactorModel)
+        fields = dict(row_index='A', column_index='1', diameter=1, active_height=1, primary_system_pressure=1,
+                      rated_power=1, power_density=1, coolant_volume=1, coolant_flow_rate=1, fuel_temperature=1,
+                      moderator_temperature=1, step_size=1, default_step=1, max_step=1)
+        pattern = PositionPattern.objects.create(name='core', type=2)
+        reactor_model = ReactorModel.objects.create(name='M311', position_pattern=pattern, **fields)
+        ReactorModel.objects.using('replica').create(pk=reactor_model.pk, name='M310',
+                                                     position_pattern_id=pattern.pk, **fields)
+        # another process, which has not cached the reactor model yet
+        routers.unpin()
+        paths.clear()
+        self.assertEqual(os.path.basename(paths.reactor_model_dir(reactor_model.pk)), 'M311')
+
+
+@override_settings(NYMPH_STORAGE_COMPRESSION=True)
+class CompressedStorageTest(SimpleTestCase):
+    storage_class = CompressedNymphStorage
+
+    def setUp(self):
+        self.root = file_root(self)
+        self.storage = self.storage_class()
+        self.content = "keff 1.00231\n" * 1000
+        self.storage.save("task/a.inp", ContentFile(self.content.encode()))
+
+    def test_read_closes_file_on_disk(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always', ResourceWarning)
+            f = self.storage.open("task/a.inp")
+            self.assertEqual(f.read(), self.content.encode())
+            f.close()
+            self.assertTrue(f.raw.closed)
+            with self.storage.open("task/a.inp", 'r') as f:
+                self.assertEqual(f.read(), self.content)
+            self.assertEqual(self.storage.size("task/a.inp"), len(self.content))
+            gc.collect()
+        self.assertEqual([item for item in caught if issubclass(item.category, ResourceWarning)], [])
+
+    def test_size_from_metadata(self):
+        with mock.patch.object(self.storage, '_open', side_effect=AssertionError):
+            self.assertEqual(self.storage.size("task/a.inp"), len(self.content))
+
+    def test_url_of_stored_file(self):
+        stored = "task/a.inp" + self.storage.codec_for("task/a.inp").suffix
+        self.assertEqual(self.storage.url("task/a.inp"), self.storage.base_url + stored)
+        self.assertTrue(os.path.exists(os.path.join(self.root, stored)))
+
+    def test_file_uploaded_compressed(self):
+        self.storage.save("task/data.tar.gz", ContentFile(b"\x1f\x8braw"))
+        self.assertEqual(self.storage.listdir("task"), ([], ['a.inp', 'data.tar.gz']))
+        self.assertFalse(self.storage.exists("task/data.tar"))
+        with self.storage.open("task/data.tar.gz") as f:
+            self.assertEqual(f.read(), b"\x1f\x8braw")
+
+    def test_path_of_field_file(self):
+        # the storage of the field was made before the file root of the test
+        field = LoadingPattern._meta.get_field('file')
+        self.addCleanup(setattr, field, 'storage', field.storage)
+        field.storage = self.storage
+        with self.assertRaises(NotImplementedError):
+            LoadingPattern(file="task/a.inp").file.path
+        with override_settings(NYMPH_STORAGE_COMPRESSION=False):
+            self.storage.save("task/b.inp", ContentFile(self.content.encode()))
+        with open(LoadingPattern(file="task/b.inp").file.path, 'rb') as f:
+            self.assertEqual(f.read(), self.content.encode())
+
+    def test_temporary_names_are_unique(self):
+        path = self.storage.path("task/a.inp.gz")
+        self.assertNotEqual(self.storage._temporary(path), self.storage._temporary(path))
+        self.assertEqual([name for name in os.listdir(os.path.join(self.root, "task")) if name.endswith(".tmp")], [])
+
+
+class DeduplicatedStorageTest(CompressedStorageTest):
+    storage_class = DeduplicatedNymphStorage
+
+    def test_digest_of_content(self):
+        digest = hashlib.sha256(self.content.encode()).hexdigest()
+        self.assertTrue(self.storage.exists_digest(digest))
+        with override_settings(NYMPH_STORAGE_COMPRESSION=False):
+            self.storage.save("task/b.inp", ContentFile(self.content.encode()))
+        blobs = [name for _, _, files in os.walk(os.path.join(self.root, ".blobs")) for name in files]
+        self.assertEqual(len(blobs), 2)
+        self.assertTrue(all(name.startswith(digest[2:]) for name in blobs))
+
+    def test_write_copies_linked_file(self):
+        self.storage.save("task/b.out", ContentFile(b"shared"))
+        self.storage.save("other/b.out", ContentFile(b"shared"))
+        with override_settings(NYMPH_STORAGE_COMPRESSION=False):
+            self.storage.save("task/c.txt", ContentFile(b"shared"))
+            self.storage.save("other/c.txt", ContentFile(b"shared"))
+        with self.storage.open("task/c.txt", 'ab') as f:
+            f.write(b" changed")
+        with self.storage.open("other/c.txt") as f:
+            self.assertEqual(f.read(), b"shared")
+        self.assertTrue(self.storage.exists_digest(hashlib.sha256(b"shared").hexdigest()))
+        with self.assertRaises(ValueError):
+            self.storage.open("task/b.out", 'wb')
+
+    def test_delete_last_link_removes_blob(self):
+        digest = hashlib.sha256(self.content.encode()).hexdigest()
+        self.storage.save("other/a.inp", ContentFile(self.content.encode()))
+        self.storage.delete("task/a.inp")
+        self.assertTrue(self.storage.exists_digest(digest))
+        self.storage.delete("other/a.inp")
+        self.assertFalse(self.storage.exists_digest(digest))
+
+
+class FanOutTest(TransactionTestCase):
+    def setUp(self):
+        reference_data(self)
+        self.baffle = BaffleCalculation.objects.create(assembly_task=assembly_task(self), user=self.user)
+
+    def test_child_of_baffle_calculation_reactor_model(self):
+        child = fanout.create_children(self.baffle).first()
+        self.assertEqual(child.reactor_model, self.reactor_model)
+
+    def test_group_completed_once_with_saved_status(self):
+        sent = []
+
+        def receive(sender, group, **kwargs):
+            sent.append(group.status)
+
+        fanout.group_completed.connect(receive)
+        self.addCleanup(fanout.group_completed.disconnect, receive)
+        fanout.create_children(self.baffle).update(status=6)
+        self.assertEqual(fanout.refresh_group(self.baffle), 6)
+        fanout.refresh_group(self.baffle)
+        self.assertEqual(sent, [6])
+        self.assertEqual(BaffleCalculation.objects.get(pk=self.baffle.pk).status, 6)
+
 
 # Create your tests here.
 
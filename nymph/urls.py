@@ -0,0 +1,8 @@
+from django.conf.urls import url
+from . import views
+
+urlpatterns = [
+    url(r'^task_status/poll/$', views.task_status_poll, name='task_status_poll'),
+    url(r'^task_status/stream/$', views.task_status_stream, name='task_status_stream'),
+    url(r'^task/(?P<model>\w+)/(?P<pk>\d+)/bundle\.(?P<format>tar|zip)$', views.task_bundle, name='task_bundle'),
+]
@@ -1,3 +1,208 @@
-from django.shortcuts import render
+"""
+task status changes are pushed by long poll or server-sent events, both keep the request open
+while waiting: a poll up to NYMPH_STATUS_POLL_TIMEOUT seconds, a stream NYMPH_STATUS_STREAM_DURATION
+seconds before the client reconnects. each open request holds a worker for that long, so serve these
+views from threaded or asynchronous workers, or shorten both settings for synchronous ones.
+"""
+import json
+import os
+import time
+from collections import defaultdict
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.contrib.contenttypes.models import ContentType
+from django.http import Http404, HttpResponse, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from .bundle import BUNDLES, parse_range
+from .feed import ChangeFeed
+from .models import AbstractTask, TaskStatusChange
 
-# Create your views here.
+STATUS_DISPLAY = dict(AbstractTask.STATUS_CHOICES)
+
+
+def _set_task_users(changes):
+    """
+    set task_user_id of every status change to the user of its task, None if the task is deleted
+    """
+    ids = defaultdict(set)
+    for change in changes:
+        ids[change.content_type_id].add(change.object_id)
+    users = {}
+    for content_type_id, object_ids in ids.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        if model is None:
+            continue
+        for pk, user_id in model.objects.filter(pk__in=object_ids).values_list('pk', 'user_id'):
+            users[(content_type_id, pk)] = user_id
+    for change in changes:
+        change.task_user_id = users.get((change.content_type_id, change.object_id))
+
+
+# one feed per process shared by every client
+status_feed = ChangeFeed(TaskStatusChange, interval=1.0, annotate=_set_task_users)
+
+
+def stream_duration():
+    """
+    a stream is closed after this time and reconnected by the client with Last-Event-ID
+    """
+    return getattr(settings, 'NYMPH_STATUS_STREAM_DURATION', 60)
+
+
+def poll_timeout():
+    return getattr(settings, 'NYMPH_STATUS_POLL_TIMEOUT', 25)
+
+
+def _status_event(change):
+    return {
+        'id': change.id,
+        'task': ContentType.objects.get_for_id(change.content_type_id).model,
+        'task_id': change.object_id,
+        'status': change.status,
+        'status_display': STATUS_DISPLAY[change.status],
+        'time': change.time.isoformat(),
+    }
+
+
+def _subscription(request):
+    """
+    ?task=assemblytask&task=egretfollowtask:12 restricts events to task types or single tasks
+    """
+    tasks = request.GET.getlist('task')
+    if not tasks:
+        return None
+    return set(tuple(item.lower().split(':', 1)) if ':' in item else (item.lower(),) for item in tasks)
+
+
+def _visible(change, user):
+    """
+    users see the changes of their own tasks, staff of every task
+    """
+    return user.is_staff or change.task_user_id == user.pk
+
+
+def _subscribed(event, subscription):
+    return subscription is None or (event['task'],) in subscription or \
+           (event['task'], str(event['task_id'])) in subscription
+
+
+def _changes(last_id, user):
+    """
+    status changes after last_id visible to user and the id to continue from
+    """
+    changes, complete = status_feed.since(last_id)
+    if changes:
+        last_id = changes[-1].id
+    elif not complete:
+        last_id = status_feed.dropped_id
+    return [change for change in changes if _visible(change, user)], complete, last_id
+
+
+def _last_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return status_feed.latest_id()
+
+
+@login_required
+def task_status_poll(request):
+    """
+    long poll: wait until status changes after ?after=id then return them
+    """
+    last_id = _last_id(request.GET.get('after'))
+    subscription = _subscription(request)
+    deadline = time.time() + poll_timeout()
+    while True:
+        changes, complete, last_id = _changes(last_id, request.user)
+        events = [event for event in map(_status_event, changes) if _subscribed(event, subscription)]
+        if events or not complete or time.time() >= deadline:
+            return JsonResponse({'last_id': last_id, 'reset': not complete, 'events': events})
+        time.sleep(status_feed.interval)
+
+
+def _event_stream(last_id, subscription, user):
+    deadline = time.time() + stream_duration()
+    yield "retry: 1000\n\n"
+    while time.time() < deadline:
+        changes, complete, last_id = _changes(last_id, user)
+        if not complete:
+            # changes were missed, the client should reload the whole state
+            yield "event: reset\ndata: {}\n\n"
+        for change in changes:
+            event = _status_event(change)
+            if _subscribed(event, subscription):
+                yield "id: {}\ndata: {}\n\n".format(change.id, json.dumps(event))
+        if not changes:
+            # keep the connection alive through proxies
+            yield ": {}\n\n".format(last_id)
+        time.sleep(status_feed.interval)
+
+
+@login_required
+def task_status_stream(request):
+    """
+    server-sent events of task status changes
+    """
+    last_id = _last_id(request.META.get('HTTP_LAST_EVENT_ID', request.GET.get('after')))
+    response = StreamingHttpResponse(_event_stream(last_id, _subscription(request), request.user),
+                                     content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# tasks whose dir() is a directory of their own, other tasks have no files to bundle
+BUNDLE_MODELS = ('assemblytask', 'bpouttask', 'bafflecalculation', 'robintask', 'egretfollowtask')
+
+
+def _task(request, model, pk, models=None):
+    try:
+        model = apps.get_model('nymph', model)
+    except LookupError:
+        raise Http404("no task type {}".format(model))
+    if not issubclass(model, AbstractTask) or (models is not None and model._meta.model_name not in models):
+        raise Http404("{} is not a task".format(model._meta.model_name))
+    return get_object_or_404(model, pk=pk)
+
+
+@login_required
+def task_bundle(request, model, pk, format):
+    """
+    task directory as a tar or zip archive generated while downloading;
+    tar supports Range requests so an interrupted download can be resumed
+    """
+    task = _task(request, model, pk, BUNDLE_MODELS)
+    if task.user_id != request.user.id and not request.user.is_staff:
+        return HttpResponseForbidden()
+    directory = task.dir()
+    if not os.path.isdir(directory):
+        raise Http404("no directory of {} {}".format(model, pk))
+    name = "{}_{}".format(task._meta.model_name, task.pk)
+    bundle = BUNDLES[format](directory, name)
+    start, stop = 0, bundle.size
+    status = 200
+    if bundle.ranges and request.META.get('HTTP_IF_RANGE', bundle.etag) == bundle.etag:
+        try:
+            selected = parse_range(request.META.get('HTTP_RANGE'), bundle.size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = "bytes */{}".format(bundle.size)
+            return response
+        if selected is not None:
+            start, stop = selected
+            status = 206
+    if bundle.ranges:
+        response = StreamingHttpResponse(bundle.chunks(start, stop), status=status,
+                                         content_type=bundle.content_type)
+        response['Content-Length'] = stop - start
+        response['Accept-Ranges'] = 'bytes'
+        response['ETag'] = bundle.etag
+        if status == 206:
+            response['Content-Range'] = "bytes {}-{}/{}".format(start, stop - 1, bundle.size)
+    else:
+        response = StreamingHttpResponse(bundle.chunks(), content_type=bundle.content_type)
+    response['Content-Disposition'] = 'attachment; filename="{}.{}"'.format(name, bundle.extension)
+    response['X-Accel-Buffering'] = 'no'
+    return response
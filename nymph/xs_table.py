@@ -0,0 +1,134 @@
+"""
+few-group cross section branch table of an assembly task
+
+fixed layout binary file:
+    magic(8 bytes) version(uint32) header length(uint32) header(json) padding
+    data: float64 little endian C order array of shape
+          (boron density, fuel temperature, moderator temperature, burn up, cross section, group)
+the data starts at a multiple of ALIGNMENT so it is opened by numpy.memmap
+and only the sliced branches are read from disk.
+"""
+import json
+import os
+import struct
+from collections import OrderedDict
+import numpy as np
+
+MAGIC = b'NYMPHXS\x00'
+VERSION = 1
+ALIGNMENT = 64
+DTYPE = np.dtype('<f8')
+TABLE_FILE = "branch_table.xs"
+AXES = ('boron_density', 'fuel_temperature', 'moderator_temperature', 'burn_up')
+XS_NAMES = ('sigma_tr', 'sigma_a', 'nu_sigma_f', 'kappa_sigma_f', 'sigma_s', 'adf')
+_PREFIX = struct.Struct('<8sII')
+
+
+def table_path(task):
+    return os.path.join(task.dir(), TABLE_FILE)
+
+
+def _data_offset(header_length):
+    size = _PREFIX.size + header_length
+    return (size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class BranchTable:
+    def __init__(self, path, header, data):
+        self.path = path
+        self.header = header
+        self.axes = OrderedDict((name, np.asarray(header['axes'][name], dtype=np.float64)) for name in AXES)
+        self.xs_names = list(header['xs_names'])
+        self.num_group = header['num_group']
+        self.data = data
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @classmethod
+    def create(cls, path, axes, num_group, xs_names=XS_NAMES):
+        """
+        axes: {axis name: values} for every name of AXES;
+        return a table opened for writing filled with nan
+        """
+        header = OrderedDict([
+            ('axes', OrderedDict((name, [float(value) for value in axes[name]]) for name in AXES)),
+            ('xs_names', list(xs_names)),
+            ('num_group', int(num_group)),
+            ('dtype', DTYPE.str),
+        ])
+        encoded = json.dumps(header).encode('utf-8')
+        offset = _data_offset(len(encoded))
+        shape = tuple(len(header['axes'][name]) for name in AXES) + (len(xs_names), num_group)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, 'wb') as f:
+            f.write(_PREFIX.pack(MAGIC, VERSION, len(encoded)))
+            f.write(encoded)
+            f.write(b'\x00' * (offset - _PREFIX.size - len(encoded)))
+            f.truncate(offset + int(np.prod(shape)) * DTYPE.itemsize)
+        os.replace(tmp, path)
+        data = np.memmap(path, dtype=DTYPE, mode='r+', offset=offset, shape=shape)
+        data[...] = np.nan
+        return cls(path, header, data)
+
+    @classmethod
+    def for_task(cls, task, burn_up, xs_names=XS_NAMES):
+        """
+        create the table of an assembly task with its branch axes and the given burn up points
+        """
+        axes = OrderedDict(task.branch_axes())
+        axes['burn_up'] = burn_up
+        return cls.create(table_path(task), axes, task.num_group_edit, xs_names)
+
+    @classmethod
+    def open(cls, path, mode='r'):
+        with open(path, 'rb') as f:
+            magic, version, length = _PREFIX.unpack(f.read(_PREFIX.size))
+            if magic != MAGIC:
+                raise ValueError("{} is not a branch table".format(path))
+            if version != VERSION:
+                raise ValueError("unsupported branch table version {}".format(version))
+            header = json.loads(f.read(length).decode('utf-8'), object_pairs_hook=OrderedDict)
+        shape = tuple(len(header['axes'][name]) for name in AXES) + (len(header['xs_names']), header['num_group'])
+        data = np.memmap(path, dtype=np.dtype(header['dtype']), mode=mode, offset=_data_offset(length), shape=shape)
+        return cls(path, header, data)
+
+    def flush(self):
+        self.data.flush()
+
+    def _index(self, axis, value):
+        """
+        value of the axis to index: a number, slice of values (bounds included) or None for all
+        """
+        values = self.axes[axis]
+        if value is None:
+            return slice(None)
+        if isinstance(value, slice):
+            start = 0 if value.start is None else int(np.searchsorted(values, value.start - 1e-9, 'left'))
+            stop = len(values) if value.stop is None else int(np.searchsorted(values, value.stop + 1e-9, 'right'))
+            return slice(start, stop)
+        index = int(np.searchsorted(values, value - 1e-9))
+        if index == len(values) or not np.isclose(values[index], value):
+            raise KeyError("{}={} is not a branch".format(axis, value))
+        return index
+
+    def index(self, xs=None, group=None, **coordinates):
+        unknown = set(coordinates) - set(AXES)
+        if unknown:
+            raise KeyError("unknown axis: {}".format(", ".join(sorted(unknown))))
+        key = [self._index(axis, coordinates.get(axis)) for axis in AXES]
+        key.append(slice(None) if xs is None else self.xs_names.index(xs))
+        key.append(slice(None) if group is None else group)
+        return tuple(key)
+
+    def select(self, xs=None, group=None, **coordinates):
+        """
+        memory-mapped view by branch coordinates, e.g.
+        select(xs='nu_sigma_f', boron_density=800, fuel_temperature=slice(553, 903))
+        """
+        return self.data[self.index(xs, group, **coordinates)]
+
+    def write(self, values, xs=None, group=None, **coordinates):
+        self.data[self.index(xs, group, **coordinates)] = values
@@ -43,6 +43,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE_CLASSES = [
     'django.middleware.security.SecurityMiddleware',
+    'nymph.profiling.SQLProfileMiddleware',
+    'nymph.routers.RouterMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -50,6 +52,7 @@ MIDDLEWARE_CLASSES = [
     'django.contrib.auth.middleware.SessionAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'nymph.invalidation.ReferenceCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'orient_web.urls'
@@ -88,6 +91,31 @@ DATABASES = {
     },
 }
 
+# reference data may be read from a replica of default, e.g.
+# 'replica': {'ENGINE': 'django.db.backends.mysql', 'NAME': 'oasis_web', 'HOST': ..., 'TEST': {'MIRROR': 'default'}}
+# with NYMPH_REFERENCE_READ_DATABASE = 'replica'
+DATABASE_ROUTERS = ['nymph.routers.NymphRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/1.9/topics/cache/
+# nymph reference data may also use a cache shared by the processes of a machine:
+# 'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/orient/cache'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'nymph': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'nymph',
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/1.9/ref/settings/#auth-password-validators
@@ -126,4 +154,27 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/1.9/howto/static-files/
 
 STATIC_URL = '/static/'
-STATIC_ROOT=os.path.join(BASE_DIR, 'static')
\ No newline at end of file
+STATIC_ROOT=os.path.join(BASE_DIR, 'static')
+
+# nymph
+# dotted path of a callable(task, checkpoint=None) which sends a dispatched task to task.compute_node.queue,
+# checkpoint is the manifest of the checkpoint a resumed task restarts from
+NYMPH_TASK_PUBLISHER = None
+# compress files saved by CompressedNymphStorage, existing uncompressed files are still readable;
+# off as compute nodes read task inputs by path, a compressed file has no path of its content
+NYMPH_STORAGE_COMPRESSION = False
+# cache alias of reference data read by the deck builders
+NYMPH_CACHE = 'nymph'
+# database of task tables and every write
+NYMPH_WRITE_DATABASE = 'default'
+# database of reference reads, a replica of NYMPH_WRITE_DATABASE
+NYMPH_REFERENCE_READ_DATABASE = 'default'
+# seconds reference reads stay on NYMPH_WRITE_DATABASE after a reference write
+NYMPH_REPLICA_LAG = 5
+# share of requests whose SQL is profiled, see nymph.profiling and /nymph_admin/sql_profile/
+NYMPH_SQL_PROFILE_RATE = 0.01
+# profiled requests kept by every process
+NYMPH_SQL_PROFILE_SIZE = 1000
+# seconds a task status long poll or stream holds its worker, see nymph.views
+NYMPH_STATUS_POLL_TIMEOUT = 25
+NYMPH_STATUS_STREAM_DURATION = 60
@@ -13,11 +13,12 @@ Including another URLconf
     1. Import the include() function: from django.conf.urls import url, include
     2. Add a URL to urlpatterns:  url(r'^blog/', include('blog.urls'))
 """
-from django.conf.urls import url
+from django.conf.urls import url, include
 from django.contrib import admin
 from nymph.admin import admin_site
 
 urlpatterns = [
     url(r'^admin/', admin.site.urls),
     url(r'^nymph_admin/', admin_site.urls),
+    url(r'^nymph/', include('nymph.urls', namespace='nymph')),
 ]